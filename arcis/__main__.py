@@ -22,13 +22,18 @@ from arcis.router.auth import auth_router
 from arcis.database.mongo.connection import mongo
 
 from arcis.core.llm.config_manager import config_manager
+from arcis.core.llm.factory import LLMFactory
+from arcis.core.llm.rate_limiter import rate_limiter
 from arcis.core.llm.long_memory import long_memory
+from arcis.core.utils.token_tracker import token_usage_writer
 
 from arcis.core.external_api.gmail import gmail_api
+from arcis.core.external_api.reminder_scheduler import reminder_scheduler
 from arcis.core.tts.tts_manager import tts_manager
 
 from arcis.core.workflow_auto.auto_flow import run_autonomous_processing
 from arcis.core.mcp.manager import mcp_manager
+from arcis.core.workflow_manual.tools import web_search as web_search_tool
 
 warnings.filterwarnings("ignore", message="Pydantic serializer warnings") # because of the usage of raw_response in pydantic models
 
@@ -46,7 +51,13 @@ async def check_emails_cron():
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await mongo.connect()
+    try:
+        await token_usage_writer.backfill_rollups()
+    except Exception as e:
+        LOGGER.error(f"Token usage rollup backfill failed (non-fatal): {e}")
+    token_usage_writer.start()
     await config_manager.load_config()
+    await rate_limiter.load_limits()
     await gmail_api.load_creds()
 
     try:
@@ -64,8 +75,8 @@ async def lifespan(app: FastAPI):
         LOGGER.error(f"MCP init failed (non-fatal): {e}")
 
     try:
-        loop = asyncio.get_event_loop() # Avoid blocking event loop for slow model loads
-        await loop.run_in_executor(None, tts_manager.initialize, Config.TTS_DEFAULT_VOICE) 
+        # Avoid blocking event loop for slow model loads (runs on the TTS worker pool)
+        await tts_manager.run(tts_manager.initialize, Config.TTS_DEFAULT_VOICE)
     except Exception as e:
         LOGGER.error(f"TTS Manager initialization failed: {e}")
     
@@ -77,10 +88,16 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             LOGGER.error(f"Failed to start Telegram Bot: {e}")
 
+    try:
+        await reminder_scheduler.start()
+    except Exception as e:
+        LOGGER.error(f"Reminder scheduler start failed (non-fatal): {e}")
+
     cron_task = asyncio.create_task(check_emails_cron())
     
     yield
     
+    await reminder_scheduler.stop()
     cron_task.cancel()
     try:
         await cron_task
@@ -94,6 +111,10 @@ async def lifespan(app: FastAPI):
             LOGGER.error(f"Failed to stop Telegram Bot: {e}")
 
     await mcp_manager.shutdown()
+    tts_manager.pool.shutdown()
+    await LLMFactory.aclose()
+    await web_search_tool.aclose()
+    await token_usage_writer.stop()
     await mongo.disconnect()
 
 
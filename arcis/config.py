@@ -33,8 +33,69 @@ class Config:
     QDRANT_API_KEY = getenv("QDRANT_API_KEY", None)
     EMBEDDING_MODE = getenv("EMBEDDING_MODE", "offline")  # "offline" (FastEmbed) or "online" (Gemini)
 
+    # LLM provider fallback / hedging
+    LLM_FAILOVER_TIMEOUT = float(getenv("LLM_FAILOVER_TIMEOUT", "20"))  # timeout of chain links that have a fallback
+    LLM_HEDGE_PERCENTILE = int(getenv("LLM_HEDGE_PERCENTILE", "90"))  # latency percentile after which a hedge starts
+    LLM_HEDGE_MIN_SAMPLES = int(getenv("LLM_HEDGE_MIN_SAMPLES", "20"))  # calls observed before hedging kicks in
+
+    LLM_RATE_OUTPUT_TOKENS = int(getenv("LLM_RATE_OUTPUT_TOKENS", "512"))  # output allowance reserved per call by the rate limiter
+
+    # Response cache (opt-in per agent with "response_cache" in the agent config)
+    RESPONSE_CACHE_TTL = int(getenv("RESPONSE_CACHE_TTL", "3600"))  # seconds
+    RESPONSE_CACHE_MAX_ENTRIES = int(getenv("RESPONSE_CACHE_MAX_ENTRIES", "500"))  # per agent
+    RESPONSE_CACHE_SIMILARITY = float(getenv("RESPONSE_CACHE_SIMILARITY", "0.97"))  # cosine threshold of the semantic tier
+
+    # Prompt context budgeting (per agent override with "context_budget" in the agent config)
+    CONTEXT_BUDGET_TOKENS = int(getenv("CONTEXT_BUDGET_TOKENS", "6000"))  # dynamic prompt sections (history, step context)
+    CONTEXT_ENTRY_MAX_TOKENS = int(getenv("CONTEXT_ENTRY_MAX_TOKENS", "1500"))  # cap of a single step output / message
+
+    # Agent tool execution
+    TOOL_WORKERS = int(getenv("TOOL_WORKERS", "8"))  # threads for sync tools
+    TOOL_TIMEOUT = float(getenv("TOOL_TIMEOUT", "30"))  # seconds per tool call, tools can override via metadata["timeout"]
+    TOOL_CACHE_ENABLED = getenv("TOOL_CACHE_ENABLED", "true").lower() == "true"  # cache results of read-only tools
+    TOOL_CACHE_MAX_ENTRIES = int(getenv("TOOL_CACHE_MAX_ENTRIES", "1000"))
+
+    # Web search tool
+    WEB_SEARCH_FETCH_PAGES = int(getenv("WEB_SEARCH_FETCH_PAGES", "3"))  # top results whose page text is fetched
+    WEB_SEARCH_PAGE_TOKENS = int(getenv("WEB_SEARCH_PAGE_TOKENS", "600"))  # excerpt budget per fetched page
+    WEB_SEARCH_FETCH_TIMEOUT = float(getenv("WEB_SEARCH_FETCH_TIMEOUT", "8"))  # seconds per page
+
+    # Token usage tracking
+    TOKEN_USAGE_BATCH_SIZE = int(getenv("TOKEN_USAGE_BATCH_SIZE", "50"))  # buffered records that trigger a write
+    TOKEN_USAGE_FLUSH_INTERVAL = float(getenv("TOKEN_USAGE_FLUSH_INTERVAL", "5"))  # seconds between writes
+    TOKEN_USAGE_BUFFER_MAX = int(getenv("TOKEN_USAGE_BUFFER_MAX", "10000"))  # kept while Mongo is unreachable
+    TOKEN_USAGE_RAW_TTL_DAYS = int(getenv("TOKEN_USAGE_RAW_TTL_DAYS", "90"))  # raw records expire, rollups are kept (0 = never)
+
+    # Calendar reminders
+    REMINDERS_ENABLED = getenv("REMINDERS_ENABLED", "true").lower() == "true"  # send due reminders via Telegram
+    REMINDER_MISSED_GRACE = int(getenv("REMINDER_MISSED_GRACE", "900"))  # seconds; reminders missed while down still sent
+
+    # Calendar free/busy
+    FREE_BUSY_DEFAULT_MINUTES = int(getenv("FREE_BUSY_DEFAULT_MINUTES", "30"))  # busy time of events without an end time
+    FREE_BUSY_CACHE_DAYS = int(getenv("FREE_BUSY_CACHE_DAYS", "120"))  # days of busy intervals kept in memory
+
     # TTS Config
     TTS_DEFAULT_VOICE = getenv("TTS_DEFAULT_VOICE", "alba")
+    TTS_WORKERS = int(getenv("TTS_WORKERS", "0")) or max(1, min(4, (os.cpu_count() or 2) // 2))  # 0 = sized to cores
+    TTS_MAX_QUEUE = int(getenv("TTS_MAX_QUEUE", "32"))  # waiting synthesis jobs; further jobs and new sessions are refused
+    TTS_LOOKAHEAD = int(getenv("TTS_LOOKAHEAD", "3"))  # sentences synthesised ahead of playback
+    TTS_PCM_FRAME_MS = int(getenv("TTS_PCM_FRAME_MS", "40"))  # frame size for binary PCM streaming
+    TTS_CACHE_MAX_MB = int(getenv("TTS_CACHE_MAX_MB", "64"))  # in-memory synthesised audio cache
+    TTS_CACHE_DIR = getenv("TTS_CACHE_DIR", None)  # optional disk tier for the audio cache
+    TTS_VOICE_STORE_DIR = getenv("TTS_VOICE_STORE_DIR", os.path.join(getenv("WORK_DIR", "./"), "voice_store"))  # shared between workers
+
+    # STT Config
+    STT_BACKEND = getenv("STT_BACKEND", "groq")  # "groq" (Groq Whisper API) or "local" (faster-whisper)
+    STT_LOCAL_MODEL = getenv("STT_LOCAL_MODEL", "base")
+    STT_LOCAL_DEVICE = getenv("STT_LOCAL_DEVICE", "cpu")
+    STT_LOCAL_COMPUTE_TYPE = getenv("STT_LOCAL_COMPUTE_TYPE", "int8")
+    STT_PREPROCESS = getenv("STT_PREPROCESS", "true").lower() == "true"  # mono/16 kHz/trim/re-encode before upload
+    STT_PREPROCESS_WORKERS = int(getenv("STT_PREPROCESS_WORKERS", "2"))  # threads decoding/re-encoding audio
+    STT_SAMPLE_RATE = int(getenv("STT_SAMPLE_RATE", "16000"))
+    STT_TRIM_DB = float(getenv("STT_TRIM_DB", "-45"))  # dBFS below which leading/trailing audio is trimmed
+    STT_VAD_SILENCE_MS = int(getenv("STT_VAD_SILENCE_MS", "600"))  # pause that ends an utterance when streaming
+    STT_VAD_MIN_RMS = float(getenv("STT_VAD_MIN_RMS", "300"))  # minimum 16-bit RMS level counted as speech
+    STT_MAX_SEGMENT_S = float(getenv("STT_MAX_SEGMENT_S", "15"))  # long utterances are cut to get partials
 
     # Telegram Config
     TELEGRAM_API_ID = getenv("TELEGRAM_API_ID")
@@ -0,0 +1,186 @@
+import calendar
+import itertools
+
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Literal, Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+# series_end of open ended series, so range queries can always compare against it
+SERIES_OPEN_END = datetime(9999, 12, 31)
+
+WEEKDAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+FREQUENCIES = {"DAILY": "daily", "WEEKLY": "weekly", "MONTHLY": "monthly", "YEARLY": "yearly"}
+
+OCCURRENCE_ID_FORMAT = "%Y%m%dT%H%M%S"
+
+
+class Recurrence(BaseModel):
+    """
+    Subset of an RFC 5545 RRULE: FREQ, INTERVAL, BYDAY (weekly), COUNT, UNTIL,
+    plus exception dates (occurrence start times that were removed).
+    """
+    freq: Literal["daily", "weekly", "monthly", "yearly"]
+    interval: int = Field(1, ge=1)
+    by_weekday: Optional[List[int]] = None  # 0 = Monday, weekly rules only
+    count: Optional[int] = Field(None, ge=1)
+    until: Optional[datetime] = None
+    exdates: List[datetime] = []
+
+    @field_validator("until")
+    @classmethod
+    def _naive_until(cls, value: Optional[datetime]) -> Optional[datetime]:
+        # stored and compared with naive calendar times
+        return naive_utc(value) if value is not None else None
+
+    @field_validator("exdates")
+    @classmethod
+    def _naive_exdates(cls, value: List[datetime]) -> List[datetime]:
+        return [naive_utc(exdate) for exdate in value]
+
+    @classmethod
+    def from_rrule(cls, rrule: str) -> "Recurrence":
+        """Parse "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE;UNTIL=20250101T000000" (optional "RRULE:" prefix)."""
+        parts = dict(
+            part.split("=", 1) for part in rrule.upper().removeprefix("RRULE:").split(";") if "=" in part
+        )
+        if parts.get("FREQ") not in FREQUENCIES:
+            raise ValueError(f"Unsupported or missing FREQ in '{rrule}'")
+        return cls(
+            freq=FREQUENCIES[parts["FREQ"]],
+            interval=int(parts.get("INTERVAL", 1)),
+            by_weekday=[WEEKDAYS.index(day[-2:]) for day in parts["BYDAY"].split(",")] if "BYDAY" in parts else None,
+            count=int(parts["COUNT"]) if "COUNT" in parts else None,
+            until=_parse_rrule_date(parts["UNTIL"]) if "UNTIL" in parts else None,
+        )
+
+
+def _parse_rrule_date(value: str) -> datetime:
+    value = value.rstrip("Z")
+    return datetime.strptime(value, "%Y%m%dT%H%M%S" if "T" in value else "%Y%m%d")
+
+
+def _add_months(start: datetime, months: int) -> Optional[datetime]:
+    """Same day and time `months` later, None when that month has no such day (RFC 5545 skips it)."""
+    year, month = divmod(start.month - 1 + months, 12)
+    year += start.year
+    if start.day > calendar.monthrange(year, month + 1)[1]:
+        return None
+    return start.replace(year=year, month=month + 1)
+
+
+def _periods(rule: Recurrence, dtstart: datetime, first_period: int) -> Iterator[List[datetime]]:
+    """Candidate occurrences period by period (a day, week, month or year times the interval)."""
+    period = first_period
+    if rule.freq == "weekly":
+        weekdays = sorted(set(rule.by_weekday or [dtstart.weekday()]))
+        week_start = dtstart - timedelta(days=dtstart.weekday())
+    while True:
+        if rule.freq == "daily":
+            yield [dtstart + timedelta(days=period * rule.interval)]
+        elif rule.freq == "weekly":
+            base = week_start + timedelta(weeks=period * rule.interval)
+            yield [base + timedelta(days=day) for day in weekdays if base + timedelta(days=day) >= dtstart]
+        elif rule.freq == "monthly":
+            yield [d for d in [_add_months(dtstart, period * rule.interval)] if d]
+        else:
+            yield [d for d in [_add_months(dtstart, 12 * period * rule.interval)] if d]
+        period += 1
+
+
+def _first_period(rule: Recurrence, dtstart: datetime, window_start: datetime) -> int:
+    """Period just before the window, so long running series don't replay their history."""
+    if window_start <= dtstart:
+        return 0
+    if rule.freq == "daily":
+        return max(0, (window_start - dtstart).days // rule.interval - 1)
+    if rule.freq == "weekly":
+        week_start = dtstart - timedelta(days=dtstart.weekday())
+        return max(0, (window_start - week_start).days // (7 * rule.interval) - 1)
+    months = (window_start.year - dtstart.year) * 12 + window_start.month - dtstart.month
+    step = rule.interval if rule.freq == "monthly" else 12 * rule.interval
+    return max(0, months // step - 1)
+
+
+def occurrences(rule: Recurrence, dtstart: datetime, window_start: datetime, window_end: datetime) -> Iterator[datetime]:
+    """
+    Start times of the occurrences in [window_start, window_end), exception
+    dates excluded. Without COUNT the expansion jumps straight to the window;
+    with COUNT it has to count from the first occurrence, which COUNT bounds.
+    """
+    until = min(rule.until or SERIES_OPEN_END, window_end - timedelta(microseconds=1))
+    exdates = set(rule.exdates)
+    first = 0 if rule.count else _first_period(rule, dtstart, window_start)
+    seen = 0
+
+    for candidates in _periods(rule, dtstart, first):
+        for start in candidates:
+            if start > until:
+                return
+            seen += 1
+            if rule.count and seen > rule.count:
+                return
+            if start >= window_start and start not in exdates:
+                yield start
+
+
+def series_end(rule: Recurrence, dtstart: datetime) -> datetime:
+    """Start of the last occurrence (stored with the series for range queries)."""
+    if rule.count:
+        last = dtstart
+        for last in occurrences(rule.model_copy(update={"exdates": []}), dtstart, dtstart, rule.until or SERIES_OPEN_END):
+            pass
+        return last
+    return rule.until or SERIES_OPEN_END
+
+
+def naive_utc(value: datetime) -> datetime:
+    """
+    Offset-aware datetimes as naive UTC, the way Mongo stores and compares them,
+    so they can be compared with the stored (naive) calendar times in Python.
+    """
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def utc_now() -> datetime:
+    """Current time on the scale of the stored calendar times (naive UTC)."""
+    return naive_utc(datetime.now(timezone.utc))
+
+
+def occurrence_id(series_id: str, start: datetime) -> str:
+    return f"{series_id}:{start.strftime(OCCURRENCE_ID_FORMAT)}"
+
+
+def parse_occurrence_id(item_id: str):
+    """(series_id, occurrence start) of an occurrence id, None for plain item ids."""
+    if ":" not in item_id:
+        return None
+    series_id, stamp = item_id.split(":", 1)
+    try:
+        return series_id, datetime.strptime(stamp, OCCURRENCE_ID_FORMAT)
+    except ValueError:
+        return None
+
+
+def expand_series(series: dict, window_start: datetime, window_end: datetime, limit: Optional[int] = None) -> List[dict]:
+    """The first `limit` (default all) occurrences of a stored series inside the window, as standalone items."""
+    rule = Recurrence(**series["recurrence"])
+    duration = series["end_time"] - series["start_time"] if series.get("end_time") else None
+    completed = set(series.get("completed_dates") or [])
+    series_id = str(series["_id"])
+
+    items = []
+    for start in itertools.islice(occurrences(rule, series["start_time"], window_start, window_end), limit):
+        item = {k: v for k, v in series.items() if k not in ("recurrence", "series_end", "completed_dates")}
+        item.update(
+            _id=occurrence_id(series_id, start),
+            series_id=series_id,
+            start_time=start,
+            end_time=start + duration if duration is not None else None,
+        )
+        if "is_completed" in series:
+            item["is_completed"] = start in completed
+        items.append(item)
+    return items
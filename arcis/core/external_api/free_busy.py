@@ -0,0 +1,218 @@
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from arcis import Config
+from arcis.core.external_api.calendar_recurrence import naive_utc
+from arcis.core.external_api.internal_calendar import calendar_wrapper
+from arcis.logger import LOGGER
+
+BUSY_PROJECTION = {"title": 1, "start_time": 1, "end_time": 1}
+
+Interval = Tuple[datetime, datetime, dict]
+
+
+class IntervalTree:
+    """
+    Static centered interval tree: every node keeps the intervals containing
+    its center point, sorted by start and by end, so an overlap query only
+    visits the intervals it returns plus one path down the tree.
+    """
+
+    def __init__(self, intervals: List[Interval]):
+        self.center = None
+        self.left = self.right = None
+        if not intervals:
+            return
+        # start of the median interval: that interval stays here, so every level shrinks
+        starts = sorted(start for start, _, _ in intervals)
+        self.center = starts[len(starts) // 2]
+
+        here, left, right = [], [], []
+        for interval in intervals:
+            start, end, _ = interval
+            if end <= self.center:
+                left.append(interval)
+            elif start > self.center:
+                right.append(interval)
+            else:
+                here.append(interval)
+        self.by_start = sorted(here, key=lambda i: i[0])
+        self.by_end = sorted(here, key=lambda i: i[1], reverse=True)
+        self.left = IntervalTree(left) if left else None
+        self.right = IntervalTree(right) if right else None
+
+    def overlapping(self, start: datetime, end: datetime) -> List[Interval]:
+        """Intervals overlapping [start, end) (touching ends don't count)."""
+        if self.center is None:
+            return []
+        result = []
+        if end <= self.center:
+            # node intervals contain the center, they overlap if they start before `end`
+            for interval in self.by_start:
+                if interval[0] >= end:
+                    break
+                if interval[1] > start:
+                    result.append(interval)
+        elif start >= self.center:
+            for interval in self.by_end:
+                if interval[1] <= start:
+                    break
+                if interval[0] < end:
+                    result.append(interval)
+        else:
+            result.extend(self.by_start)  # the query contains the center
+        if self.left and start < self.center:
+            result.extend(self.left.overlapping(start, end))
+        if self.right and end > self.center:
+            result.extend(self.right.overlapping(start, end))
+        return result
+
+
+def _day_bounds(day: date) -> Tuple[datetime, datetime]:
+    start = datetime.combine(day, time.min)
+    return start, start + timedelta(days=1)
+
+
+def _days(start: datetime, end: datetime) -> List[date]:
+    first, last = start.date(), (end - timedelta(microseconds=1)).date()
+    return [first + timedelta(days=n) for n in range((last - first).days + 1)]
+
+
+class FreeBusyService:
+    """
+    Busy intervals of calendar events, for conflict checks and free slot
+    search without handing the raw calendar to the LLM.
+
+    Each day's events are kept as an IntervalTree in an LRU cache; missing
+    days are loaded with one range query per run of consecutive days
+    (recurring events expanded). Any calendar write clears the cache.
+    Todos and reminders don't block time; events without an end time take
+    FREE_BUSY_DEFAULT_MINUTES. Events that started before the queried days
+    and still run are included, however long ago they started.
+    """
+
+    def __init__(self, max_days: int):
+        self.max_days = max_days
+        self._days: OrderedDict = OrderedDict()
+        self._generation = 0
+        calendar_wrapper.add_listener(lambda item_id: self.invalidate())
+
+    def invalidate(self):
+        self._generation += 1
+        self._days.clear()
+
+    async def _load(self, days: List[date]):
+        generation = self._generation
+        range_start = _day_bounds(days[0])[0]
+        range_end = _day_bounds(days[-1])[1]
+        default = timedelta(minutes=Config.FREE_BUSY_DEFAULT_MINUTES)
+        items = await calendar_wrapper.get_events_overlapping(
+            range_start, range_end, default, projection=BUSY_PROJECTION
+        )
+        intervals = []
+        for item in items:
+            end = item.get("end_time")
+            if not end or end <= item["start_time"]:
+                end = item["start_time"] + default
+            intervals.append((item["start_time"], end, item))
+        if generation != self._generation:
+            return  # calendar changed while loading, the next query reloads
+        LOGGER.debug(f"Free/busy: loaded {len(days)} days with {len(intervals)} events")
+
+        per_day: Dict[date, List[Interval]] = {day: [] for day in days}
+        for interval in intervals:
+            for day in _days(interval[0], interval[1]):
+                if day in per_day:
+                    per_day[day].append(interval)
+        for day, day_intervals in per_day.items():
+            self._days[day] = IntervalTree(day_intervals)
+        while len(self._days) > self.max_days:
+            self._days.popitem(last=False)
+
+    async def _trees(self, start: datetime, end: datetime) -> List[IntervalTree]:
+        days = _days(start, end)
+        missing = [day for day in days if day not in self._days]
+        run: List[date] = []
+        for day in missing:
+            if run and (day - run[-1]).days != 1:
+                await self._load(run)
+                run = []
+            run.append(day)
+        if run:
+            await self._load(run)
+
+        trees = []
+        for day in days:
+            tree = self._days.get(day)
+            if tree is None:
+                # invalidated by a write while loading, use a fresh query for this day
+                await self._load([day])
+                tree = self._days.get(day, IntervalTree([]))
+            self._days.move_to_end(day)
+            trees.append(tree)
+        return trees
+
+    async def busy(self, start: datetime, end: datetime) -> List[Interval]:
+        """Events overlapping [start, end), sorted by start time."""
+        start, end = naive_utc(start), naive_utc(end)
+        found: Dict[str, Interval] = {}
+        for tree in await self._trees(start, end):
+            for interval in tree.overlapping(start, end):
+                found[interval[2]["_id"]] = interval
+        return sorted(found.values(), key=lambda i: i[0])
+
+    async def conflicts(self, start: datetime, end: datetime) -> List[dict]:
+        return [_as_dict(interval) for interval in await self.busy(start, end)]
+
+    async def free_slots(
+        self,
+        start: datetime,
+        end: datetime,
+        duration_minutes: int = 30,
+        day_start: time = time(9),
+        day_end: time = time(18),
+        max_slots: Optional[int] = None,
+    ) -> List[dict]:
+        """
+        Free periods of at least duration_minutes in [start, end), within the
+        day_start - day_end hours of each day.
+        """
+        start, end = naive_utc(start), naive_utc(end)
+        duration = timedelta(minutes=duration_minutes)
+        busy = await self.busy(start, end)
+        slots = []
+        i = 0
+        for day in _days(start, end):
+            window_start = max(start, datetime.combine(day, day_start))
+            window_end = min(end, datetime.combine(day, day_end))
+            cursor = window_start
+            # busy is sorted by start; skip what ends before the window
+            while i < len(busy) and busy[i][1] <= window_start:
+                i += 1
+            j = i
+            while cursor < window_end:
+                if j < len(busy) and busy[j][0] < window_end:
+                    slot_end = min(busy[j][0], window_end)
+                    if slot_end - cursor >= duration:
+                        slots.append({"start_time": cursor, "end_time": slot_end})
+                    cursor = max(cursor, busy[j][1])
+                    j += 1
+                else:
+                    if window_end - cursor >= duration:
+                        slots.append({"start_time": cursor, "end_time": window_end})
+                    break
+            if max_slots and len(slots) >= max_slots:
+                return slots[:max_slots]
+        return slots
+
+    def stats(self) -> dict:
+        return {"cached_days": len(self._days), "max_days": self.max_days}
+
+
+def _as_dict(interval: Interval) -> dict:
+    start, end, item = interval
+    return {"_id": item["_id"], "title": item.get("title"), "start_time": start, "end_time": end}
+
+
+free_busy = FreeBusyService(max_days=Config.FREE_BUSY_CACHE_DAYS)
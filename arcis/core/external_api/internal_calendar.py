@@ -1,11 +1,27 @@
 import calendar
+import itertools
 
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence
 from bson import ObjectId
 from bson.errors import InvalidId
-from arcis.database.mongo.connection import mongo
-from pydantic import BaseModel, Field
+from arcis.core.external_api.calendar_recurrence import (
+    Recurrence, expand_series, naive_utc, parse_occurrence_id, series_end
+)
+from arcis.database.mongo.connection import mongo, COLLECTIONS
+from pydantic import BaseModel, Field, field_validator
+from arcis.logger import LOGGER
+
+ITEM_TYPES = ("event", "todo", "reminder")
+
+# fields a month view shows (description and metadata are left out)
+MONTH_VIEW_PROJECTION = {"title": 1, "item_type": 1, "start_time": 1, "end_time": 1, "is_completed": 1}
+
+# fields a series needs to be expanded into occurrences
+SERIES_PROJECTION = {"recurrence": 1, "completed_dates": 1, "start_time": 1, "end_time": 1, "is_completed": 1}
+
+# stored series are the documents with a recurrence rule (matches the partial index)
+IS_SERIES = {"$type": "object"}
 
 # --- Data Models (Pydantic) ---
 class CalendarItem(BaseModel):
@@ -16,33 +32,71 @@ class CalendarItem(BaseModel):
     description: Optional[str] = ""
     is_completed: bool = False # Mainly for Todos
     metadata: Dict[str, Any] = {} # Extra data (e.g., color, tags)
+    recurrence: Optional[Recurrence] = None # Stored once per series, expanded when queried
+
+    @field_validator("start_time", "end_time")
+    @classmethod
+    def _naive_times(cls, value: Optional[datetime]) -> Optional[datetime]:
+        # times are stored naive (UTC when an offset is given), like the range bounds they're compared with
+        return naive_utc(value) if value is not None else None
+
+
+def _project(occurrences: List[dict], projection: Optional[Dict[str, int]]) -> List[dict]:
+    """Apply a find() projection to expanded occurrences (they are built from the series document)."""
+    if not projection:
+        return occurrences
+    return [{k: v for k, v in o.items() if k in projection or k in ("_id", "series_id")} for o in occurrences]
+
 
 # --- Main Wrapper Class ---
 class CalendarWrapper:
-    def __init__(self, collection_name: str = "calendar_events"):
+    def __init__(self, collection_name: str = COLLECTIONS['calendar_events']):
         """
         Initialize with a Motor Database instance.
         """
         self.collection_name = collection_name
         self.cal = calendar.Calendar(firstweekday=6) # 6 = Sunday, 0 = Monday
+        self._listeners = []
 
     @property
     def collection(self):
         return mongo.db[self.collection_name]
 
+    def add_listener(self, callback):
+        """Register callback(item_id) called after an item (or series) is added, updated or deleted."""
+        self._listeners.append(callback)
+
+    def _notify(self, item_id: str):
+        for callback in self._listeners:
+            try:
+                callback(item_id)
+            except Exception as e:
+                LOGGER.error(f"Calendar change listener failed: {e}")
+
     # ---------------------------
     # Core CRUD Operations
     # ---------------------------
 
     async def add_item(self, item: CalendarItem) -> str:
-        """Adds an event, todo, or reminder to the database."""
+        """Adds an event, todo, or reminder to the database (a recurring one as a single series document)."""
         # Convert Pydantic model to dict
         data = item.model_dump()
+        if item.recurrence:
+            data["series_end"] = series_end(item.recurrence, item.start_time)
         result = await self.collection.insert_one(data)
+        self._notify(str(result.inserted_id))
         return str(result.inserted_id)
 
     async def get_item(self, item_id: str) -> Optional[dict]:
-        """Retrieves a single item by ID."""
+        """Retrieves a single item by ID, or one occurrence of a series by its occurrence ID."""
+        occurrence = parse_occurrence_id(item_id)
+        if occurrence:
+            series_id, start = occurrence
+            series = await self.get_item(series_id)
+            if not series or not series.get("recurrence"):
+                return None
+            matches = expand_series(series, start, start + timedelta(seconds=1))
+            return matches[0] if matches else None
         try:
             oid = ObjectId(item_id)
         except InvalidId:
@@ -50,53 +104,201 @@ class CalendarWrapper:
         return await self.collection.find_one({"_id": oid})
 
     async def update_item(self, item_id: str, update_data: dict) -> bool:
-        """Updates fields of a specific item."""
+        """
+        Updates fields of a specific item. Updating a whole series keeps its
+        series_end in sync; updating one occurrence detaches it from the
+        series as a standalone item.
+        """
+        update_data = {
+            k: naive_utc(v) if k in ("start_time", "end_time") and isinstance(v, datetime) else v
+            for k, v in update_data.items()
+        }
+        if parse_occurrence_id(item_id):
+            return await self._detach_occurrence(item_id, update_data)
         try:
             oid = ObjectId(item_id)
         except InvalidId:
             return False
-            
+
+        if "recurrence" in update_data or "start_time" in update_data:
+            current = await self.collection.find_one({"_id": oid}, {"recurrence": 1, "start_time": 1})
+            if current is None:
+                return False
+            recurrence = update_data.get("recurrence", current.get("recurrence"))
+            if recurrence:
+                recurrence = Recurrence.model_validate(recurrence)
+                update_data = {
+                    **update_data,
+                    "recurrence": recurrence.model_dump(),
+                    "series_end": series_end(recurrence, update_data.get("start_time", current["start_time"])),
+                }
+
         result = await self.collection.update_one(
             {"_id": oid}, 
             {"$set": update_data}
         )
+        if result.modified_count:
+            self._notify(item_id)
         return result.modified_count > 0
 
     async def delete_item(self, item_id: str) -> bool:
-        """Deletes an item permanently."""
+        """Deletes an item (or a whole series) permanently; an occurrence ID only removes that occurrence."""
+        occurrence = parse_occurrence_id(item_id)
+        if occurrence:
+            return await self._add_exdate(*occurrence)
         try:
             oid = ObjectId(item_id)
         except InvalidId:
             return False
         result = await self.collection.delete_one({"_id": oid})
+        if result.deleted_count:
+            self._notify(item_id)
         return result.deleted_count > 0
 
     async def toggle_todo(self, item_id: str) -> bool:
-        """Toggles the completion status of a Todo."""
+        """Toggles the completion status of a Todo (per occurrence for recurring todos)."""
         item = await self.get_item(item_id)
-        if item and item.get("item_type") == "todo":
-            new_status = not item.get("is_completed", False)
-            return await self.update_item(item_id, {"is_completed": new_status})
-        return False
+        if not item or item.get("item_type") != "todo":
+            return False
+        if item.get("series_id"):
+            operator = "$pull" if item.get("is_completed") else "$addToSet"
+            result = await self.collection.update_one(
+                {"_id": ObjectId(item["series_id"])},
+                {operator: {"completed_dates": item["start_time"]}}
+            )
+            if result.modified_count:
+                self._notify(item["series_id"])
+            return result.modified_count > 0
+        new_status = not item.get("is_completed", False)
+        return await self.update_item(item_id, {"is_completed": new_status})
+
+    async def _add_exdate(self, series_id: str, start: datetime) -> bool:
+        try:
+            oid = ObjectId(series_id)
+        except InvalidId:
+            return False
+        result = await self.collection.update_one(
+            {"_id": oid, "recurrence": IS_SERIES},
+            {"$addToSet": {"recurrence.exdates": start}}
+        )
+        if result.modified_count:
+            self._notify(series_id)
+        return result.modified_count > 0
+
+    async def _detach_occurrence(self, item_id: str, update_data: dict) -> bool:
+        """Exception date on the series plus a standalone item holding the edited occurrence."""
+        occurrence = await self.get_item(item_id)
+        if occurrence is None:
+            return False
+        data = {k: v for k, v in occurrence.items() if k not in ("_id", "series_id")}
+        data.update(update_data, recurrence=None)
+        result = await self.collection.insert_one(data)
+        self._notify(str(result.inserted_id))
+        return await self._add_exdate(occurrence["series_id"], occurrence["start_time"])
 
     # ---------------------------
     # Calendar View Logic
     # ---------------------------
 
-    async def get_items_in_range(self, start: datetime, end: datetime) -> List[dict]:
+    async def get_items_in_range(
+        self,
+        start: datetime,
+        end: datetime,
+        item_types: Sequence[str] = ITEM_TYPES,
+        projection: Optional[Dict[str, int]] = None,
+        descending: bool = False,
+        skip: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[dict]:
         """
         Fetches all items that fall within a specific time range.
         Handles events that might span across days.
+
+        The item_type condition is always part of the query so the
+        (item_type, start_time) index serves it, also when all types are wanted.
+        Sorting (by start_time) and skip/limit pagination run in Mongo.
+
+        Recurring series overlapping the range are fetched separately (on the
+        partial series index) and expanded to their occurrences in the range
+        only; occurrences carry an "<series id>:<start>" ID and a series_id.
         """
+        start, end = naive_utc(start), naive_utc(end)
+        series_list = await self.collection.find({
+            "item_type": {"$in": list(item_types)},
+            "recurrence": IS_SERIES,
+            "series_end": {"$gte": start},
+            "start_time": {"$lt": end}
+        }, {**projection, **SERIES_PROJECTION} if projection else None).to_list(length=None)
+
+        # with series in range, pagination has to happen after merging in the occurrences
+        window = skip + limit if limit else None
         cursor = self.collection.find({
+            "item_type": {"$in": list(item_types)},
+            "recurrence": None,
             "start_time": {"$gte": start, "$lt": end}
-        }).sort("start_time", 1)
+        }, projection).sort("start_time", -1 if descending else 1)
+        if series_list:
+            if window:
+                cursor = cursor.limit(window)
+        else:
+            if skip:
+                cursor = cursor.skip(skip)
+            if limit:
+                cursor = cursor.limit(limit)
         
         items = await cursor.to_list(length=None)
         
         # Convert ObjectIds to strings for JSON serializability if needed
         for item in items:
             item["_id"] = str(item["_id"])
+        if not series_list:
+            return items
+
+        for series in series_list:
+            # ascending pages only need the first occurrences of each series
+            occurrences = _project(expand_series(series, start, end, limit=None if descending else window), projection)
+            items.extend(occurrences[-window:] if descending and window else occurrences)
+        items.sort(key=lambda item: item["start_time"], reverse=descending)
+        return list(itertools.islice(items, skip, window))
+
+    async def get_events_overlapping(
+        self,
+        start: datetime,
+        end: datetime,
+        default_duration: timedelta,
+        projection: Optional[Dict[str, int]] = None,
+    ) -> List[dict]:
+        """
+        Events and occurrences overlapping [start, end) in no particular order,
+        including ones that started before the range and still run; events
+        without an end time count as lasting default_duration.
+
+        One-off events are matched on end_time (the (item_type, end_time)
+        index) or, without a usable end time, on a start in the last
+        default_duration. Series are few, they are filtered by the end of
+        their last occurrence here.
+        """
+        start, end = naive_utc(start), naive_utc(end)
+        single = {"item_type": "event", "recurrence": None}
+        items = await self.collection.find({"$or": [
+            {**single, "end_time": {"$gt": start}, "start_time": {"$lt": end}},
+            {**single, "start_time": {"$gte": start - default_duration, "$lt": end}},
+        ]}, projection).to_list(length=None)
+        for item in items:
+            item["_id"] = str(item["_id"])
+
+        series_list = await self.collection.find({
+            "item_type": "event",
+            "recurrence": IS_SERIES,
+            "start_time": {"$lt": end}
+        }, {**projection, **SERIES_PROJECTION, "series_end": 1} if projection else None).to_list(length=None)
+        for series in series_list:
+            duration = series["end_time"] - series["start_time"] if series.get("end_time") else timedelta(0)
+            duration = max(duration, default_duration)
+            if series["series_end"] <= start - duration:
+                continue
+            occurrences = expand_series(series, start - duration, end)
+            items.extend(_project([o for o in occurrences if o["start_time"] + duration > start], projection))
         return items
 
     async def get_month_view(self, year: int, month: int) -> List[List[Dict]]:
@@ -118,10 +320,15 @@ class CalendarWrapper:
         else:
             end_date = datetime(year, month + 1, 1)
 
-        # 2. Fetch all items for this month in one DB call
-        month_items = await self.get_items_in_range(start_date, end_date)
+        # 2. Fetch all items for this month in one indexed DB call, without the fields the view doesn't show
+        month_items = await self.get_items_in_range(start_date, end_date, projection=MONTH_VIEW_PROJECTION)
+
+        # 3. Bucket items by day of month in a single pass (items come sorted by start_time)
+        items_by_day: Dict[int, List[dict]] = {}
+        for item in month_items:
+            items_by_day.setdefault(item["start_time"].day, []).append(item)
 
-        # 3. Create the calendar matrix (list of weeks)
+        # 4. Create the calendar matrix (list of weeks)
         # monthdayscalendar returns 0 for days outside the month
         weeks_matrix = self.cal.monthdayscalendar(year, month)
         
@@ -133,21 +340,11 @@ class CalendarWrapper:
                 if day == 0:
                     week_data.append(None) # Empty slot (padding for week)
                     continue
-                
-                # Filter items belonging to this specific day
-                # (You can optimize this further by using a dict map instead of list comprehension)
-                current_day_start = datetime(year, month, day)
-                current_day_end = current_day_start + timedelta(days=1)
-                
-                day_items = [
-                    item for item in month_items 
-                    if current_day_start <= item["start_time"] < current_day_end
-                ]
 
                 week_data.append({
                     "day": day,
-                    "date": current_day_start.strftime("%Y-%m-%d"),
-                    "items": day_items
+                    "date": datetime(year, month, day).strftime("%Y-%m-%d"),
+                    "items": items_by_day.get(day, [])
                 })
             structured_calendar.append(week_data)
 
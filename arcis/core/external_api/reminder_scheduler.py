@@ -0,0 +1,159 @@
+import heapq
+import asyncio
+import itertools
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from arcis import Config
+from arcis.core.external_api.calendar_recurrence import SERIES_OPEN_END, expand_series, parse_occurrence_id, utc_now
+from arcis.core.external_api.internal_calendar import calendar_wrapper
+from arcis.logger import LOGGER
+from arcis.tg_plugins.tg_notify import notify_action
+
+REMINDER_PROJECTION = {"title": 1, "description": 1, "start_time": 1, "end_time": 1, "recurrence": 1}
+
+# longest sleep, so a changed system clock is noticed
+MAX_SLEEP_SECONDS = 3600
+
+
+class ReminderScheduler:
+    """
+    Fires calendar reminders through Telegram without polling the calendar.
+
+    A min-heap holds the next fire time of every pending reminder (the next
+    occurrence for a recurring one). It is loaded once at startup and kept
+    current by the calendar change listener; the loop sleeps until the head
+    of the heap is due or the heap changes. Heap entries are invalidated
+    lazily: an entry only fires if it still matches the reminder's current
+    fire time in `_pending`.
+    All times are naive UTC, the scale calendar times are stored on.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, int, str]] = []
+        self._pending: Dict[str, dict] = {}  # item id -> reminder to fire next
+        self._seq = itertools.count()
+        self._changed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._refreshes: Set[asyncio.Task] = set()
+        calendar_wrapper.add_listener(self._on_calendar_change)
+
+    async def start(self):
+        """Load the upcoming reminders and start the dispatch loop."""
+        if not Config.REMINDERS_ENABLED or self._task is not None:
+            return
+        since = utc_now() - timedelta(seconds=Config.REMINDER_MISSED_GRACE)
+        reminders = await calendar_wrapper.collection.find({
+            "item_type": "reminder",
+            "$or": [
+                {"recurrence": None, "start_time": {"$gte": since}},
+                {"recurrence": {"$type": "object"}, "series_end": {"$gte": since}},
+            ]
+        }, REMINDER_PROJECTION).to_list(length=None)
+
+        for reminder in reminders:
+            self._schedule(reminder, since)
+        LOGGER.info(f"Reminder scheduler: {len(self._pending)} reminders pending")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict:
+        next_due = min((r["fire_at"] for r in self._pending.values()), default=None)
+        return {"pending": len(self._pending), "heap_size": len(self._heap), "next_due": next_due}
+
+    # ---------------------------
+    # Heap maintenance
+    # ---------------------------
+
+    def _schedule(self, reminder: dict, after: datetime):
+        """(Re)schedule a reminder at its next fire time at or after `after`, or drop it."""
+        item_id = str(reminder["_id"])
+        if reminder.get("recurrence"):
+            upcoming = expand_series(reminder, after, SERIES_OPEN_END, limit=1)
+            occurrence = upcoming[0] if upcoming else None
+        else:
+            occurrence = reminder if reminder["start_time"] >= after else None
+
+        if occurrence is None:
+            self._pending.pop(item_id, None)
+            return
+        fire_at = occurrence["start_time"]
+        self._pending[item_id] = {"fire_at": fire_at, "reminder": reminder, "occurrence": occurrence}
+        heapq.heappush(self._heap, (fire_at, next(self._seq), item_id))
+        # heap entries of deleted or moved reminders are only skipped when popped
+        if len(self._heap) > 2 * len(self._pending) + 64:
+            self._heap = [(r["fire_at"], next(self._seq), i) for i, r in self._pending.items()]
+            heapq.heapify(self._heap)
+        self._changed.set()
+
+    def _on_calendar_change(self, item_id: str):
+        occurrence = parse_occurrence_id(item_id)
+        series_id = occurrence[0] if occurrence else item_id
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._refresh(series_id))
+        self._refreshes.add(task)
+        task.add_done_callback(self._refreshes.discard)
+
+    async def _refresh(self, item_id: str):
+        """Re-read one changed item; a single lookup by id instead of rescanning the calendar."""
+        item = await calendar_wrapper.get_item(item_id)
+        if item is None or item.get("item_type") != "reminder":
+            if self._pending.pop(item_id, None) is not None:
+                self._changed.set()
+            return
+        self._schedule({k: item.get(k) for k in ("_id", *REMINDER_PROJECTION)}, utc_now())
+
+    # ---------------------------
+    # Dispatch
+    # ---------------------------
+
+    async def _run(self):
+        while True:
+            self._changed.clear()
+            timeout = MAX_SLEEP_SECONDS
+            if self._heap:
+                timeout = min(timeout, max(0.0, (self._heap[0][0] - utc_now()).total_seconds()))
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            await self._fire_due()
+
+    async def _fire_due(self):
+        now = utc_now()
+        while self._heap and self._heap[0][0] <= now:
+            fire_at, _, item_id = heapq.heappop(self._heap)
+            pending = self._pending.get(item_id)
+            if pending is None or pending["fire_at"] != fire_at:
+                continue  # stale entry
+
+            del self._pending[item_id]
+            await self._dispatch(pending["occurrence"])
+            if pending["reminder"].get("recurrence"):
+                self._schedule(pending["reminder"], fire_at + timedelta(seconds=1))
+
+    async def _dispatch(self, occurrence: dict):
+        text = f"⏰ Reminder: {occurrence['title']}\n🕒 {occurrence['start_time'].strftime('%Y-%m-%d %H:%M')}"
+        if occurrence.get("description"):
+            text += f"\n\n{occurrence['description']}"
+        LOGGER.info(f"Reminder due: {occurrence['title']} ({occurrence['start_time']})")
+        try:
+            await notify_action(text)
+        except Exception as e:
+            LOGGER.error(f"Reminder dispatch failed: {e}")
+
+
+reminder_scheduler = ReminderScheduler()
@@ -6,16 +6,24 @@ from arcis.database.mongo.connection import mongo
 
 logger = logging.getLogger(__name__)
 
+# same model on other providers, tried in order when Groq is rate limited, failing or slow
+GPT_OSS_FALLBACKS = [
+    {"provider": LLMProvider.CEREBRAS, "model_name": "gpt-oss-120b"},
+    {"provider": LLMProvider.OPENROUTER, "model_name": "openai/gpt-oss-120b:free"},
+]
+
+# "fallbacks": optional chain used when the primary fails (429/5xx/timeouts)
+# "hedge": also start the next provider when the primary is slower than usual
+#          (off for planner/replanner, their output is streamed to the user)
+# "response_cache": reuse plans for identical / near-identical inputs (planner, analyzer)
+# "context_budget": prompt tokens for history / step context, defaults to CONTEXT_BUDGET_TOKENS
 DEFAULT_AGENTS_CONFIG = {
-    "supervisor": {
-        "provider": LLMProvider.MISTRAL_AI,
-        "model_name": "ministral-8b-2410",
-        "temperature": 0.1
-    },
     "planner": {
         "provider": LLMProvider.GROQ,
         "model_name": "openai/gpt-oss-120b",
-        "temperature": 0.4
+        "temperature": 0.4,
+        "fallbacks": GPT_OSS_FALLBACKS,
+        "response_cache": False
     },
     "email_agent": {
         "provider": LLMProvider.GROQ,
@@ -25,12 +33,15 @@ DEFAULT_AGENTS_CONFIG = {
     "booking_agent": {
         "provider": LLMProvider.GROQ,
         "model_name": "openai/gpt-oss-120b",
-        "temperature": 0.5
+        "temperature": 0.5,
+        "fallbacks": GPT_OSS_FALLBACKS,
+        "hedge": True
     },
     "replanner": {
         "provider": LLMProvider.GROQ,
         "model_name": "openai/gpt-oss-120b",
-        "temperature": 0.5
+        "temperature": 0.5,
+        "fallbacks": GPT_OSS_FALLBACKS
     },
     "health_monitor": {
         "provider": LLMProvider.GROQ,
@@ -40,7 +51,9 @@ DEFAULT_AGENTS_CONFIG = {
     "utility_agent": {
         "provider": LLMProvider.GROQ,
         "model_name": "openai/gpt-oss-120b",
-        "temperature": 0.7
+        "temperature": 0.7,
+        "fallbacks": GPT_OSS_FALLBACKS,
+        "hedge": True
     },
     "mcp_agent": {
         "provider": LLMProvider.NVIDIA_NIM,
@@ -50,17 +63,22 @@ DEFAULT_AGENTS_CONFIG = {
     "analyzer": {
         "provider": LLMProvider.GROQ,
         "model_name": "openai/gpt-oss-120b",
-        "temperature": 0.7
+        "temperature": 0.7,
+        "fallbacks": GPT_OSS_FALLBACKS,
+        "hedge": True,
+        "response_cache": False
     },
     "memory_extractor": {
         "provider": LLMProvider.GROQ,
         "model_name": "openai/gpt-oss-120b",
-        "temperature": 0.3
+        "temperature": 0.3,
+        "fallbacks": GPT_OSS_FALLBACKS
     },
     "interviewer": {
         "provider": LLMProvider.GROQ,
         "model_name": "openai/gpt-oss-120b",
-        "temperature": 0.7
+        "temperature": 0.7,
+        "fallbacks": GPT_OSS_FALLBACKS
     }
 }
 
@@ -85,6 +103,18 @@ class ConfigManager:
         self._initialized = True
         self._db_collection_name = 'settings'
         self._config_doc_name = "agent_configurations"
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """Register callback(agent_names) called when agent configurations change."""
+        self._listeners.append(callback)
+
+    def _notify(self, agent_names):
+        for callback in self._listeners:
+            try:
+                callback(agent_names)
+            except Exception as e:
+                logger.error(f"Config change listener failed: {e}")
 
     async def load_config(self):
         """
@@ -108,6 +138,7 @@ class ConfigManager:
                 db_config = doc["config"]
                 for agent, settings in db_config.items():
                     self.config[agent] = settings
+                self._notify(list(db_config))
             else:
                 logger.info("No agent configurations found in database. Using defaults.")
                 # Optionally seed the DB with defaults?
@@ -136,7 +167,10 @@ class ConfigManager:
         """
         try:
             # Validate or sanitize new_config here if necessary
+            changed = [agent for agent, settings in new_config.items() if self.config.get(agent) != settings]
             self.config.update(new_config)
+            if changed:
+                self._notify(changed)
             
             if not mongo.client:
                 logger.warning("MongoDB client not connected. Config updated in memory only.")
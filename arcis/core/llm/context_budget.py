@@ -0,0 +1,195 @@
+import json
+
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import HumanMessage, AIMessage
+
+from arcis import Config
+from arcis.core.llm.config_manager import config_manager
+from arcis.logger import LOGGER
+
+
+# context keys that stay the same for the whole run, rendered before step outputs
+STABLE_CONTEXT_KEYS = ("long_term_memory",)
+
+CHARS_PER_TOKEN = 4       # estimate when no tokenizer is available
+COMPACT_TOKENS = 60       # excerpt kept of old step outputs / messages once over budget
+SIZE_LOG_EVERY = 50       # calls between prompt size distribution logs per agent
+
+_encoding = None
+_encoding_failed = False
+
+
+def _get_encoding():
+    """Lazy-load the tiktoken encoding (optional, comes with langchain-openai)."""
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            _encoding_failed = True
+            LOGGER.warning(f"Context budget: tokenizer unavailable, estimating tokens from characters: {e}")
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Keep the head and tail of `text` within max_tokens, marking what was cut."""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    encoding = _get_encoding()
+    head_tokens = max_tokens * 2 // 3
+    tail_tokens = max_tokens - head_tokens
+    if encoding is None:
+        head = text[:head_tokens * CHARS_PER_TOKEN]
+        tail = text[len(text) - tail_tokens * CHARS_PER_TOKEN:] if tail_tokens else ""
+        cut = (len(text) - len(head) - len(tail)) // CHARS_PER_TOKEN
+    else:
+        tokens = encoding.encode(text, disallowed_special=())
+        head = encoding.decode(tokens[:head_tokens])
+        tail = encoding.decode(tokens[len(tokens) - tail_tokens:]) if tail_tokens else ""
+        cut = len(tokens) - head_tokens - tail_tokens
+    return f"{head}\n…[{cut} tokens omitted]…\n{tail}" if tail else f"{head}…[{cut} tokens omitted]"
+
+
+def render_value(value: Any) -> str:
+    """Render a prompt value the same way every time (no repr, sorted dict keys)."""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, sort_keys=True, ensure_ascii=False, indent=2, default=str)
+    return str(value)
+
+
+def agent_budget(agent_name: str) -> int:
+    """Token budget for the dynamic sections of an agent prompt ("context_budget" in the agent config)."""
+    return config_manager.get_candidate_config(agent_name).get("context_budget") or Config.CONTEXT_BUDGET_TOKENS
+
+
+def render_context(context: Optional[Dict[str, Any]], budget: Optional[int] = None) -> str:
+    """
+    Render the shared step context as one block per entry. Run-wide entries
+    (memories) come first, step outputs follow in the order they were added,
+    so the block only grows at the end as the plan advances.
+
+    Every entry is capped at CONTEXT_ENTRY_MAX_TOKENS. When the blocks still
+    exceed `budget`, the oldest step outputs are cut down to a short excerpt,
+    and dropped if that is not enough; the latest outputs stay intact.
+    """
+    if not context:
+        return "(No context yet)"
+    keys = [k for k in STABLE_CONTEXT_KEYS if k in context]
+    keys += [k for k in context if k not in STABLE_CONTEXT_KEYS]
+
+    blocks = [
+        (key, f"[{key}]\n{truncate_tokens(render_value(context[key]), Config.CONTEXT_ENTRY_MAX_TOKENS)}")
+        for key in keys
+    ]
+    if budget is None:
+        return "\n\n".join(block for _, block in blocks)
+
+    sizes = [count_tokens(block) for _, block in blocks]
+    total = sum(sizes)
+    compactable = [i for i, (key, _) in enumerate(blocks) if key not in STABLE_CONTEXT_KEYS][:-1]
+
+    for i in compactable:
+        if total <= budget:
+            break
+        key = blocks[i][0]
+        compact = f"[{key}]\n{truncate_tokens(render_value(context[key]), COMPACT_TOKENS)}"
+        total -= sizes[i] - count_tokens(compact)
+        blocks[i] = (key, compact)
+    for i in compactable:
+        if total <= budget:
+            break
+        total -= count_tokens(blocks[i][1])
+        blocks[i] = (blocks[i][0], None)
+
+    dropped = sum(1 for _, block in blocks if block is None)
+    rendered = [block for _, block in blocks if block is not None]
+    if dropped:
+        rendered.insert(len([k for k in keys if k in STABLE_CONTEXT_KEYS]), f"({dropped} earlier step outputs omitted)")
+    return "\n\n".join(rendered)
+
+
+def format_history(messages: list, budget: int, max_turns: int = 10) -> str:
+    """
+    Format recent messages into a readable conversation string for the prompt.
+
+    The newest messages are kept verbatim; older ones are shortened to an
+    excerpt, then left out once the history reaches `budget` tokens.
+    """
+    recent = [m for m in messages[-max_turns:] if isinstance(m, (HumanMessage, AIMessage))] if messages else []
+    if not recent:
+        return "(No prior conversation)"
+
+    lines: List[str] = []
+    used = 0
+    for msg in reversed(recent):
+        role = "User" if isinstance(msg, HumanMessage) else "Assistant"
+        content = truncate_tokens(render_value(msg.content), Config.CONTEXT_ENTRY_MAX_TOKENS)
+        line = f"{role}: {content}"
+        size = count_tokens(line)
+        if used + size > budget:
+            line = f"{role}: {truncate_tokens(content, COMPACT_TOKENS)}"
+            size = count_tokens(line)
+            if used + size > budget:
+                break
+        lines.append(line)
+        used += size
+
+    omitted = len(recent) - len(lines)
+    if omitted:
+        lines.append(f"({omitted} earlier messages omitted)")
+    return "\n".join(reversed(lines))
+
+
+class PromptSizeTracker:
+    """Recent prompt sizes (tokens) per agent, logged as a distribution every SIZE_LOG_EVERY calls."""
+
+    def __init__(self, window: int = 500):
+        self._samples: Dict[str, deque] = {}
+        self._calls: Dict[str, int] = {}
+        self._window = window
+
+    def record(self, agent_name: str, tokens: int):
+        self._samples.setdefault(agent_name, deque(maxlen=self._window)).append(tokens)
+        self._calls[agent_name] = self._calls.get(agent_name, 0) + 1
+        if self._calls[agent_name] % SIZE_LOG_EVERY == 0:
+            stats = self._summary(self._samples[agent_name])
+            LOGGER.info(
+                f"Prompt sizes for {agent_name} (last {stats['samples']}): "
+                f"p50 {stats['p50']}, p90 {stats['p90']}, max {stats['max']} tokens"
+            )
+
+    @staticmethod
+    def _summary(samples: deque) -> Dict[str, int]:
+        ordered = sorted(samples)
+        return {
+            "samples": len(ordered),
+            "p50": ordered[len(ordered) // 2],
+            "p90": ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))],
+            "max": ordered[-1],
+        }
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            agent_name: {**self._summary(samples), "calls": self._calls[agent_name]}
+            for agent_name, samples in self._samples.items() if samples
+        }
+
+
+prompt_sizes = PromptSizeTracker()
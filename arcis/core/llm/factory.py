@@ -1,3 +1,8 @@
+import json
+import httpx
+
+from typing import Any, Dict, Tuple
+
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_openai import ChatOpenAI
 from langchain_mistralai import ChatMistralAI
@@ -7,9 +12,24 @@ from arcis.models.errors import InvalidAPIKey
 from arcis.models.llm import LLMProvider
 from arcis import Config
 from arcis.core.llm.config_manager import config_manager
+from arcis.core.llm.resilience import ResilientLLM, llm_choice
+from arcis.logger import LOGGER
+
+
+# keep-alive pools shared by every OpenAI compatible client of the same endpoint
+HTTP_POOL_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60)
 
 
 class LLMFactory:
+
+    # (provider, model, temperature, extra kwargs) -> client
+    _clients: Dict[Tuple, Any] = {}
+    # agent -> cache keys it resolved to, used for invalidation on config changes
+    _agent_keys: Dict[str, set] = {}
+    # invalidated clients, may still be serving in-flight calls; closed on shutdown
+    _retired: list = []
+    # base_url -> (sync, async) httpx clients
+    _http_pools: Dict[str, Tuple[httpx.Client, httpx.AsyncClient]] = {}
     
     @staticmethod
     def get_model_config(agent_name: str) -> dict:
@@ -19,25 +39,123 @@ class LLMFactory:
         """
         return config_manager.get_candidate_config(agent_name)
 
+    @staticmethod
+    def _cached_client(agent_name: str, provider: LLMProvider, model_name: str, temperature: float, **kwargs):
+        key = (provider, model_name, temperature, json.dumps(kwargs, sort_keys=True, default=str))
+        LLMFactory._agent_keys.setdefault(agent_name, set()).add(key)
+
+        client = LLMFactory._clients.get(key)
+        if client is None:
+            LOGGER.debug(f"LLMFactory: creating {provider.value}/{model_name} client for {agent_name}")
+            client = LLMFactory.create_client(
+                provider=provider,
+                model_name=model_name,
+                temperature=temperature,
+                **kwargs
+            )
+            LLMFactory._clients[key] = client
+        return client
+
     @staticmethod
     def get_client_for_agent(agent_name: str, **kwargs):
         """
         Factory method to get the correct LLM client for a specific agent based on configuration.
+        Clients are cached and shared, so callers must not mutate them (bind/with_structured_output
+        return new runnables and are fine).
+
+        Agents configured with `fallbacks` get a ResilientLLM chain: links before the last one
+        fail fast (no SDK retries, short timeout) so the next provider takes over quickly.
         """
         config = LLMFactory.get_model_config(agent_name)
+        # an explicit provider/model override means exactly that model
+        fallbacks = [] if ("provider" in kwargs or "model_name" in kwargs) else (config.get("fallbacks") or [])
         
         # Override config with kwargs if provided
-        provider = kwargs.pop("provider", config["provider"])
+        provider = LLMProvider(kwargs.pop("provider", config["provider"]))
         model_name = kwargs.pop("model_name", config["model_name"])
         temperature = kwargs.pop("temperature", config.get("temperature", 0.7))
-        
-        return LLMFactory.create_client(
-            provider=provider,
-            model_name=model_name,
-            temperature=temperature,
-            **kwargs
+
+        # recorded with the token usage, replaced by the route that actually answered
+        llm_choice.set({"provider": provider.value, "model_name": model_name, "fallback": False, "hedged": False})
+
+        if not fallbacks:
+            # single link chain, still goes through the rate limiter
+            return ResilientLLM(
+                runnable=LLMFactory._cached_client(agent_name, provider, model_name, temperature, **kwargs),
+                fallbacks=[],
+                routes=[{"provider": provider.value, "model_name": model_name}],
+            )
+
+        chain = [(provider, model_name, temperature)] + [
+            (LLMProvider(link["provider"]), link["model_name"], link.get("temperature") if link.get("temperature") is not None else temperature)
+            for link in fallbacks
+        ]
+        clients, routes = [], []
+        for idx, (link_provider, link_model, link_temperature) in enumerate(chain):
+            link_kwargs = kwargs if idx == len(chain) - 1 else {
+                **kwargs, "max_retries": 0, "timeout": Config.LLM_FAILOVER_TIMEOUT
+            }
+            try:
+                clients.append(LLMFactory._cached_client(
+                    agent_name, link_provider, link_model, link_temperature, **link_kwargs
+                ))
+            except InvalidAPIKey as e:
+                LOGGER.warning(f"LLMFactory: skipping {link_provider.value}/{link_model} for {agent_name}: {e}")
+                continue
+            routes.append({"provider": link_provider.value, "model_name": link_model})
+
+        if not clients:
+            raise InvalidAPIKey(f"No provider with a valid API Key configured for {agent_name}")
+
+        return ResilientLLM(
+            runnable=clients[0],
+            fallbacks=clients[1:],
+            routes=routes,
+            hedge=config.get("hedge", False),
         )
 
+    @staticmethod
+    def invalidate_agents(agent_names):
+        """Drop cached clients of agents whose configuration changed (unless another agent still uses them)."""
+        stale = set()
+        for agent_name in agent_names:
+            stale |= LLMFactory._agent_keys.pop(agent_name, set())
+        in_use = set().union(*LLMFactory._agent_keys.values())
+
+        for key in stale - in_use:
+            client = LLMFactory._clients.pop(key, None)
+            if client is not None:
+                LLMFactory._retired.append(client)
+        LOGGER.info(f"LLMFactory: invalidated clients for {sorted(agent_names)}")
+
+    @staticmethod
+    def _http_pool(base_url: str) -> Tuple[httpx.Client, httpx.AsyncClient]:
+        if base_url not in LLMFactory._http_pools:
+            LLMFactory._http_pools[base_url] = (
+                httpx.Client(base_url=base_url, limits=HTTP_POOL_LIMITS),
+                httpx.AsyncClient(base_url=base_url, limits=HTTP_POOL_LIMITS),
+            )
+        return LLMFactory._http_pools[base_url]
+
+    @staticmethod
+    async def aclose():
+        """Close every cached client and HTTP pool (app shutdown)."""
+        clients = list(LLMFactory._clients.values()) + LLMFactory._retired
+        LLMFactory._clients.clear()
+        LLMFactory._agent_keys.clear()
+        LLMFactory._retired = []
+
+        for client in clients:
+            # pools owned by provider SDKs (the OpenAI compatible ones are closed below)
+            async_client = getattr(client, "async_client", None)
+            if isinstance(async_client, httpx.AsyncClient):
+                await async_client.aclose()
+
+        for sync_pool, async_pool in LLMFactory._http_pools.values():
+            sync_pool.close()
+            await async_pool.aclose()
+        LLMFactory._http_pools.clear()
+
     @staticmethod
     def create_client(provider: LLMProvider, **kwargs):
         if provider == LLMProvider.GEMINI:
@@ -48,8 +166,8 @@ class LLMFactory:
                 model=kwargs.get("model_name", "gemini-1.5-flash"),
                 temperature=kwargs.get("temperature", 0.7),
                 google_api_key=Config.GEMINI_API,
-                max_retries=3,
-                timeout=30,
+                max_retries=kwargs.get("max_retries", 3),
+                timeout=kwargs.get("timeout", 30),
             )
 
         elif provider == LLMProvider.OPENROUTER:
@@ -61,8 +179,10 @@ class LLMFactory:
                 temperature=kwargs.get("temperature", 0.7),
                 api_key=Config.OPENROUTER_API_KEY,
                 base_url="https://openrouter.ai/api/v1",
-                max_retries=3,
-                timeout=30,
+                max_retries=kwargs.get("max_retries", 3),
+                timeout=kwargs.get("timeout", 30),
+                http_client=LLMFactory._http_pool("https://openrouter.ai/api/v1")[0],
+                http_async_client=LLMFactory._http_pool("https://openrouter.ai/api/v1")[1],
                 default_headers={
                     "HTTP-Referer": kwargs.get("referer", "https://test.itsvinayak.eu.org"),
                     "X-Title": kwargs.get("app_name", "Arcis"),
@@ -87,8 +207,8 @@ class LLMFactory:
                 model=kwargs.get("model_name", "mistral-small-latest"),
                 temperature=kwargs.get("temperature", 0.7),
                 mistral_api_key=api_key,
-                max_retries=3,
-                timeout=30,
+                max_retries=kwargs.get("max_retries", 3),
+                timeout=kwargs.get("timeout", 30),
             )
 
         elif provider == LLMProvider.CEREBRAS:
@@ -106,8 +226,10 @@ class LLMFactory:
                 temperature=kwargs.get("temperature", 0.7),
                 api_key=api_key,
                 base_url="https://api.cerebras.ai/v1",
-                max_retries=3,
-                timeout=30,
+                max_retries=kwargs.get("max_retries", 3),
+                timeout=kwargs.get("timeout", 30),
+                http_client=LLMFactory._http_pool("https://api.cerebras.ai/v1")[0],
+                http_async_client=LLMFactory._http_pool("https://api.cerebras.ai/v1")[1],
             )
 
         elif provider == LLMProvider.GROQ:
@@ -125,8 +247,10 @@ class LLMFactory:
                 temperature=kwargs.get("temperature", 0.7),
                 api_key=api_key,
                 base_url="https://api.groq.com/openai/v1",
-                max_retries=3,
-                timeout=30,
+                max_retries=kwargs.get("max_retries", 3),
+                timeout=kwargs.get("timeout", 30),
+                http_client=LLMFactory._http_pool("https://api.groq.com/openai/v1")[0],
+                http_async_client=LLMFactory._http_pool("https://api.groq.com/openai/v1")[1],
             )
 
         elif provider == LLMProvider.NVIDIA_NIM:
@@ -147,3 +271,6 @@ class LLMFactory:
 
         else:
             raise ValueError(f"Unknown provider: {provider}")
+
+
+config_manager.add_listener(LLMFactory.invalidate_agents)
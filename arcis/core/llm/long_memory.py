@@ -37,6 +37,7 @@ class LongTermMemory:
         self._embed_fn = None
         self._embed_mode: str = "offline"  # "offline" or "online"
         self._embed_dim: int = EMBEDDING_DIM_FASTEMBED
+        self._listeners = []
 
     def init(self, mode: str = "offline"):
         """
@@ -91,6 +92,11 @@ class LongTermMemory:
             LOGGER.info(f"Created Qdrant collection: {COLLECTION_NAME}")
 
 
+    @property
+    def embeddings_ready(self) -> bool:
+        return self._embed_fn is not None or hasattr(self, "_gemini_client")
+
+
     def embed(self, texts: list[str]) -> list[list[float]]:
         if self._embed_mode == "online":
             return self._embed_gemini(texts)
@@ -110,6 +116,18 @@ class LongTermMemory:
         return [e.values for e in result.embeddings]
 
 
+    def add_listener(self, callback):
+        """Register callback() called after memories are stored or deleted."""
+        self._listeners.append(callback)
+
+    def _notify(self):
+        for callback in self._listeners:
+            try:
+                callback()
+            except Exception as e:
+                LOGGER.error(f"Memory change listener failed: {e}")
+
+
     def store(self, text: str, category: str = "key_detail", metadata: dict | None = None, source: str = "system") -> str:
         """
         Store a fact/memory into Qdrant.
@@ -135,6 +153,7 @@ class LongTermMemory:
             points=[PointStruct(id=point_id, vector=vector, payload=payload)],
         )
         LOGGER.debug(f"Stored memory [{category}]: {text[:80]}...")
+        self._notify()
         return point_id
 
 
@@ -170,6 +189,7 @@ class LongTermMemory:
 
         self.client.upsert(collection_name=COLLECTION_NAME, points=points)
         LOGGER.debug(f"Stored {len(points)} memories in bulk")
+        self._notify()
         return point_ids
 
 
@@ -219,6 +239,7 @@ class LongTermMemory:
             points_selector=[point_id],
         )
         LOGGER.debug(f"Deleted memory: {point_id}")
+        self._notify()
 
 
 long_memory = LongTermMemory()
@@ -1,8 +1,7 @@
-from langchain_core.prompts import ChatPromptTemplate
-
 from arcis.core.llm.factory import LLMFactory
 from arcis.core.llm.long_memory import long_memory
 from arcis.core.llm.prompts import MEMORY_EXTRACTOR_PROMPT
+from arcis.core.llm.prompt_builder import PromptBuilder
 from arcis.core.utils.token_tracker import save_token_usage
 
 from arcis.models.agents.response import MemoryExtractionModel
@@ -11,6 +10,7 @@ from arcis.utils.text import format_messages
 from arcis.logger import LOGGER
 
 
+extractor_prompt = PromptBuilder("memory_extractor", MEMORY_EXTRACTOR_PROMPT, sections=[("conversation", "Conversation")])
 
 
 async def extract_and_store(messages: list, source: str = "conversation") -> list[dict]:
@@ -32,14 +32,9 @@ async def extract_and_store(messages: list, source: str = "conversation") -> lis
 
     conversation_text = format_messages(messages)
 
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", MEMORY_EXTRACTOR_PROMPT),
-        ("human", "{conversation}")
-    ])
-
     llm = LLMFactory.get_client_for_agent("memory_extractor")
     memory_llm = llm.with_structured_output(MemoryExtractionModel, include_raw=True)
-    formatted = prompt.format_messages(conversation=conversation_text)
+    formatted = extractor_prompt.format_messages(conversation=conversation_text)
 
     try:
         response = await memory_llm.ainvoke(formatted)
@@ -0,0 +1,53 @@
+from typing import Any, List, Optional, Sequence, Tuple
+
+from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage
+
+from arcis.core.llm.context_budget import render_value, count_tokens, prompt_sizes
+
+
+class PromptBuilder:
+    """
+    Prompt layout of one agent: a static system prompt followed by a single
+    human message with named sections in a fixed order.
+
+    Providers cache prompts by exact prefix, so the system message is built
+    once and reused byte for byte, and sections are declared from the most
+    to the least stable (e.g. context before the current task) so consecutive
+    calls share as much of the prompt as possible. Values are rendered with
+    render_value, never with str() on dicts. Prompt sizes are recorded in
+    prompt_sizes; keeping sections within budget is up to the caller (see
+    context_budget).
+    """
+
+    def __init__(self, agent_name: str, system_prompt: str, sections: Sequence[Tuple[str, str]], instruction: str = ""):
+        """
+        Args:
+            agent_name: Agent the prompt belongs to (for errors and prompt size stats).
+            system_prompt: Static system prompt from core/llm/prompts.py.
+            sections: (key, title) pairs in prompt order; values are passed
+                      to format_messages by key.
+            instruction: Static closing line of the human message.
+        """
+        self.agent_name = agent_name
+        self.sections = list(sections)
+        self.instruction = instruction
+        self.system_message = SystemMessage(content=system_prompt)
+        self._system_tokens: Optional[int] = None
+
+    def format_messages(self, **values: Any) -> List[BaseMessage]:
+        missing = [key for key, _ in self.sections if key not in values]
+        if missing:
+            raise KeyError(f"{self.agent_name} prompt is missing sections: {missing}")
+
+        blocks = [f"{title}:\n{render_value(values[key])}" for key, title in self.sections]
+        if self.instruction:
+            blocks.append(self.instruction)
+
+        human = "\n\n".join(blocks)
+        if self._system_tokens is None:
+            self._system_tokens = count_tokens(self.system_message.content)
+        prompt_sizes.record(self.agent_name, self._system_tokens + count_tokens(human))
+
+        # copy so callers appending tool turns never touch the shared prefix
+        return [self.system_message.model_copy(), HumanMessage(content=human)]
+
@@ -0,0 +1,220 @@
+import time
+import asyncio
+import logging
+
+from typing import Any, Dict, Optional
+
+from langchain_core.messages import BaseMessage
+from langchain_core.prompt_values import PromptValue
+
+from arcis.database.mongo.connection import mongo, COLLECTIONS
+
+logger = logging.getLogger(__name__)
+
+# Per-minute limits keyed by "provider" or "provider/model" (model entries win).
+# Provider entries apply to each of its models separately, as providers count per model.
+# Starting points close to the free tiers, adjust through /settings/rate-limits.
+DEFAULT_RATE_LIMITS = {
+    "groq": {"rpm": 30, "tpm": 8000},
+    "cerebras": {"rpm": 30, "tpm": 60000},
+    "openrouter": {"rpm": 20, "tpm": None},
+    "mistral": {"rpm": 60, "tpm": 500000},
+    "gemini": {"rpm": 15, "tpm": 1000000},
+    "nvidia_nim": {"rpm": 40, "tpm": None},
+}
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(input: Any) -> int:
+    """Rough prompt size (chars / 4) of a chat model input, before the call is made."""
+    if isinstance(input, PromptValue):
+        input = input.to_messages()
+    if isinstance(input, BaseMessage):
+        input = [input]
+    if isinstance(input, list):
+        chars = sum(len(str(m.content if isinstance(m, BaseMessage) else m)) for m in input)
+    else:
+        chars = len(str(input))
+    return chars // CHARS_PER_TOKEN + 1
+
+
+def usage_tokens(output: Any) -> Optional[int]:
+    """Actual total tokens of a call result (plain message or structured output with include_raw)."""
+    if isinstance(output, dict):
+        output = output.get("raw")
+    usage = getattr(output, "usage_metadata", None)
+    return usage.get("total_tokens") if usage else None
+
+
+class _Bucket:
+    """
+    Token buckets for requests and tokens of one provider/model. Waiting
+    callers queue on an asyncio.Lock, which wakes them in arrival order, so
+    agents are served first come first served instead of racing each other.
+    """
+
+    def __init__(self, rpm: Optional[int], tpm: Optional[int]):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = float(rpm or 0)
+        self.tokens = float(tpm or 0)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+        self.calls = 0
+        self.throttled = 0
+        self.waiting = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.updated
+        self.updated = now
+        if self.rpm:
+            self.requests = min(self.rpm, self.requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self.tokens = min(self.tpm, self.tokens + elapsed * self.tpm / 60)
+
+    def _time_until(self, tokens: int) -> float:
+        """Seconds until one request of `tokens` fits in both budgets."""
+        self._refill()
+        wait = 0.0
+        if self.rpm and self.requests < 1:
+            wait = max(wait, (1 - self.requests) * 60 / self.rpm)
+        if self.tpm and self.tokens < tokens:
+            wait = max(wait, (tokens - self.tokens) * 60 / self.tpm)
+        return wait
+
+    async def acquire(self, tokens: int) -> float:
+        if self.tpm:
+            tokens = min(tokens, self.tpm)  # a huge prompt must still get through eventually
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            async with self.lock:
+                while (wait := self._time_until(tokens)) > 0:
+                    await asyncio.sleep(wait)
+                if self.rpm:
+                    self.requests -= 1
+                if self.tpm:
+                    self.tokens -= tokens
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - started
+        self.calls += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        if waited > 0.01:
+            self.throttled += 1
+        return waited
+
+    def settle(self, reserved: int, actual: int):
+        """Correct the token budget once the real usage is known (may go into debt)."""
+        if self.tpm:
+            self._refill()
+            self.tokens -= actual - reserved
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rpm": self.rpm,
+            "tpm": self.tpm,
+            "calls": self.calls,
+            "throttled": self.throttled,
+            "queued": self.waiting,
+            "avg_wait_ms": round(self.wait_total / self.calls * 1000, 1) if self.calls else 0.0,
+            "max_wait_ms": round(self.wait_max * 1000, 1),
+        }
+
+
+class RateLimiter:
+    """
+    Client side requests/min and tokens/min limits per provider and model,
+    shared by every LLM call in the process (see ResilientLLM). Limits are
+    loaded from and persisted to the settings collection.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(RateLimiter, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self.limits: Dict[str, Dict[str, Optional[int]]] = {k: dict(v) for k, v in DEFAULT_RATE_LIMITS.items()}
+        self._buckets: Dict[str, _Bucket] = {}
+        self._initialized = True
+        self._config_doc_name = "rate_limits"
+
+    def _limit_key(self, provider: str, model_name: str) -> Optional[str]:
+        for key in (f"{provider}/{model_name}", provider):
+            if key in self.limits:
+                return key
+        return None
+
+    def _bucket(self, provider: str, model_name: str) -> Optional[_Bucket]:
+        route = f"{provider}/{model_name}"
+        if route not in self._buckets:
+            key = self._limit_key(provider, model_name)
+            if key is None:
+                return None
+            self._buckets[route] = _Bucket(self.limits[key].get("rpm"), self.limits[key].get("tpm"))
+        return self._buckets[route]
+
+    async def acquire(self, provider: str, model_name: str, tokens: int) -> float:
+        """Wait until the call fits the provider/model budget; returns the time spent queued."""
+        bucket = self._bucket(provider, model_name)
+        if bucket is None:
+            return 0.0
+        waited = await bucket.acquire(tokens)
+        if waited > 1:
+            logger.info(f"Rate limiter: {provider}/{model_name} call waited {waited:.1f}s")
+        return waited
+
+    def settle(self, provider: str, model_name: str, reserved: int, actual: Optional[int]):
+        bucket = self._bucket(provider, model_name)
+        if bucket is not None and actual is not None:
+            bucket.settle(reserved, actual)
+
+    def stats(self) -> Dict[str, Any]:
+        return {key: bucket.stats() for key, bucket in self._buckets.items()}
+
+    async def load_limits(self):
+        try:
+            if not mongo.client:
+                logger.warning("MongoDB client not connected. Using default rate limits.")
+                return
+            doc = await mongo.db[COLLECTIONS['settings']].find_one({"name": self._config_doc_name})
+            if doc and "limits" in doc:
+                # stored as a list, model names contain dots which Mongo keys shouldn't
+                self.limits.update({
+                    entry["key"]: {"rpm": entry.get("rpm"), "tpm": entry.get("tpm")}
+                    for entry in doc["limits"]
+                })
+                self._buckets.clear()
+                logger.info("Loaded LLM rate limits from database.")
+        except Exception as e:
+            logger.error(f"Failed to load rate limits from database: {e}. Using defaults.")
+
+    async def update_limits(self, new_limits: Dict[str, Dict[str, Optional[int]]]):
+        """Update limits in memory and persist them; buckets are rebuilt with the new limits."""
+        self.limits.update(new_limits)
+        self._buckets.clear()
+
+        if not mongo.client:
+            logger.warning("MongoDB client not connected. Rate limits updated in memory only.")
+            return
+        await mongo.db[COLLECTIONS['settings']].update_one(
+            {"name": self._config_doc_name},
+            {"$set": {"limits": [{"key": key, **limit} for key, limit in self.limits.items()]}},
+            upsert=True
+        )
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,222 @@
+import time
+import asyncio
+
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from langchain_core.runnables import Runnable
+from langchain_core.runnables.fallbacks import RunnableWithFallbacks
+
+from arcis import Config
+from arcis.core.llm.rate_limiter import rate_limiter, estimate_tokens, usage_tokens
+from arcis.logger import LOGGER
+
+
+# provider/model that answered the latest LLM call of the current task,
+# picked up by save_token_usage
+llm_choice: ContextVar[Optional[Dict[str, Any]]] = ContextVar("llm_choice", default=None)
+
+
+class LatencyTracker:
+    """Recent successful call latencies per provider/model, used to decide when to hedge."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Dict[str, deque] = {}
+        self._window = window
+
+    def record(self, route: str, seconds: float):
+        self._samples.setdefault(route, deque(maxlen=self._window)).append(seconds)
+
+    def percentile(self, route: str, q: float) -> Optional[float]:
+        samples = self._samples.get(route)
+        if not samples or len(samples) < Config.LLM_HEDGE_MIN_SAMPLES:
+            return None  # not enough data, don't hedge yet
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {
+            route: {
+                "samples": len(samples),
+                "p50_s": round(sorted(samples)[len(samples) // 2], 3),
+                f"p{Config.LLM_HEDGE_PERCENTILE}_s": round(self.percentile(route, Config.LLM_HEDGE_PERCENTILE) or 0.0, 3),
+            }
+            for route, samples in self._samples.items() if samples
+        }
+
+
+latency_tracker = LatencyTracker()
+
+
+def route_label(route: Dict[str, Any]) -> str:
+    return f"{route['provider']}/{route['model_name']}"
+
+
+class ResilientLLM(RunnableWithFallbacks):
+    """
+    Fallback chain of chat models (primary first), possibly of length one.
+    Every call waits for the client side rate limiter of the route it calls.
+
+    ainvoke fails over to the next model as soon as one raises, and with
+    `hedge` enabled also starts the next model when the running one is slower
+    than its usual latency percentile; the first answer wins and the other
+    call is cancelled. astream fails over until a model yields its first
+    chunk (no hedging, streamed output can't be taken back). abatch runs
+    ainvoke per input. The synchronous invoke / stream / batch fail over the
+    same way without hedging; the rate limiter is async only, so they don't
+    wait for it (every agent in the app calls the async methods).
+    bind_tools / with_structured_output are applied to every model in the
+    chain (see RunnableWithFallbacks.__getattr__).
+    """
+
+    routes: List[Dict[str, Any]]
+    hedge: bool = False
+
+    async def _reserve(self, route: Dict[str, Any], input) -> int:
+        # reserve the prompt plus an output allowance, corrected with the real usage afterwards
+        reserved = estimate_tokens(input) + Config.LLM_RATE_OUTPUT_TOKENS
+        await rate_limiter.acquire(route["provider"], route["model_name"], reserved)
+        return reserved
+
+    async def _call_route(self, idx: int, runnable, input, config, **kwargs):
+        route = self.routes[idx]
+        reserved = await self._reserve(route, input)
+
+        started = time.perf_counter()
+        output = await runnable.ainvoke(input, config, **kwargs)
+        latency_tracker.record(route_label(route), time.perf_counter() - started)
+        rate_limiter.settle(route["provider"], route["model_name"], reserved, usage_tokens(output))
+        return output
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        runnables = list(self.runnables)
+        pending: Dict[asyncio.Task, int] = {}
+        started = 0
+        first_error = None
+
+        def launch():
+            nonlocal started
+            task = asyncio.create_task(self._call_route(started, runnables[started], input, config, **kwargs))
+            pending[task] = started
+            started += 1
+
+        launch()
+        try:
+            while pending:
+                hedge_delay = None
+                if self.hedge and started < len(runnables) and len(pending) == 1:
+                    hedge_delay = latency_tracker.percentile(
+                        route_label(self.routes[started - 1]), Config.LLM_HEDGE_PERCENTILE
+                    )
+
+                done, _ = await asyncio.wait(pending, timeout=hedge_delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    LOGGER.info(
+                        f"LLM hedge: {route_label(self.routes[started - 1])} slower than "
+                        f"{hedge_delay:.2f}s, also trying {route_label(self.routes[started])}"
+                    )
+                    launch()
+                    continue
+
+                for task in done:
+                    idx = pending.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        llm_choice.set({
+                            **self.routes[idx],
+                            "fallback": idx > 0,
+                            "hedged": started > idx + 1 or len(pending) > 0,
+                        })
+                        return task.result()
+
+                    if not isinstance(error, self.exceptions_to_handle):
+                        raise error
+                    first_error = first_error or error
+                    LOGGER.warning(f"LLM call to {route_label(self.routes[idx])} failed: {error}")
+
+                # fail over right away instead of waiting for the hedge delay
+                if not pending and started < len(runnables):
+                    launch()
+
+            raise first_error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def astream(self, input, config=None, **kwargs):
+        first_error = None
+        for idx, runnable in enumerate(self.runnables):
+            route = self.routes[idx]
+            reserved = await self._reserve(route, input)
+            started = time.perf_counter()
+            stream = runnable.astream(input, config, **kwargs)
+            try:
+                chunk = await anext(stream)
+            except StopAsyncIteration:
+                return
+            except self.exceptions_to_handle as error:
+                first_error = first_error or error
+                LOGGER.warning(f"LLM stream from {route_label(route)} failed: {error}")
+                continue
+
+            llm_choice.set({**route, "fallback": idx > 0, "hedged": False})
+            yield chunk
+            output = chunk
+            async for chunk in stream:
+                yield chunk
+                try:
+                    output = output + chunk
+                except TypeError:
+                    output = None
+            latency_tracker.record(route_label(route), time.perf_counter() - started)
+            rate_limiter.settle(route["provider"], route["model_name"], reserved, usage_tokens(output))
+            return
+
+        raise first_error
+
+    async def abatch(self, inputs, config=None, *, return_exceptions: bool = False, **kwargs):
+        configs = config if isinstance(config, list) else [config] * len(inputs)
+        return await asyncio.gather(
+            *(self.ainvoke(input, cfg, **kwargs) for input, cfg in zip(inputs, configs)),
+            return_exceptions=return_exceptions
+        )
+
+    def invoke(self, input, config=None, **kwargs):
+        first_error = None
+        for idx, runnable in enumerate(self.runnables):
+            route = self.routes[idx]
+            started = time.perf_counter()
+            try:
+                output = runnable.invoke(input, config, **kwargs)
+            except self.exceptions_to_handle as error:
+                first_error = first_error or error
+                LOGGER.warning(f"LLM call to {route_label(route)} failed: {error}")
+                continue
+            latency_tracker.record(route_label(route), time.perf_counter() - started)
+            llm_choice.set({**route, "fallback": idx > 0, "hedged": False})
+            return output
+        raise first_error
+
+    def stream(self, input, config=None, **kwargs):
+        first_error = None
+        for idx, runnable in enumerate(self.runnables):
+            route = self.routes[idx]
+            stream = runnable.stream(input, config, **kwargs)
+            try:
+                chunk = next(stream)
+            except StopIteration:
+                return
+            except self.exceptions_to_handle as error:
+                first_error = first_error or error
+                LOGGER.warning(f"LLM stream from {route_label(route)} failed: {error}")
+                continue
+            llm_choice.set({**route, "fallback": idx > 0, "hedged": False})
+            yield chunk
+            yield from stream
+            return
+        raise first_error
+
+    def batch(self, inputs, config=None, *, return_exceptions: bool = False, **kwargs):
+        # Runnable.batch runs self.invoke per input on a thread pool
+        return Runnable.batch(self, inputs, config, return_exceptions=return_exceptions, **kwargs)
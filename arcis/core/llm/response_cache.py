@@ -0,0 +1,162 @@
+import re
+import time
+import asyncio
+import hashlib
+import unicodedata
+import numpy as np
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from arcis import Config
+from arcis.core.llm.config_manager import config_manager
+from arcis.core.llm.long_memory import long_memory
+from arcis.logger import LOGGER
+
+
+def normalise_text(text: str) -> str:
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip().lower()
+
+
+def memory_fingerprint(texts) -> str:
+    """Scope of a set of recalled memories, independent of their order and formatting."""
+    return "\n".join(sorted({normalise_text(text) for text in texts}))
+
+
+def history_fingerprint(messages: list, max_turns: int = 10) -> str:
+    """
+    Scope of the conversation before the latest user message (the input the
+    entry is keyed by), as far back as the planner's history goes. Empty for
+    the first turn of a thread, so first turns are shared across threads.
+    """
+    turns = [m for m in messages if getattr(m, "type", None) in ("human", "ai")]
+    if turns and turns[-1].type == "human":
+        turns = turns[:-1]
+    return "\n".join(f"{m.type}: {normalise_text(str(m.content))}" for m in turns[-max_turns:])
+
+
+class ResponseCache:
+    """
+    Opt-in cache of structured LLM responses (planner / analyzer plans).
+
+    Two tiers per agent:
+    - exact: hash of the normalised input and its scope
+    - semantic: embedding of the input, reused when the cosine similarity to a
+      stored input with the same scope is above a strict threshold
+
+    `scope` carries what besides the input the answer depends on (the
+    planner's earlier turns and recalled memories, see history_fingerprint
+    and memory_fingerprint), so only the input itself is matched
+    approximately. Entries expire after the TTL.
+    """
+
+    def __init__(self, ttl: int, max_entries: int, similarity: float):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity = similarity
+        self._entries: Dict[str, OrderedDict] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def enabled(agent_name: str) -> bool:
+        return bool(config_manager.get_candidate_config(agent_name).get("response_cache"))
+
+    @staticmethod
+    def _key(text: str, scope: str) -> str:
+        return hashlib.sha256(f"{scope}\x00{text}".encode("utf-8")).hexdigest()
+
+    def _count(self, agent_name: str, field: str):
+        stats = self._stats.setdefault(agent_name, {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "stores": 0})
+        stats[field] += 1
+
+    async def _embed(self, text: str) -> Optional[np.ndarray]:
+        if not long_memory.embeddings_ready:
+            return None  # embeddings not initialised, exact tier only
+        try:
+            loop = asyncio.get_running_loop()
+            vector = np.asarray((await loop.run_in_executor(None, long_memory.embed, [text]))[0], dtype=np.float32)
+            return vector / (np.linalg.norm(vector) or 1.0)
+        except Exception as e:
+            LOGGER.warning(f"Response cache: embedding failed, exact tier only: {e}")
+            return None
+
+    def _expire(self, entries: OrderedDict):
+        now = time.time()
+        for key in [k for k, entry in entries.items() if now - entry["created"] > self.ttl]:
+            del entries[key]
+
+    async def get(self, agent_name: str, text: str, scope: str = "") -> Tuple[Optional[Any], Optional[np.ndarray]]:
+        """
+        Look up a cached response. Returns (value, vector); the vector of a miss
+        can be handed to put() so the input isn't embedded twice.
+        """
+        text = normalise_text(text)
+        scope_key = hashlib.sha256(scope.encode("utf-8")).hexdigest()
+        entries = self._entries.setdefault(agent_name, OrderedDict())
+        self._expire(entries)
+
+        key = self._key(text, scope_key)
+        if key in entries:
+            entries.move_to_end(key)
+            self._count(agent_name, "exact_hits")
+            LOGGER.info(f"Response cache: exact hit for {agent_name}")
+            return entries[key]["value"], None
+
+        vector = await self._embed(text)
+        if vector is not None:
+            candidates = [(k, e) for k, e in entries.items() if e["scope"] == scope_key and e["vector"] is not None]
+            if candidates:
+                scores = np.stack([e["vector"] for _, e in candidates]) @ vector
+                best = int(np.argmax(scores))
+                if scores[best] >= self.similarity:
+                    best_key, entry = candidates[best]
+                    entries.move_to_end(best_key)
+                    self._count(agent_name, "semantic_hits")
+                    LOGGER.info(f"Response cache: semantic hit for {agent_name} (similarity {scores[best]:.3f})")
+                    return entry["value"], vector
+
+        self._count(agent_name, "misses")
+        return None, vector
+
+    async def put(self, agent_name: str, text: str, value: Any, scope: str = "", vector: Optional[np.ndarray] = None):
+        text = normalise_text(text)
+        scope_key = hashlib.sha256(scope.encode("utf-8")).hexdigest()
+        if vector is None:
+            vector = await self._embed(text)
+
+        entries = self._entries.setdefault(agent_name, OrderedDict())
+        entries[self._key(text, scope_key)] = {
+            "value": value,
+            "vector": vector,
+            "scope": scope_key,
+            "created": time.time(),
+        }
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+        self._count(agent_name, "stores")
+
+    def clear(self, agent_name: Optional[str] = None):
+        if agent_name:
+            self._entries.pop(agent_name, None)
+        else:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        result = {}
+        for agent_name, stats in self._stats.items():
+            lookups = stats["exact_hits"] + stats["semantic_hits"] + stats["misses"]
+            hits = stats["exact_hits"] + stats["semantic_hits"]
+            result[agent_name] = {
+                **stats,
+                "entries": len(self._entries.get(agent_name, {})),
+                "enabled": self.enabled(agent_name),
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            }
+        return result
+
+
+response_cache = ResponseCache(
+    ttl=Config.RESPONSE_CACHE_TTL,
+    max_entries=Config.RESPONSE_CACHE_MAX_ENTRIES,
+    similarity=Config.RESPONSE_CACHE_SIMILARITY,
+)
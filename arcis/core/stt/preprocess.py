@@ -0,0 +1,115 @@
+import io
+import os
+import time
+import numpy as np
+import soundfile as sf
+
+from arcis import Config
+from arcis.logger import LOGGER
+
+
+TRIM_FRAME_MS = 20
+TRIM_PADDING_MS = 200     # silence kept around the speech so word edges aren't cut
+PEAK_RANGE_DB = 35        # frames this far below the loudest frame count as silence
+RESAMPLE_TAPS = 63
+
+
+def _lowpass(samples: np.ndarray, cutoff: float) -> np.ndarray:
+    """Windowed-sinc low-pass; cutoff is a fraction of the sample rate (< 0.5)."""
+    n = np.arange(RESAMPLE_TAPS) - (RESAMPLE_TAPS - 1) / 2
+    taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(RESAMPLE_TAPS)
+    taps /= taps.sum()
+    return np.convolve(samples, taps, mode="same")
+
+
+def _resample(samples: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+    if src_rate == dst_rate or not samples.size:
+        return samples
+    if dst_rate < src_rate:
+        # anti-aliasing before dropping samples
+        samples = _lowpass(samples, 0.5 * dst_rate / src_rate * 0.95)
+    duration = samples.size / src_rate
+    src_t = np.arange(samples.size) / src_rate
+    dst_t = np.arange(int(duration * dst_rate)) / dst_rate
+    return np.interp(dst_t, src_t, samples).astype(np.float32)
+
+
+def _trim_silence(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    frame = max(1, int(sample_rate * TRIM_FRAME_MS / 1000))
+    n_frames = samples.size // frame
+    if n_frames == 0:
+        return samples
+
+    frames = samples[:n_frames * frame].reshape(n_frames, frame)
+    rms_db = 20 * np.log10(np.sqrt(np.mean(frames * frames, axis=1)) + 1e-10)
+    threshold = max(Config.STT_TRIM_DB, rms_db.max() - PEAK_RANGE_DB)
+
+    voiced = np.flatnonzero(rms_db > threshold)
+    if not voiced.size:
+        return samples[:0]
+
+    pad = int(sample_rate * TRIM_PADDING_MS / 1000)
+    start = max(0, voiced[0] * frame - pad)
+    end = min(samples.size, (voiced[-1] + 1) * frame + pad)
+    return samples[start:end]
+
+
+def _encode(samples: np.ndarray, sample_rate: int) -> tuple[bytes, str]:
+    """Ogg/Opus when libsndfile supports it (smallest), FLAC otherwise (lossless)."""
+    buffer = io.BytesIO()
+    if "OPUS" in sf.available_subtypes("OGG"):
+        sf.write(buffer, samples, sample_rate, format="OGG", subtype="OPUS")
+        return buffer.getvalue(), "ogg"
+    sf.write(buffer, samples, sample_rate, format="FLAC", subtype="PCM_16")
+    return buffer.getvalue(), "flac"
+
+
+def preprocess_audio(audio_bytes: bytes, filename: str) -> tuple[bytes, str, dict]:
+    """
+    Prepare an upload for STT: downmix to mono, resample to STT_SAMPLE_RATE,
+    trim leading/trailing silence and re-encode compactly.
+
+    Returns (audio_bytes, filename, report). The original bytes are kept when
+    they can't be decoded or when re-encoding doesn't make them smaller.
+    """
+    started = time.perf_counter()
+    report = {"input_bytes": len(audio_bytes)}
+
+    try:
+        samples, src_rate = sf.read(io.BytesIO(audio_bytes), dtype="float32", always_2d=True)
+    except Exception as e:
+        LOGGER.warning(f"STT preprocess: cannot decode {filename}, sending it unchanged: {e}")
+        report.update(output_bytes=len(audio_bytes), processed=False)
+        return audio_bytes, filename, report
+
+    report.update(
+        input_duration_s=round(samples.shape[0] / src_rate, 2),
+        input_sample_rate=src_rate,
+        input_channels=samples.shape[1],
+    )
+
+    dst_rate = Config.STT_SAMPLE_RATE
+    mono = samples.mean(axis=1)
+    mono = _resample(mono, src_rate, dst_rate)
+    mono = _trim_silence(mono, dst_rate)
+    report["output_duration_s"] = round(mono.size / dst_rate, 2)
+
+    encoded, extension = _encode(mono, dst_rate)
+    if mono.size and len(encoded) < len(audio_bytes):
+        audio_bytes = encoded
+        filename = f"{os.path.splitext(filename)[0]}.{extension}"
+        report["processed"] = True
+    else:
+        report["processed"] = False  # already compact (e.g. Telegram Opus voice notes)
+
+    report.update(
+        output_bytes=len(audio_bytes),
+        output_format=os.path.splitext(filename)[1].lstrip("."),
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
+    LOGGER.info(
+        f"STT preprocess: {report['input_bytes']} -> {report['output_bytes']} bytes, "
+        f"{report['input_duration_s']}s -> {report['output_duration_s']}s "
+        f"({report['input_channels']}ch {src_rate}Hz -> mono {dst_rate}Hz) in {report['elapsed_ms']}ms"
+    )
+    return audio_bytes, filename, report
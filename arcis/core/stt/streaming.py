@@ -0,0 +1,185 @@
+import io
+import wave
+import asyncio
+import numpy as np
+
+from collections import deque
+
+from arcis import Config
+from arcis.core.stt.stt_manager import transcribe_audio
+from arcis.logger import LOGGER
+
+
+FRAME_MS = 30
+PREROLL_MS = 300       # audio kept before detected speech so word onsets aren't clipped
+MIN_SPEECH_MS = 250    # shorter bursts (clicks, breaths) are dropped
+PROMPT_CHARS = 200     # transcript tail passed as context to the next segment
+
+
+def pcm_to_wav(pcm: bytes, sample_rate: int) -> bytes:
+    """Wrap mono 16-bit PCM in a WAV container."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm)
+    return buffer.getvalue()
+
+
+class VADSegmenter:
+    """
+    Energy based voice activity detection over streamed mono 16-bit PCM.
+    Emits an utterance once it is followed by `silence_ms` of silence, or
+    when it reaches `max_segment_s` so long monologues still produce partials.
+    The speech threshold adapts to the background noise level.
+    """
+
+    def __init__(self, sample_rate: int, silence_ms: int | None = None, max_segment_s: float | None = None):
+        self.sample_rate = sample_rate
+        self._frame_bytes = int(sample_rate * FRAME_MS / 1000) * 2
+        self._silence_frames = (silence_ms or Config.STT_VAD_SILENCE_MS) // FRAME_MS
+        self._max_frames = int((max_segment_s or Config.STT_MAX_SEGMENT_S) * 1000 / FRAME_MS)
+        self._preroll: deque[bytes] = deque(maxlen=PREROLL_MS // FRAME_MS)
+        self._buffer = b""
+        self._segment: list[bytes] = []
+        self._speech_frames = 0
+        self._silence_run = 0
+        self._noise_floor: float | None = None
+
+    def _is_speech(self, frame: bytes) -> bool:
+        samples = np.frombuffer(frame, dtype="<i2").astype(np.float32)
+        rms = float(np.sqrt(np.mean(samples * samples))) if samples.size else 0.0
+
+        threshold = max(Config.STT_VAD_MIN_RMS, (self._noise_floor or 0.0) * 3)
+        speech = rms > threshold
+        if not speech:
+            # slow moving average of the background level
+            self._noise_floor = rms if self._noise_floor is None else 0.95 * self._noise_floor + 0.05 * rms
+        return speech
+
+    def _close(self) -> bytes | None:
+        # keep a little of the trailing silence, drop the rest
+        keep = len(self._segment) - max(0, self._silence_run - self._silence_frames // 3)
+        segment = b"".join(self._segment[:keep])
+        enough_speech = self._speech_frames * FRAME_MS >= MIN_SPEECH_MS
+
+        self._segment = []
+        self._speech_frames = 0
+        self._silence_run = 0
+        return segment if enough_speech else None
+
+    def feed(self, pcm: bytes) -> list[bytes]:
+        """Add PCM and return the utterances it completed."""
+        self._buffer += pcm
+        segments = []
+
+        while len(self._buffer) >= self._frame_bytes:
+            frame = self._buffer[:self._frame_bytes]
+            self._buffer = self._buffer[self._frame_bytes:]
+            speech = self._is_speech(frame)
+
+            if not self._segment:
+                if speech:
+                    self._segment = list(self._preroll)
+                    self._preroll.clear()
+                else:
+                    self._preroll.append(frame)
+                    continue
+
+            self._segment.append(frame)
+            if speech:
+                self._speech_frames += 1
+                self._silence_run = 0
+            else:
+                self._silence_run += 1
+
+            if self._silence_run >= self._silence_frames or len(self._segment) >= self._max_frames:
+                segment = self._close()
+                if segment:
+                    segments.append(segment)
+
+        return segments
+
+    def flush(self) -> list[bytes]:
+        """Close the utterance in progress at the end of the stream."""
+        if self._buffer and self._segment:
+            self._segment.append(self._buffer)
+        self._buffer = b""
+        segment = self._close() if self._segment else None
+        return [segment] if segment else []
+
+
+class StreamingTranscriber:
+    """
+    Transcribes audio while it is still being uploaded: every utterance found
+    by the VAD is sent to the STT backend right away, results are reported as
+    partial transcripts in utterance order.
+    """
+
+    def __init__(self, sample_rate: int = 16000, language: str = "en", backend: str | None = None):
+        self.sample_rate = sample_rate
+        self.language = language
+        self.backend = backend
+        self._segmenter = VADSegmenter(sample_rate)
+        self._pending: deque[tuple[int, asyncio.Task]] = deque()
+        self._texts: list[str] = []
+        self._next_idx = 0
+
+    @property
+    def text(self) -> str:
+        return " ".join(t for t in self._texts if t)
+
+    def feed(self, pcm: bytes):
+        for segment in self._segmenter.feed(pcm):
+            self._start(segment)
+
+    def _start(self, segment: bytes):
+        LOGGER.debug(f"STT: utterance {self._next_idx} ({len(segment) / 2 / self.sample_rate:.1f}s)")
+        # transcript known so far keeps names and spelling consistent across utterances
+        prompt = self.text[-PROMPT_CHARS:] or None
+        task = asyncio.create_task(transcribe_audio(
+            pcm_to_wav(segment, self.sample_rate),
+            filename=f"utterance_{self._next_idx}.wav",
+            language=self.language,
+            prompt=prompt,
+            backend=self.backend,
+        ))
+        self._pending.append((self._next_idx, task))
+        self._next_idx += 1
+
+    def _partial(self, idx: int, task: asyncio.Task) -> dict | None:
+        try:
+            text = task.result()
+        except Exception as e:
+            LOGGER.error(f"STT: utterance {idx} failed: {e}")
+            return None
+        self._texts.append(text)
+        return {"type": "partial", "segment": idx, "text": text, "transcript": self.text}
+
+    def ready(self) -> list[dict]:
+        """Partial transcripts that are already available, without waiting (in order)."""
+        partials = []
+        while self._pending and self._pending[0][1].done():
+            partial = self._partial(*self._pending.popleft())
+            if partial:
+                partials.append(partial)
+        return partials
+
+    async def finish(self):
+        """Close the last utterance and yield the remaining partial transcripts in order."""
+        for segment in self._segmenter.flush():
+            self._start(segment)
+
+        while self._pending:
+            idx, task = self._pending[0]
+            await asyncio.wait([task])
+            self._pending.popleft()
+            partial = self._partial(idx, task)
+            if partial:
+                yield partial
+
+    def cancel(self):
+        while self._pending:
+            _, task = self._pending.popleft()
+            task.cancel()
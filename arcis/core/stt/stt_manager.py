@@ -1,9 +1,21 @@
 import io
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
 from groq import AsyncGroq
+
+from arcis import Config
+from arcis.core.stt.preprocess import preprocess_audio
 from arcis.logger import LOGGER
 
 _client: AsyncGroq | None = None
 
+_local_model = None
+# faster-whisper models are not safe to share between threads
+_local_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stt")
+# decoding / resampling / re-encoding is CPU bound, keep it off the shared default executor
+_preprocess_executor = ThreadPoolExecutor(max_workers=Config.STT_PREPROCESS_WORKERS, thread_name_prefix="stt-pre")
+
 
 def _get_client() -> AsyncGroq:
     """Lazy-initialise a reusable async Groq client."""
@@ -13,14 +25,72 @@ def _get_client() -> AsyncGroq:
     return _client
 
 
+def _get_local_model():
+    """Lazy-load the local faster-whisper model (optional dependency)."""
+    global _local_model
+    if _local_model is None:
+        from faster_whisper import WhisperModel
+
+        LOGGER.info(f"STT: loading local whisper model '{Config.STT_LOCAL_MODEL}'")
+        _local_model = WhisperModel(
+            Config.STT_LOCAL_MODEL,
+            device=Config.STT_LOCAL_DEVICE,
+            compute_type=Config.STT_LOCAL_COMPUTE_TYPE,
+        )
+    return _local_model
+
+
+async def _transcribe_groq(audio_bytes: bytes, filename: str, language: str, prompt: str | None) -> str:
+    client = _get_client()
+
+    # Wrap bytes in a file-like tuple that httpx can stream
+    file_tuple = (filename, io.BytesIO(audio_bytes))
+
+    transcription = await client.audio.transcriptions.create(
+        file=file_tuple,
+        model="whisper-large-v3-turbo",
+        language=language,
+        temperature=0.0,
+        **({"prompt": prompt} if prompt else {}),
+    )
+    return transcription.text
+
+
+def _transcribe_local_sync(audio_bytes: bytes, language: str, prompt: str | None) -> str:
+    model = _get_local_model()
+    segments, _ = model.transcribe(
+        io.BytesIO(audio_bytes),
+        language=language,
+        temperature=0.0,
+        initial_prompt=prompt,
+        vad_filter=True,
+    )
+    # segments is a lazy generator, decoding happens while iterating
+    return " ".join(segment.text.strip() for segment in segments)
+
+
+async def _transcribe_local(audio_bytes: bytes, filename: str, language: str, prompt: str | None) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_local_executor, _transcribe_local_sync, audio_bytes, language, prompt)
+
+
+# STT_BACKEND -> transcription coroutine
+BACKENDS = {
+    "groq": _transcribe_groq,
+    "local": _transcribe_local,
+}
+
+
 async def transcribe_audio(
     audio_bytes: bytes,
     filename: str = "audio.wav",
     language: str = "en",
     prompt: str | None = None,
+    backend: str | None = None,
+    preprocess: bool | None = None,
 ) -> str:
     """
-    Transcribe raw audio bytes using Groq Whisper (async, non-blocking).
+    Transcribe raw audio bytes (async, non-blocking).
 
     Args:
         audio_bytes: The raw audio file content.
@@ -28,25 +98,26 @@ async def transcribe_audio(
                   infer format, e.g. .wav, .mp3, .webm, .ogg).
         language: BCP-47 language code.
         prompt: Optional context / spelling hints for the model.
+        backend: "groq" (Groq Whisper API) or "local" (faster-whisper),
+                 defaults to Config.STT_BACKEND.
+        preprocess: Downmix/resample/trim/re-encode before transcription
+                    (see preprocess_audio), defaults to Config.STT_PREPROCESS.
 
     Returns:
         The transcribed text string.
     """
-    client = _get_client()
+    backend = backend or Config.STT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown STT backend '{backend}'")
 
-    # Wrap bytes in a file-like tuple that httpx can stream
-    file_tuple = (filename, io.BytesIO(audio_bytes))
-
-    LOGGER.info(f"STT: transcribing {len(audio_bytes)} bytes ({filename})")
+    if preprocess is None:
+        preprocess = Config.STT_PREPROCESS
+    if preprocess:
+        loop = asyncio.get_running_loop()
+        audio_bytes, filename, _ = await loop.run_in_executor(_preprocess_executor, preprocess_audio, audio_bytes, filename)
 
-    transcription = await client.audio.transcriptions.create(
-        file=file_tuple,
-        model="whisper-large-v3-turbo",
-        language=language,
-        temperature=0.0,
-        **({"prompt": prompt} if prompt else {}),
-    )
+    LOGGER.info(f"STT: transcribing {len(audio_bytes)} bytes ({filename}) with {backend}")
 
-    text = transcription.text.strip()
+    text = (await BACKENDS[backend](audio_bytes, filename, language, prompt)).strip()
     LOGGER.info(f"STT: result ({len(text)} chars): {text[:120]}...")
     return text
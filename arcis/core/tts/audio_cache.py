@@ -0,0 +1,135 @@
+import os
+import re
+import shutil
+import hashlib
+import threading
+import unicodedata
+
+from collections import OrderedDict
+from typing import Optional
+
+from arcis.logger import LOGGER
+
+
+def normalise_sentence(sentence: str) -> str:
+    """Canonical form used for cache keys (unicode + whitespace normalised, case kept for prosody)."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", sentence)).strip()
+
+
+class AudioCache:
+    """
+    Cache of synthesised sentence audio (16-bit PCM) keyed by (voice_id, normalised sentence).
+
+    Two tiers:
+    - memory: LRU bounded by total bytes
+    - disk (optional): one file per sentence under <disk_dir>/<voice>/, survives restarts
+    """
+
+    def __init__(self, max_bytes: int, disk_dir: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._entries: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @staticmethod
+    def _hash(value: str) -> str:
+        return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+    def _disk_path(self, voice_id: str, sentence: str) -> str:
+        return os.path.join(self.disk_dir, self._hash(voice_id)[:16], f"{self._hash(sentence)}.pcm")
+
+    def _remember(self, key: tuple[str, str], pcm: bytes):
+        """Insert into the memory tier and evict least recently used entries. Caller holds the lock."""
+        if len(pcm) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._entries[key] = pcm
+        self._size += len(pcm)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def get(self, voice_id: str, sentence: str, disk: bool = True) -> Optional[bytes]:
+        """Look up cached audio. disk=False only checks memory (safe to call on the event loop)."""
+        key = (voice_id, normalise_sentence(sentence))
+
+        with self._lock:
+            pcm = self._entries.get(key)
+            if pcm is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return pcm
+            if not (disk and self.disk_dir):
+                if disk:
+                    self._misses += 1
+                return None
+
+        path = self._disk_path(*key)
+        try:
+            with open(path, "rb") as f:
+                pcm = f.read()
+        except FileNotFoundError:
+            pcm = None
+        except OSError as e:
+            LOGGER.warning(f"TTS cache: failed to read {path}: {e}")
+            pcm = None
+
+        with self._lock:
+            if pcm is None:
+                self._misses += 1
+                return None
+            self._disk_hits += 1
+            self._remember(key, pcm)
+        return pcm
+
+    def put(self, voice_id: str, sentence: str, pcm: bytes):
+        if not pcm:
+            return
+        key = (voice_id, normalise_sentence(sentence))
+
+        with self._lock:
+            self._remember(key, pcm)
+
+        if self.disk_dir:
+            path = self._disk_path(*key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # write then rename so concurrent readers never see partial files
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(pcm)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                LOGGER.warning(f"TTS cache: failed to write {path}: {e}")
+
+    def invalidate_voice(self, voice_id: str):
+        """Drop every entry of a voice (its state changed, so cached audio is stale)."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == voice_id]:
+                self._size -= len(self._entries.pop(key))
+
+        if self.disk_dir:
+            shutil.rmtree(os.path.join(self.disk_dir, self._hash(voice_id)[:16]), ignore_errors=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._disk_hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "memory_bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "disk_enabled": bool(self.disk_dir),
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": round((self._hits + self._disk_hits) / lookups, 4) if lookups else 0.0,
+            }
@@ -1,22 +1,286 @@
 import os
 import io
+import time
 import re
 import json
 import asyncio
 import base64
+import wave
 import tempfile
-import scipy.io.wavfile
+import threading
+import numpy as np
+
+from collections import deque
 
 from pocket_tts import TTSModel
+from arcis import Config
+from arcis.core.tts.audio_cache import AudioCache
+from arcis.core.tts.voice_store import VoiceStore, content_hash
+from arcis.core.tts.worker_pool import TTSWorkerPool
 from arcis.logger import LOGGER
 
 
+# how often a voice's store ref is re-read to pick up uploads made by other workers
+VOICE_REF_CHECK_SECONDS = 5
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+
+def _to_pcm16(audio) -> bytes:
+    """Convert a float audio tensor/array in [-1, 1] to mono 16-bit little-endian PCM."""
+    if hasattr(audio, "detach"):
+        audio = audio.detach().cpu().numpy()
+    samples = np.clip(np.asarray(audio, dtype=np.float32).reshape(-1), -1.0, 1.0)
+    return (samples * 32767).astype("<i2").tobytes()
+
+
+def _audio_event(audio_data: str, idx: int) -> str:
+    return f"data: {json.dumps({'type': 'audio', 'data': audio_data, 'format': 'wav', 'chunk': idx})}\n\n"
+
+
+class SentenceSplitter:
+    """Incrementally splits streamed text into complete sentences."""
+
+    def __init__(self):
+        self._buffer = ""
+
+    def feed(self, text: str) -> list[str]:
+        """Add text and return the sentences completed by it."""
+        self._buffer += text
+        parts = SENTENCE_BOUNDARY.split(self._buffer)
+        # the last part may still be growing
+        self._buffer = parts.pop()
+        return [p.strip() for p in parts if p.strip()]
+
+    def flush(self) -> list[str]:
+        rest = self._buffer.strip()
+        self._buffer = ""
+        return [rest] if rest else []
+
+
+class TTSPipeline:
+    """
+    Synthesises sentences while the text is still being generated.
+    Up to `lookahead` sentences are synthesised concurrently on the TTS
+    worker pool; audio events are always emitted in sentence order.
+    While the pool queue is full sentences wait in the session backlog;
+    finish() waits for queue space to synthesise them.
+    """
+
+    def __init__(self, manager: "TTSManager", voice_id: str, voice_state, lookahead: int):
+        self._manager = manager
+        self._voice_id = voice_id
+        self._voice_state = voice_state
+        self._lookahead = max(1, lookahead)
+        self._loop = asyncio.get_running_loop()
+        self._splitter = SentenceSplitter()
+        self._backlog: deque[str] = deque()
+        self._inflight: deque[tuple[int, asyncio.Future]] = deque()
+        self._next_idx = 0
+        self.fed_text = ""
+
+    def feed(self, text: str):
+        """Add streamed text, starting synthesis for every sentence it completes."""
+        self.fed_text += text
+        for sentence in self._splitter.feed(text):
+            self._enqueue(sentence)
+
+    def _enqueue(self, sentence: str):
+        if len(sentence) > 1:
+            self._backlog.append(sentence)
+        self._top_up()
+
+    def _top_up(self):
+        pool = self._manager.pool
+        while self._backlog and len(self._inflight) < self._lookahead:
+            if not pool.has_capacity():
+                break  # backpressure: keep it in the backlog, retried as sentences complete
+            self._inflight.append((self._next_idx, self._start(self._backlog[0])))
+            self._backlog.popleft()
+            self._next_idx += 1
+
+    async def _drain_backlog(self) -> bool:
+        """With nothing in flight, wait for pool capacity and start the backlog; False when done."""
+        if self._inflight:
+            return True
+        if not self._backlog:
+            return False
+        await self._manager.pool.wait_for_capacity()
+        self._top_up()
+        return True
+
+    def _start(self, sentence: str):
+        # memory cache hits skip the pool entirely
+        cached = self._manager.audio_cache.get(self._voice_id, sentence, disk=False)
+        if cached is not None:
+            future = self._loop.create_future()
+            future.set_result(self._manager._encode_wav_b64(cached))
+            return future
+
+        return self._manager.pool.submit(
+            self._manager._generate_sentence_audio_sync,
+            self._voice_id,
+            self._voice_state,
+            sentence
+        )
+
+    def _pop_event(self, idx: int, future: asyncio.Future) -> str | None:
+        self._top_up()
+        try:
+            audio_data = future.result()
+        except Exception as e:
+            LOGGER.error(f"TTS stream failed on chunk {idx}: {e}")
+            return None
+        return _audio_event(audio_data, idx) if audio_data else None
+
+    def ready(self) -> list[str]:
+        """Audio events that are already synthesised, without waiting (in order)."""
+        events = []
+        while self._inflight and self._inflight[0][1].done():
+            idx, future = self._inflight.popleft()
+            event = self._pop_event(idx, future)
+            if event:
+                events.append(event)
+        return events
+
+    async def finish(self):
+        """Flush the trailing sentence and yield the remaining audio events in order."""
+        for sentence in self._splitter.flush():
+            self._enqueue(sentence)
+
+        while await self._drain_backlog():
+            if not self._inflight:
+                continue  # capacity taken again before this session got it
+            idx, future = self._inflight[0]
+            try:
+                await asyncio.shield(future)
+            except Exception:
+                pass  # reported by _pop_event
+            self._inflight.popleft()
+            event = self._pop_event(idx, future)
+            if event:
+                yield event
+
+    def cancel(self):
+        """Drop queued sentences; synthesis that has not started yet is skipped."""
+        self._backlog.clear()
+        while self._inflight:
+            _, future = self._inflight.popleft()
+            future.cancel()
+
+
+
+class PCMPipeline(TTSPipeline):
+    """
+    Binary variant of TTSPipeline: yields raw 16-bit PCM frames instead of
+    base64 WAV events. Frames are forwarded while a sentence is still being
+    generated, so playback can start mid-sentence.
+    """
+
+    def __init__(self, manager: "TTSManager", voice_id: str, voice_state, lookahead: int):
+        super().__init__(manager, voice_id, voice_state, lookahead)
+        self._stop = threading.Event()
+        self._futures: list[asyncio.Future] = []
+
+    def _start(self, sentence: str) -> asyncio.Queue:
+        frames: asyncio.Queue = asyncio.Queue()
+
+        cached = self._manager.audio_cache.get(self._voice_id, sentence, disk=False)
+        if cached is not None:
+            for frame in self._manager._split_pcm_frames(cached):
+                frames.put_nowait(frame)
+            frames.put_nowait(None)
+            return frames
+
+        future = self._manager.pool.submit(
+            self._produce,
+            sentence,
+            frames
+        )
+        self._futures.append(future)
+        return frames
+
+    def _produce(self, sentence: str, frames: asyncio.Queue):
+        """Runs on the TTS pool; pushes frames to the event loop, None marks the end of the sentence."""
+        try:
+            for frame in self._manager._iter_sentence_pcm_sync(self._voice_id, self._voice_state, sentence):
+                if self._stop.is_set():
+                    break
+                self._loop.call_soon_threadsafe(frames.put_nowait, frame)
+        except Exception as e:
+            LOGGER.warning(f"Failed to generate audio for sentence '{sentence[:20]}...': {e}")
+        finally:
+            try:
+                self._loop.call_soon_threadsafe(frames.put_nowait, None)
+            except RuntimeError:
+                pass  # event loop already closed
+
+    def ready(self) -> list[bytes]:
+        """PCM frames that are already available, without waiting (in order)."""
+        ready_frames = []
+        while self._inflight:
+            frames = self._inflight[0][1]
+            while not frames.empty():
+                frame = frames.get_nowait()
+                if frame is None:
+                    break
+                ready_frames.append(frame)
+            else:
+                return ready_frames
+            # sentence finished, move on to the next one
+            self._inflight.popleft()
+            self._top_up()
+        return ready_frames
+
+    async def finish(self):
+        """Flush the trailing sentence and yield the remaining PCM frames in order."""
+        for sentence in self._splitter.flush():
+            self._enqueue(sentence)
+
+        while await self._drain_backlog():
+            if not self._inflight:
+                continue  # capacity taken again before this session got it
+            frame = await self._inflight[0][1].get()
+            if frame is None:
+                self._inflight.popleft()
+                self._top_up()
+                continue
+            yield frame
+
+    def cancel(self):
+        self._stop.set()
+        self._backlog.clear()
+        self._inflight.clear()
+        for future in self._futures:
+            future.cancel()
+
 
 class TTSManager:
     def __init__(self):
         self.tts_model = None
         self.voice_states = {}
+        self.voice_objects = {}  # voice_id -> content hash of its stored state
+        self._ref_checked = {}  # voice_id -> monotonic time its store ref was last read
         self.default_voice_state = None
+        try:
+            self.voice_store = VoiceStore(Config.TTS_VOICE_STORE_DIR)
+        except OSError as e:
+            LOGGER.error(f"Voice store unavailable, voices will not persist: {e}")
+            self.voice_store = None
+        self.audio_cache = AudioCache(
+            max_bytes=Config.TTS_CACHE_MAX_MB * 1024 * 1024,
+            disk_dir=Config.TTS_CACHE_DIR
+        )
+        # dedicated pool so synthesis doesn't compete with the default executor
+        self.pool = TTSWorkerPool(
+            workers=Config.TTS_WORKERS,
+            max_queue=Config.TTS_MAX_QUEUE
+        )
+
+
+    async def run(self, fn, *args):
+        """Run a blocking TTS call (model load, voice parsing) on the TTS worker pool."""
+        return await self.pool.submit(fn, *args)
 
 
     def initialize(self, default_voice: str = "alba"):
@@ -27,8 +291,16 @@ class TTSManager:
 
             if default_voice:
                 LOGGER.info(f"Pre-loading default voice state: {default_voice}")
-                self.default_voice_state = self.tts_model.get_state_for_audio_prompt(default_voice)
+                # presets are addressed by name, reference files by their content
+                if os.path.isfile(default_voice):
+                    with open(default_voice, "rb") as f:
+                        object_id = content_hash(f.read())
+                else:
+                    object_id = content_hash(f"preset:{default_voice}".encode("utf-8"))
+
+                self.default_voice_state = self._load_or_compute_state(object_id, default_voice)
                 self.voice_states["default"] = self.default_voice_state
+                self.voice_objects["default"] = object_id
                 LOGGER.info("Default voice state loaded successfully.")
             else:
                 LOGGER.warning("No default voice provided. First synthesis might lag.")
@@ -37,19 +309,54 @@ class TTSManager:
             LOGGER.error(f"Failed to initialize TTS: {error_msg}")
 
 
+    def _load_or_compute_state(self, object_id: str, audio_prompt: str):
+        """Load a voice state from the store, computing and persisting it only when missing."""
+        if self.voice_store:
+            try:
+                state = self.voice_store.load_object(object_id)
+                if state is not None:
+                    LOGGER.debug(f"Voice state {object_id[:12]} loaded from store")
+                    return state
+            except Exception as e:
+                LOGGER.warning(f"Voice store: failed to load {object_id[:12]}, recomputing: {e}")
+
+        state = self.tts_model.get_state_for_audio_prompt(audio_prompt)
+
+        if self.voice_store:
+            try:
+                self.voice_store.save_object(object_id, state)
+            except Exception as e:
+                LOGGER.warning(f"Voice store: failed to save {object_id[:12]}: {e}")
+        return state
+
+
     def update_voice_state_from_bytes(self, voice_id: str, wav_bytes: bytes):
         """Update or add a voice state from uploaded WAV bytes."""
         if not self.tts_model:
             raise RuntimeError("TTS model not initialized")
         
+        object_id = content_hash(wav_bytes)
+        # audio cache key the voice used so far (see _resolve_voice)
+        previous_key = self.voice_objects.get(voice_id, voice_id if voice_id in self.voice_states else None)
         try:
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_wav:
-                temp_wav.write(wav_bytes)
-                temp_path = temp_wav.name
-                
-            LOGGER.info(f"Parsing new voice state for {voice_id}")
-            state = self.tts_model.get_state_for_audio_prompt(temp_path)
+            if self.voice_store and self.voice_store.has_object(object_id):
+                # same reference audio as an earlier upload, no need to recompute
+                state = self._load_or_compute_state(object_id, None)
+            else:
+                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_wav:
+                    temp_wav.write(wav_bytes)
+                    temp_path = temp_wav.name
+                    
+                LOGGER.info(f"Parsing new voice state for {voice_id}")
+                state = self._load_or_compute_state(object_id, temp_path)
+
             self.voice_states[voice_id] = state
+            self.voice_objects[voice_id] = object_id
+            if self.voice_store:
+                self.voice_store.set_ref(voice_id, object_id)
+            if previous_key and previous_key != object_id and not self._cache_key_in_use(previous_key):
+                LOGGER.info(f"Dropping cached audio of the previous '{voice_id}' voice")
+                self.audio_cache.invalidate_voice(previous_key)
             return True
         except Exception as e:
             LOGGER.error(f"Failed to extract voice state: {e}")
@@ -59,20 +366,137 @@ class TTSManager:
                 os.remove(temp_path)
 
 
-    def _split_into_sentences(self, text: str):
-        sentences = re.split(r"(?<=[.!?])\s+", text.strip())
-        return [s.strip() for s in sentences if s.strip()]
+    def _cache_key_in_use(self, cache_key: str) -> bool:
+        """Whether any voice of this or another worker still synthesises under this audio cache key."""
+        if cache_key in self.voice_objects.values():
+            return True
+        if self.voice_store:
+            return any(self.voice_store.get_ref(voice) == cache_key for voice in self.voice_store.list_voices())
+        return False
 
 
-    def _generate_sentence_audio_sync(self, voice_state, sentence: str):
+    def _load_stored_voice(self, voice_id: str):
+        """(object id, state) a voice is assigned in the store, None if unchanged or unavailable; blocking."""
+        object_id = self.voice_store.get_ref(voice_id)
+        if not object_id or object_id == self.voice_objects.get(voice_id):
+            return None
         try:
-            audio = self.tts_model.generate_audio(voice_state, sentence)
-            audio_np = audio.numpy()
-            wav_buffer = io.BytesIO()
-            scipy.io.wavfile.write(wav_buffer, self.tts_model.sample_rate, audio_np)
-            wav_buffer.seek(0)
-            audio_bytes = wav_buffer.read()
-            return base64.b64encode(audio_bytes).decode()
+            state = self.voice_store.load_object(object_id)
+        except Exception as e:
+            LOGGER.warning(f"Voice store: failed to load voice '{voice_id}': {e}")
+            return None
+        return (object_id, state) if state is not None else None
+
+
+    async def _resolve_voice(self, voice_id: str):
+        """
+        Return (cache_key, voice_state) for a voice, lazily loading voices stored
+        by this or another worker and picking up re-uploads. The store is read
+        off the event loop, at most every VOICE_REF_CHECK_SECONDS per voice;
+        loaded states stay cached in voice_states. Unknown voices fall back to
+        the default state.
+        """
+        now = time.monotonic()
+        if self.voice_store and now - self._ref_checked.get(voice_id, float("-inf")) >= VOICE_REF_CHECK_SECONDS:
+            self._ref_checked[voice_id] = now
+            loop = asyncio.get_running_loop()
+            stored = await loop.run_in_executor(None, self._load_stored_voice, voice_id)
+            if stored is not None:
+                self.voice_objects[voice_id], self.voice_states[voice_id] = stored
+
+        if voice_id not in self.voice_states:
+            voice_id = "default"
+        # content hash keeps the audio cache valid across workers and re-uploads
+        cache_key = self.voice_objects.get(voice_id, voice_id)
+        return cache_key, self.voice_states.get(voice_id, self.default_voice_state)
+
+
+    async def create_pipeline(self, voice_id: str = "default", lookahead: int | None = None, pcm: bool = False) -> TTSPipeline:
+        """
+        Start a pipelined synthesis session for text that arrives incrementally.
+        With pcm=True the pipeline yields raw 16-bit PCM frames instead of SSE audio events.
+        """
+        if not self.tts_model:
+            raise RuntimeError("TTS not available")
+        self.pool.admit()
+
+        cache_key, voice_state = await self._resolve_voice(voice_id)
+        if not voice_state:
+            raise RuntimeError(f"Voice state '{voice_id}' not found")
+
+        pipeline_cls = PCMPipeline if pcm else TTSPipeline
+        return pipeline_cls(self, cache_key, voice_state, lookahead or Config.TTS_LOOKAHEAD)
+
+
+    @property
+    def pcm_format(self) -> dict:
+        """Describes the raw audio produced by PCM pipelines."""
+        return {
+            "encoding": "pcm_s16le",
+            "sample_rate": self.tts_model.sample_rate if self.tts_model else None,
+            "channels": 1,
+        }
+
+
+    def _split_pcm_frames(self, pcm: bytes) -> list[bytes]:
+        frame_bytes = max(1, int(self.tts_model.sample_rate * Config.TTS_PCM_FRAME_MS / 1000)) * 2
+        return [pcm[i:i + frame_bytes] for i in range(0, len(pcm), frame_bytes)]
+
+
+    def _iter_sentence_pcm_sync(self, voice_id: str, voice_state, sentence: str):
+        """
+        Yield PCM frames for a sentence straight from the generated tensor.
+        Uses the model's streaming generator when available so frames are
+        produced while the sentence is still being synthesised.
+        Fully generated sentences are added to the audio cache.
+        """
+        cached = self.audio_cache.get(voice_id, sentence)
+        if cached is not None:
+            yield from self._split_pcm_frames(cached)
+            return
+
+        frame_bytes = max(1, int(self.tts_model.sample_rate * Config.TTS_PCM_FRAME_MS / 1000)) * 2
+
+        generate_stream = getattr(self.tts_model, "generate_audio_stream", None)
+        if generate_stream is not None:
+            chunks = generate_stream(voice_state, sentence)
+        else:
+            chunks = [self.tts_model.generate_audio(voice_state, sentence)]
+
+        generated = []
+        pending = b""
+        for chunk in chunks:
+            pcm = _to_pcm16(chunk)
+            generated.append(pcm)
+            pending += pcm
+            while len(pending) >= frame_bytes:
+                yield pending[:frame_bytes]
+                pending = pending[frame_bytes:]
+        if pending:
+            yield pending
+
+        # only reached when the whole sentence was consumed
+        self.audio_cache.put(voice_id, sentence, b"".join(generated))
+
+
+    def _encode_wav_b64(self, pcm: bytes) -> str:
+        wav_buffer = io.BytesIO()
+        with wave.open(wav_buffer, "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(self.tts_model.sample_rate)
+            wav_file.writeframes(pcm)
+        return base64.b64encode(wav_buffer.getvalue()).decode()
+
+
+    def _generate_sentence_audio_sync(self, voice_id: str, voice_state, sentence: str):
+        try:
+            pcm = self.audio_cache.get(voice_id, sentence)
+            if pcm is None:
+                audio = self.tts_model.generate_audio(voice_state, sentence)
+                pcm = _to_pcm16(audio)
+                self.audio_cache.put(voice_id, sentence, pcm)
+            return self._encode_wav_b64(pcm)
         except Exception as e:
             LOGGER.warning(f"Failed to generate audio for sentence '{sentence[:20]}...': {e}")
             return None
@@ -83,35 +507,18 @@ class TTSManager:
         Async generator for streaming TTS sentence by sentence via SSE.
         Yields text content and Base64 audio chunks.
         """
-        if not self.tts_model:
-            yield "data: {\"type\": \"error\", \"message\": \"TTS not available\"}\n\n"
-            return
-            
-        voice_state = self.voice_states.get(voice_id, self.default_voice_state)
-        if not voice_state:
-            yield f"data: {{\"type\": \"error\", \"message\": \"Voice state '{voice_id}' not found\"}}\n\n"
+        try:
+            pipeline = await self.create_pipeline(voice_id)
+        except RuntimeError as e:
+            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
             return
-
-        sentences = self._split_into_sentences(text)
-        loop = asyncio.get_event_loop()
         
         # Stream out the full text first (or we can stream it sentence by sentence)
         yield f"data: {json.dumps({'type': 'text', 'content': text})}\n\n"
 
-        for idx, sentence in enumerate(sentences):
-            if len(sentence) > 1:
-                try:
-                    audio_data = await loop.run_in_executor(
-                        None,
-                        self._generate_sentence_audio_sync,
-                        voice_state,
-                        sentence
-                    )
-
-                    if audio_data:
-                        yield f"data: {json.dumps({'type': 'audio', 'data': audio_data, 'format': 'wav', 'chunk': idx})}\n\n"
-                except Exception as e:
-                    LOGGER.error(f"TTS stream failed on chunk {idx}: {e}")
+        pipeline.feed(text)
+        async for event in pipeline.finish():
+            yield event
 
         yield f"data: {json.dumps({'type': 'done'})}\n\n"
 
@@ -0,0 +1,139 @@
+"""
+Voice State Store — content-addressed on-disk storage of TTS voice states.
+
+Layout:
+    <root>/objects/<sha256 of the voice source>.safetensors   tensors + structure metadata
+    <root>/refs/<sha256 of voice_id>.json                      {"voice_id", "object"}
+
+Objects are immutable, so every worker can share the same directory; refs are
+replaced atomically when a voice is re-uploaded.
+"""
+
+import os
+import json
+import hashlib
+from typing import Any, Optional
+
+import torch
+from safetensors import safe_open
+from safetensors.torch import save_file
+
+from arcis.logger import LOGGER
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _flatten(obj: Any, tensors: dict[str, torch.Tensor]) -> Any:
+    """Replace tensors in a nested state with references, collecting them in `tensors`."""
+    if isinstance(obj, torch.Tensor):
+        key = str(len(tensors))
+        tensors[key] = obj.detach().cpu().contiguous().clone()
+        return {"__tensor__": key}
+    if isinstance(obj, dict):
+        if not all(isinstance(k, str) for k in obj):
+            raise TypeError("Voice state dicts must have string keys")
+        return {"__dict__": {k: _flatten(v, tensors) for k, v in obj.items()}}
+    if isinstance(obj, (list, tuple)):
+        return {"__list__": [_flatten(v, tensors) for v in obj], "tuple": isinstance(obj, tuple)}
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    raise TypeError(f"Unsupported voice state value: {type(obj).__name__}")
+
+
+def _unflatten(node: Any, handle) -> Any:
+    if isinstance(node, dict):
+        if "__tensor__" in node:
+            return handle.get_tensor(node["__tensor__"])
+        if "__dict__" in node:
+            return {k: _unflatten(v, handle) for k, v in node["__dict__"].items()}
+        if "__list__" in node:
+            items = [_unflatten(v, handle) for v in node["__list__"]]
+            return tuple(items) if node.get("tuple") else items
+    return node
+
+
+class VoiceStore:
+
+    def __init__(self, root: str):
+        self.root = root
+        self._objects_dir = os.path.join(root, "objects")
+        self._refs_dir = os.path.join(root, "refs")
+        os.makedirs(self._objects_dir, exist_ok=True)
+        os.makedirs(self._refs_dir, exist_ok=True)
+
+    def _object_path(self, object_id: str) -> str:
+        return os.path.join(self._objects_dir, f"{object_id}.safetensors")
+
+    def _ref_path(self, voice_id: str) -> str:
+        return os.path.join(self._refs_dir, f"{content_hash(voice_id.encode('utf-8'))[:32]}.json")
+
+    @staticmethod
+    def _atomic_write(path: str, write):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        write(tmp_path)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _write_text(path: str, text: str):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def has_object(self, object_id: str) -> bool:
+        return os.path.exists(self._object_path(object_id))
+
+    def save_object(self, object_id: str, state: Any) -> bool:
+        """Serialise a voice state. Returns False if the state can't be stored (kept in memory only)."""
+        if self.has_object(object_id):
+            return True
+
+        tensors: dict[str, torch.Tensor] = {}
+        try:
+            structure = _flatten(state, tensors)
+        except TypeError as e:
+            LOGGER.warning(f"Voice store: state not serialisable, keeping it in memory only: {e}")
+            return False
+
+        self._atomic_write(
+            self._object_path(object_id),
+            lambda path: save_file(tensors, path, metadata={"structure": json.dumps(structure)})
+        )
+        return True
+
+    def load_object(self, object_id: str) -> Optional[Any]:
+        """Load a voice state; get_tensor copies every tensor into memory, callers keep the result cached."""
+        path = self._object_path(object_id)
+        if not os.path.exists(path):
+            return None
+
+        with safe_open(path, framework="pt", device="cpu") as handle:
+            structure = json.loads(handle.metadata()["structure"])
+            return _unflatten(structure, handle)
+
+    def set_ref(self, voice_id: str, object_id: str):
+        ref = json.dumps({"voice_id": voice_id, "object": object_id})
+        self._atomic_write(self._ref_path(voice_id), lambda path: self._write_text(path, ref))
+
+    def get_ref(self, voice_id: str) -> Optional[str]:
+        """Object id currently assigned to a voice (may have been changed by another worker)."""
+        try:
+            with open(self._ref_path(voice_id), "r", encoding="utf-8") as f:
+                return json.load(f)["object"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            LOGGER.warning(f"Voice store: unreadable ref for '{voice_id}': {e}")
+            return None
+
+    def list_voices(self) -> list[str]:
+        voices = []
+        for name in os.listdir(self._refs_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self._refs_dir, name), "r", encoding="utf-8") as f:
+                    voices.append(json.load(f)["voice_id"])
+            except (OSError, ValueError, KeyError):
+                continue
+        return voices
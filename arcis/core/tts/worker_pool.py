@@ -0,0 +1,132 @@
+import time
+import asyncio
+import threading
+
+from concurrent.futures import ThreadPoolExecutor, Future
+
+from arcis.logger import LOGGER
+
+# how often a session waiting for queue space re-checks the pool
+CAPACITY_POLL_SECONDS = 0.05
+
+
+class TTSBusyError(RuntimeError):
+    """Raised when the synthesis queue is full and new TTS sessions are refused."""
+
+
+class TTSWorkerPool:
+    """
+    Fixed-size pool that runs every blocking TTS call (model load, voice
+    parsing, synthesis). Jobs wait in the executor queue; at most `max_queue`
+    may be waiting, further submits and new sessions are refused, so a burst
+    of voice chats queues up here instead of on the shared default executor.
+
+    Jobs cancelled before a worker picks them up are skipped.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts")
+        self._lock = threading.Lock()
+
+        self._queued = 0
+        self._running = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._cancelled = 0
+        self._rejected = 0
+        self._rejected_jobs = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queued
+
+    def has_capacity(self) -> bool:
+        return self._queued < self.max_queue
+
+    def admit(self):
+        """Admission check for a new TTS session; raises TTSBusyError when saturated."""
+        if not self.has_capacity():
+            with self._lock:
+                self._rejected += 1
+            LOGGER.warning(f"TTS queue full ({self._queued} jobs waiting), refusing new session")
+            raise TTSBusyError("TTS is busy, please try again shortly")
+
+    async def wait_for_capacity(self):
+        """Wait until a job can be queued (workers only signal completion from their threads)."""
+        while not self.has_capacity():
+            await asyncio.sleep(CAPACITY_POLL_SECONDS)
+
+    def _run(self, enqueued_at: float, fn, args):
+        started_at = time.perf_counter()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            wait = started_at - enqueued_at
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+
+        failed = False
+        try:
+            return fn(*args)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._run_total += time.perf_counter() - started_at
+                if failed:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+
+    def _on_done(self, future: Future):
+        # a cancelled job never reached _run, so it is still counted as queued
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+                self._cancelled += 1
+
+    def submit(self, fn, *args) -> asyncio.Future:
+        """
+        Queue a blocking call; cancelling the returned future drops it if it
+        has not started. Raises TTSBusyError when max_queue jobs are waiting.
+        """
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._rejected_jobs += 1
+                raise TTSBusyError("TTS queue is full")
+            self._queued += 1
+            self._submitted += 1
+        future = self._executor.submit(self._run, time.perf_counter(), fn, args)
+        future.add_done_callback(self._on_done)
+        return asyncio.wrap_future(future)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            started = self._completed + self._failed + self._running
+            finished = self._completed + self._failed
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "cancelled": self._cancelled,
+                "rejected_sessions": self._rejected,
+                "rejected_jobs": self._rejected_jobs,
+                "avg_wait_ms": round(self._wait_total / started * 1000, 2) if started else 0.0,
+                "max_wait_ms": round(self._wait_max * 1000, 2),
+                "avg_run_ms": round(self._run_total / finished * 1000, 2) if finished else 0.0,
+            }
@@ -1,18 +1,224 @@
+import asyncio
+
 from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from arcis import Config
 from arcis.database.mongo.connection import mongo, COLLECTIONS
+from arcis.core.llm.resilience import llm_choice
 from arcis.logger import LOGGER
 
 
+def _cached_tokens(usage_metadata: dict) -> int:
+    """
+    Prompt tokens served from the provider's prompt cache: LangChain usage
+    metadata reports them as input_token_details.cache_read, raw OpenAI style
+    usage as prompt_tokens_details.cached_tokens.
+    """
+    details = usage_metadata.get("input_token_details") or usage_metadata.get("prompt_tokens_details") or {}
+    if not isinstance(details, dict):
+        details = getattr(details, "__dict__", {})
+    return details.get("cache_read") or details.get("cached_tokens") or 0
+
+
+ROLLUP_FIELDS = ("prompt_tokens", "completion_tokens", "total_tokens", "cached_tokens")
+ROLLUP_GRANULARITIES = ("hour", "day", "all")
+# bucket of the "all" (all time) rollups
+ALL_TIME = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+RollupKey = Tuple[str, datetime, str, Optional[str]]
+
+
+def rollup_bucket(granularity: str, timestamp: datetime) -> datetime:
+    """Start of the hour / day (UTC) a timestamp falls in."""
+    if granularity == "all":
+        return ALL_TIME
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    timestamp = timestamp.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0) if granularity == "day" else timestamp
+
+
+class TokenUsageWriter:
+    """
+    Buffers token usage records in memory and writes them with insert_many,
+    once TOKEN_USAGE_BATCH_SIZE records are waiting or every
+    TOKEN_USAGE_FLUSH_INTERVAL seconds, and on shutdown. Adding a record
+    does no I/O, so usage accounting stays off the agents' critical path.
+
+    Records of a failed write are put back for the next flush; beyond
+    TOKEN_USAGE_BUFFER_MAX waiting records the oldest are dropped.
+
+    Written records are also summed into hourly, daily and all-time rollup
+    documents per agent and model (one upsert per touched rollup and flush),
+    which the usage endpoints read instead of the raw records. Rollup
+    increments that fail to write are retried with the next flush.
+    """
+
+    def __init__(self, batch_size: int, interval: float, max_buffer: int):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_buffer = max_buffer
+        self._buffer: List[dict] = []
+        self._task: Optional[asyncio.Task] = None
+        self._flushes: Set[asyncio.Task] = set()
+        self._rollups: Dict[RollupKey, Dict[str, int]] = {}
+        self._lock = asyncio.Lock()
+        self.dropped = 0
+
+    def add(self, record: dict):
+        self._buffer.append(record)
+        self._trim()
+        if len(self._buffer) >= self.batch_size:
+            try:
+                task = asyncio.get_running_loop().create_task(self.flush())
+            except RuntimeError:
+                return  # no loop (scripts), the periodic or final flush writes it
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    def _trim(self):
+        overflow = len(self._buffer) - self.max_buffer
+        if overflow > 0:
+            del self._buffer[:overflow]
+            self.dropped += overflow
+            LOGGER.warning(f"Token usage buffer full, dropped {overflow} records")
+
+    async def flush(self):
+        """Write all buffered records in one insert_many, then their rollup increments."""
+        async with self._lock:
+            if mongo.db is None:
+                return
+            if self._buffer:
+                self._add_to_rollups(await self._write_records())
+            if self._rollups:
+                await self._write_rollups()
+
+    async def _write_records(self) -> List[dict]:
+        """Insert the buffered records, returning the ones written."""
+        batch, self._buffer = self._buffer, []
+        try:
+            await mongo.db[COLLECTIONS['token_usage']].insert_many(batch, ordered=False)
+            return batch
+        except BulkWriteError as e:
+            # retry what failed; duplicates were written by an earlier attempt that
+            # raised before they were counted, so they count as written now
+            failed = {err["index"] for err in e.details.get("writeErrors", []) if err.get("code") != 11000}
+            if failed:
+                LOGGER.error(f"Failed to save {len(failed)} token usage records: {e}")
+            self._requeue([record for i, record in enumerate(batch) if i in failed])
+            return [record for i, record in enumerate(batch) if i not in failed]
+        except Exception as e:
+            LOGGER.error(f"Failed to save {len(batch)} token usage records: {e}")
+            self._requeue(batch)
+            return []
+
+    def _add_to_rollups(self, records: Iterable[dict]):
+        for record in records:
+            for granularity in ROLLUP_GRANULARITIES:
+                key = (granularity, rollup_bucket(granularity, record["timestamp"]), record["agent_name"], record.get("model_name"))
+                counters = self._rollups.setdefault(key, dict.fromkeys((*ROLLUP_FIELDS, "request_count"), 0))
+                for field in ROLLUP_FIELDS:
+                    counters[field] += record.get(field) or 0
+                counters["request_count"] += 1
+
+    async def _write_rollups(self):
+        pending, self._rollups = self._rollups, {}
+        operations = [
+            UpdateOne(
+                {"granularity": granularity, "bucket": bucket, "agent_name": agent_name, "model_name": model_name},
+                {"$inc": counters},
+                upsert=True
+            )
+            for (granularity, bucket, agent_name, model_name), counters in pending.items()
+        ]
+        try:
+            await mongo.db[COLLECTIONS['token_usage_rollups']].bulk_write(operations, ordered=False)
+        except Exception as e:
+            LOGGER.error(f"Failed to update {len(operations)} token usage rollups: {e}")
+            for key, counters in pending.items():
+                merged = self._rollups.setdefault(key, dict.fromkeys(counters, 0))
+                for field, value in counters.items():
+                    merged[field] += value
+
+    async def backfill_rollups(self):
+        """Build the rollups from the raw records once, for databases recorded before rollups existed."""
+        rollups = mongo.db[COLLECTIONS['token_usage_rollups']]
+        raw = mongo.db[COLLECTIONS['token_usage']]
+        if await rollups.find_one({}, {"_id": 1}) or not await raw.find_one({}, {"_id": 1}):
+            return
+
+        parts = {"year": {"$year": "$timestamp"}, "month": {"$month": "$timestamp"}, "day": {"$dayOfMonth": "$timestamp"}}
+        buckets = {
+            "hour": {"$dateFromParts": {**parts, "hour": {"$hour": "$timestamp"}}},
+            "day": {"$dateFromParts": parts},
+            "all": {"$literal": ALL_TIME},
+        }
+        async with self._lock:
+            for granularity, bucket in buckets.items():
+                cursor = raw.aggregate([{"$group": {
+                    "_id": {"bucket": bucket, "agent_name": "$agent_name", "model_name": "$model_name"},
+                    **{field: {"$sum": {"$ifNull": [f"${field}", 0]}} for field in ROLLUP_FIELDS},
+                    "request_count": {"$sum": 1},
+                }}])
+                async for row in cursor:
+                    key = (granularity, row["_id"]["bucket"], row["_id"]["agent_name"], row["_id"].get("model_name"))
+                    self._rollups[key] = {field: row[field] for field in (*ROLLUP_FIELDS, "request_count")}
+            LOGGER.info(f"Token usage: backfilling {len(self._rollups)} rollups from raw records")
+            await self._write_rollups()
+
+    def _requeue(self, records: List[dict]):
+        self._buffer[:0] = records
+        self._trim()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the periodic flush and write what is left (app shutdown)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {"buffered": len(self._buffer), "pending_rollups": len(self._rollups), "dropped": self.dropped}
+
+
+token_usage_writer = TokenUsageWriter(
+    batch_size=Config.TOKEN_USAGE_BATCH_SIZE,
+    interval=Config.TOKEN_USAGE_FLUSH_INTERVAL,
+    max_buffer=Config.TOKEN_USAGE_BUFFER_MAX,
+)
+
+
 async def save_token_usage(agent_name: str, usage_metadata: dict, model_name: str = None):
     """
-    Extracts token usage from metadata and saves it to MongoDB.
+    Extracts token usage from metadata and queues it for MongoDB
+    (written in batches by token_usage_writer, no I/O here).
     
     Args:
         agent_name: Name of the agent (e.g., 'planner', 'email_agent')
         usage_metadata: Dictionary containing usage info (usually from LLM response)
                         Expected keys: 'input_tokens', 'output_tokens', 'total_tokens'
-                        or 'prompt_tokens', 'completion_tokens', 'total_tokens'
-        model_name: Optional name of the model used
+                        or 'prompt_tokens', 'completion_tokens', 'total_tokens',
+                        plus cached prompt tokens when the provider reports them
+        model_name: Optional name of the model used, defaults to the
+                    model that answered the latest call (fallback chains)
     """
     if not usage_metadata:
         return
@@ -21,22 +227,25 @@ async def save_token_usage(agent_name: str, usage_metadata: dict, model_name: st
     prompt_tokens = usage_metadata.get("input_tokens") or usage_metadata.get("prompt_tokens", 0)
     completion_tokens = usage_metadata.get("output_tokens") or usage_metadata.get("completion_tokens", 0)
     total_tokens = usage_metadata.get("total_tokens", prompt_tokens + completion_tokens)
+    cached_tokens = _cached_tokens(usage_metadata)
 
     # don't save empty records
     if total_tokens == 0:
         return
 
+    choice = llm_choice.get() or {}
+
     record = {
         "agent_name": agent_name,
         "prompt_tokens": prompt_tokens,
         "completion_tokens": completion_tokens,
         "total_tokens": total_tokens,
-        "model_name": model_name,
+        "cached_tokens": cached_tokens,
+        "model_name": model_name or choice.get("model_name"),
+        "provider": choice.get("provider"),
+        "fallback": choice.get("fallback", False),
+        "hedged": choice.get("hedged", False),
         "timestamp": datetime.now(timezone.utc)
     }
 
-    try:
-        if mongo.db is not None:
-             await mongo.db[COLLECTIONS['token_usage']].insert_one(record)
-    except Exception as e:
-        LOGGER.error(f"Failed to save token usage for {agent_name}: {e}")
+    token_usage_writer.add(record)
@@ -3,7 +3,6 @@ import uuid
 from datetime import datetime, timezone
 
 from langgraph.graph import StateGraph, END
-from langgraph.types import Command
 
 from arcis.models.agents.state import AgentState
 from arcis.core.external_api.gmail import gmail_api
@@ -13,7 +12,9 @@ from arcis.core.workflow_manual.agents.supervisor import supervisor_node, superv
 from arcis.core.workflow_manual.agents.email_agent import email_agent_node
 from arcis.core.workflow_manual.agents.booking_agent import booking_agent_node
 from arcis.core.workflow_manual.agents.utility_agent import utility_agent_node
+from arcis.core.workflow_manual.agents.mcp_agent import mcp_agent_node
 from arcis.core.workflow_manual.agents.replanner import replanner_node, replanner_router
+from arcis.core.workflow_manual.manual_flow import build_resume_command
 
 from arcis.core.llm.short_memory import checkpointer
 from arcis.core.llm.pending_interrupt import save_pending, get_pending_by_id, resolve_pending
@@ -31,6 +32,7 @@ def create_auto_workflow() -> StateGraph:
     workflow.add_node("email_agent", email_agent_node)
     workflow.add_node("booking_agent", booking_agent_node)
     workflow.add_node("utility_agent", utility_agent_node)
+    workflow.add_node("mcp_agent", mcp_agent_node)
     workflow.add_node("replanner", replanner_node)
     
     workflow.set_entry_point("analyzer")
@@ -49,20 +51,18 @@ def create_auto_workflow() -> StateGraph:
         }
     )
     
+    # same routing as the manual flow: every agent of AGENT_NODES, and END when
+    # the supervisor finishes a run that cannot progress
     workflow.add_conditional_edges(
         "supervisor",
         supervisor_router,
-        {
-            "email_agent": "email_agent",
-            "booking_agent": "booking_agent",
-            "utility_agent": "utility_agent",
-            "replanner": "replanner"
-        }
+        ["email_agent", "booking_agent", "utility_agent", "mcp_agent", "replanner", END]
     )
     
     workflow.add_edge("email_agent", "replanner")
     workflow.add_edge("booking_agent", "replanner")
     workflow.add_edge("utility_agent", "replanner")
+    workflow.add_edge("mcp_agent", "replanner")
     
     workflow.add_conditional_edges(
         "replanner",
@@ -149,6 +149,7 @@ Body:
             "last_tool_output": "",
             "final_response": "",
             "current_step_index": 0,
+            "step_results": {},
             "thread_id": thread_id
         }
         
@@ -237,7 +238,8 @@ async def resolve_interrupt(interrupt_id: str, user_answer: str) -> dict:
     LOGGER.info(f"Resolving interrupt {interrupt_id} for thread {thread_id}")
     LOGGER.debug(f"User answer: {user_answer}")
 
-    await app.ainvoke(Command(resume=user_answer), config)
+    current_state = await app.aget_state(config)
+    await app.ainvoke(build_resume_command(current_state, user_answer), config)
 
     # Check if another interrupt was triggered
     source_context = pending.get("source_context", {})
@@ -1,12 +1,16 @@
-from langchain_core.prompts import ChatPromptTemplate
 from arcis.core.llm.factory import LLMFactory
 from arcis.models.agents.state import AgentState
 from arcis.models.agents.response import PlanModel
 from arcis.core.llm.prompts import AUTO_ANALYZER_PROMPT
+from arcis.core.llm.prompt_builder import PromptBuilder
 from arcis.core.utils.token_tracker import save_token_usage
+from arcis.core.llm.response_cache import response_cache
 from arcis.logger import LOGGER
 
 
+analyzer_prompt = PromptBuilder("analyzer", AUTO_ANALYZER_PROMPT, sections=[("input", "Incoming Message")])
+
+
 async def analyzer_node(state: AgentState) -> AgentState:
     """
     Analyzes the input email/message and creates an execution plan.
@@ -16,23 +20,29 @@ async def analyzer_node(state: AgentState) -> AgentState:
     LOGGER.info("ANALYZER: Analyzing incoming message...")
     # LOGGER.debug(f"   Content Preview: {email_content[:100]}...")
     
-    analyzer_prompt = ChatPromptTemplate.from_messages([
-        ("system", AUTO_ANALYZER_PROMPT),
-        ("human", "{input}")
-    ])
-    
-    # Get generic LLM client (can use specific one if configured)
-    llm = LLMFactory.get_client_for_agent("planner") # reusing planner config
+    # own agent config (fallbacks, hedging, response cache)
+    llm = LLMFactory.get_client_for_agent("analyzer")
     structured_llm = llm.with_structured_output(PlanModel, include_raw=True)
-    chain = analyzer_prompt | structured_llm
     
     try:
-        response = await chain.ainvoke({"input": email_content})
-        plan_response = response["parsed"]
+        # recurring notification emails get the same plan without a new LLM call
+        cache_enabled = response_cache.enabled("analyzer")
+        cached, cache_vector = (None, None)
+        if cache_enabled:
+            cached, cache_vector = await response_cache.get("analyzer", email_content)
+
+        if cached is not None:
+            plan_response = PlanModel(**cached)
+        else:
+            response = await structured_llm.ainvoke(analyzer_prompt.format_messages(input=email_content))
+            plan_response = response["parsed"]
+
+            # Save token usage
+            if response.get("raw") and hasattr(response["raw"], "usage_metadata"):
+                await save_token_usage("analyzer", response["raw"].usage_metadata)
 
-        # Save token usage
-        if response.get("raw") and hasattr(response["raw"], "usage_metadata"):
-            await save_token_usage("analyzer", response["raw"].usage_metadata)
+            if cache_enabled and plan_response is not None:
+                await response_cache.put("analyzer", email_content, plan_response.model_dump(), vector=cache_vector)
         
         if not plan_response.steps:
             LOGGER.info("Msg ignored (Irrelevant/Spam)")
@@ -50,7 +60,11 @@ async def analyzer_node(state: AgentState) -> AgentState:
                 "id": i + 1,
                 "description": step.description,
                 "assigned_agent": step.assigned_agent, # type: ignore
-                "status": "pending"
+                "status": "pending",
+                "depends_on": (
+                    [d for d in step.depends_on if 1 <= d <= i]
+                    if step.depends_on is not None else None
+                )
             })
             
         LOGGER.info(f"Plan Created with {len(new_plan)} steps.")
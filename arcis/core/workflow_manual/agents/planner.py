@@ -1,14 +1,15 @@
 import asyncio
 from typing import List
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.messages import HumanMessage, AIMessage
 
 from arcis.core.llm.factory import LLMFactory
 from arcis.models.agents.state import AgentState, PlanStep
 from arcis.models.agents.response import PlanModel
 from arcis.core.llm.prompts import PLANNER_PROMPT
+from arcis.core.llm.prompt_builder import PromptBuilder
+from arcis.core.llm.context_budget import format_history, agent_budget, count_tokens
 from arcis.core.utils.token_tracker import save_token_usage
 from arcis.core.llm.long_memory import long_memory
+from arcis.core.llm.response_cache import response_cache, history_fingerprint, memory_fingerprint
 from arcis.logger import LOGGER
 
 # Import emotion tracker and Hugging Face pipeline
@@ -30,21 +31,16 @@ except Exception as e:
     LOGGER.error(f"Failed to load emotion classifier: {e}")
     emotion_classifier = None
 
-def _format_history(messages: list, max_turns: int = 10) -> str:
-    """Format recent messages into a readable conversation string for the prompt."""
-    if not messages:
-        return "(No prior conversation)"
-    
-    # Take only the last N messages to avoid prompt bloat
-    recent = messages[-max_turns:]
-    lines = []
-    for msg in recent:
-        if isinstance(msg, HumanMessage):
-            lines.append(f"User: {msg.content}")
-        elif isinstance(msg, AIMessage):
-            lines.append(f"Assistant: {msg.content}")
-    
-    return "\n".join(lines) if lines else "(No prior conversation)"
+planner_prompt = PromptBuilder(
+    "planner",
+    PLANNER_PROMPT,
+    sections=[
+        ("history", "Conversation History"),
+        ("long_term_context", "User Context (from long-term memory)"),
+        ("input", "Latest User Request"),
+    ],
+    instruction="Generate a detailed execution plan.",
+)
 
 def _format_memories(memories: list) -> str:
     """Format long-term memory results into context text."""
@@ -93,10 +89,9 @@ async def planner_node(state: AgentState) -> AgentState:
             LOGGER.error(f"Emotion analysis failed: {e}")
     # ------------------------------
 
-    history = _format_history(state.get("messages", []))
-
     # Fetch relevant long-term memories
     long_term_context = ""
+    memories = []
     try:
         if long_memory.client:
             memories = long_memory.search(state["input"], top_k=5)
@@ -105,35 +100,47 @@ async def planner_node(state: AgentState) -> AgentState:
                 LOGGER.info(f"Long-term memory: found {len(memories)} relevant memories")
     except Exception as e:
         LOGGER.warning(f"Long-term memory lookup failed: {e}")
-    
-    planner_prompt = ChatPromptTemplate.from_messages([
-        ("system", PLANNER_PROMPT),
-        ("human", """Conversation History:
-{history}
-
-User Context (from long-term memory):
-{long_term_context}
-
-Latest User Request: {input}
 
-Generate a detailed execution plan.""")
-    ])
-    
-    llm_client = LLMFactory.get_client_for_agent("planner")
-    planner_llm = llm_client.with_structured_output(PlanModel, include_raw=True)
-
-    messages = planner_prompt.format_messages(
-        input=state["input"],
-        history=history,
-        long_term_context=long_term_context or "(No stored context)",
+    # memories are few and short, the conversation gets the rest of the budget
+    history = format_history(
+        state.get("messages", []),
+        budget=agent_budget("planner") - count_tokens(long_term_context) - count_tokens(state["input"]),
     )
-    response = await planner_llm.ainvoke(messages)
-    
-    plan_response = response["parsed"]
     
-    # Save token usage
-    if response.get("raw") and hasattr(response["raw"], "usage_metadata"):
-        await save_token_usage("planner", response["raw"].usage_metadata)
+    # keyed by the latest user message, scoped to the earlier turns (follow-ups like "send it"
+    # depend on them) and the recalled memories
+    cache_enabled = response_cache.enabled("planner")
+    cache_scope = (
+        f"{history_fingerprint(state.get('messages', []))}\n"
+        f"{memory_fingerprint(m['text'] for m in memories)}"
+    )
+    cached, cache_vector = (None, None)
+    if cache_enabled:
+        cached, cache_vector = await response_cache.get("planner", state["input"], scope=cache_scope)
+
+    if cached is not None:
+        plan_response = PlanModel(**cached)
+    else:
+        llm_client = LLMFactory.get_client_for_agent("planner")
+        planner_llm = llm_client.with_structured_output(PlanModel, include_raw=True)
+
+        messages = planner_prompt.format_messages(
+            input=state["input"],
+            history=history,
+            long_term_context=long_term_context or "(No stored context)",
+        )
+        response = await planner_llm.ainvoke(messages)
+        
+        plan_response = response["parsed"]
+        
+        # Save token usage
+        if response.get("raw") and hasattr(response["raw"], "usage_metadata"):
+            await save_token_usage("planner", response["raw"].usage_metadata)
+
+        if cache_enabled and plan_response is not None:
+            await response_cache.put(
+                "planner", state["input"], plan_response.model_dump(), scope=cache_scope, vector=cache_vector
+            )
 
     # Short-circuit for simple conversational messages
     if plan_response.is_conversational:
@@ -147,6 +154,7 @@ Generate a detailed execution plan.""")
             "current_step_index": 0,
             "context": state.get("context", {}),
             "final_response": plan_response.direct_response or "",
+            "step_results": None,
             "workflow_status": "FINISHED"
         }
     
@@ -155,7 +163,12 @@ Generate a detailed execution plan.""")
             "id": idx + 1,
             "description": step.description,
             "status": "pending",
-            "assigned_agent": step.assigned_agent
+            "assigned_agent": step.assigned_agent,
+            # only earlier steps are valid dependencies (guards against cycles)
+            "depends_on": (
+                [d for d in step.depends_on if 1 <= d <= idx]
+                if step.depends_on is not None else None
+            )
         }
         for idx, step in enumerate(plan_response.steps)
     ]
@@ -163,7 +176,9 @@ Generate a detailed execution plan.""")
     LOGGER.info("="*60)
     LOGGER.info(f"PLANNER: Generated {len(plan_steps)} steps")
     for step in plan_steps:
-        LOGGER.info(f"  {step['id']}. [{step['assigned_agent']}] {step['description']}")
+        deps = step["depends_on"]
+        deps_label = "all previous" if deps is None else (", ".join(map(str, deps)) or "none")
+        LOGGER.info(f"  {step['id']}. [{step['assigned_agent']}] {step['description']} (depends on: {deps_label})")
     LOGGER.info("="*60)
     
     # Inject long-term memories into context so agents can use them
@@ -176,4 +191,5 @@ Generate a detailed execution plan.""")
         "plan": plan_steps,
         "current_step_index": 0,
         "context": ctx,
+        "step_results": None,
     }
\ No newline at end of file
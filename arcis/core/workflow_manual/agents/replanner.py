@@ -1,68 +1,64 @@
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.messages import HumanMessage, AIMessage
-
+from arcis import Config
 from arcis.core.llm.factory import LLMFactory
 from arcis.models.agents.state import AgentState
 from arcis.models.agents.response import ReplannerResponse
 from arcis.core.llm.prompts import REPLANNER_PROMPT
+from arcis.core.llm.prompt_builder import PromptBuilder
+from arcis.core.llm.context_budget import (
+    format_history, agent_budget, count_tokens, truncate_tokens, render_value, COMPACT_TOKENS
+)
 from arcis.core.utils.token_tracker import save_token_usage
 from arcis.logger import LOGGER
 
 
-def _format_history(messages: list, max_turns: int = 10) -> str:
-    """Format recent messages into a readable conversation string for the prompt."""
-    if not messages:
-        return "(No prior conversation)"
-    
-    recent = messages[-max_turns:]
-    lines = []
-    for msg in recent:
-        if isinstance(msg, HumanMessage):
-            lines.append(f"User: {msg.content}")
-        elif isinstance(msg, AIMessage):
-            lines.append(f"Assistant: {msg.content}")
-    
-    return "\n".join(lines) if lines else "(No prior conversation)"
+replanner_prompt = PromptBuilder(
+    "replanner",
+    REPLANNER_PROMPT,
+    sections=[
+        ("history", "Conversation History"),
+        ("plan_summary", "Plan Status"),
+        ("execution_report", "Execution Report"),
+    ],
+    instruction="Evaluate the execution and determine next actions.",
+)
 
 
 async def replanner_node(state: AgentState) -> AgentState:
     """Update state based on execution results and determine next steps."""
     
-    current_step = next(
-        (s for s in state["plan"] if s["status"] == "in_progress"),
-        None
-    )
+    # every step dispatched in the last round (one or more ran in parallel)
+    executed_steps = [s for s in state["plan"] if s["status"] == "in_progress"]
+    step_results = state.get("step_results") or {}
     
-    history = _format_history(state.get("messages", []))
+    budget = agent_budget("replanner")
     
-    replanner_prompt = ChatPromptTemplate.from_messages([
-        ("system", REPLANNER_PROMPT),
-        ("human", """Conversation History:
-{history}
-
-Execution Report:
-
-Current Step: {current_step}
-Tool Output: {tool_output}
-
-Plan Status:
-{plan_summary}
-
-Evaluate the execution and determine next actions.""")
-    ])
+    # outputs of this round share two thirds of the budget, the conversation gets what is left
+    output_budget = min(
+        Config.CONTEXT_ENTRY_MAX_TOKENS,
+        max(COMPACT_TOKENS, budget * 2 // 3 // max(1, len(executed_steps))),
+    )
+    execution_report = "\n\n".join([
+        f"Step {s['id']}: {s['description']} ({s['assigned_agent']})\n"
+        f"Tool Output: {truncate_tokens(render_value(step_results.get(str(s['id']), 'No output')), output_budget)}"
+        for s in executed_steps
+    ]) or "No steps were executed."
     
     plan_summary = "\n".join([
         f"{s['id']}. [{s['status']}] {s['description']}"
         for s in state["plan"]
     ])
+
+    history = format_history(
+        state.get("messages", []),
+        budget=budget - count_tokens(execution_report) - count_tokens(plan_summary),
+    )
     
     llm_client = LLMFactory.get_client_for_agent("replanner")
     replanner_llm = llm_client.with_structured_output(ReplannerResponse, include_raw=True)
     
     messages = replanner_prompt.format_messages(
         history=history,
-        current_step=str(current_step) if current_step else "None",
-        tool_output=state.get("last_tool_output", "No output"),
+        execution_report=execution_report,
         plan_summary=plan_summary
     )
     
@@ -74,52 +70,69 @@ Evaluate the execution and determine next actions.""")
     
     response = response["parsed"]
     
-    # Update plan
-    updated_plan = state["plan"].copy()
-    if current_step:
-        for step in updated_plan:
-            if step["id"] == current_step["id"]:
-                step["status"] = response.step_status
+    # Update plan, defaulting steps the replanner did not mention by whether they produced output
+    verdicts = {v.step_id: v.status for v in response.step_statuses}
+    executed_ids = {s["id"] for s in executed_steps}
+    updated_plan = []
+    for step in state["plan"]:
+        step = dict(step)
+        if step["id"] in executed_ids:
+            default_status = "completed" if str(step["id"]) in step_results else "failed"
+            step["status"] = verdicts.get(step["id"], default_status)
+            LOGGER.info(f"Step {step['id']} marked as: {step['status']}")
+        updated_plan.append(step)
     
     # Add new steps if replanning
     if response.new_steps:
-        # Find insertion index (immediately after current step)
+        # Find insertion index (immediately after the last executed step)
         insert_idx = 0
-        current_step_id = 0
-        if current_step:
-            current_step_id = current_step["id"]
-            # Find the index of the current step in the list
-            for i, s in enumerate(updated_plan):
-                if s["id"] == current_step_id:
-                    insert_idx = i + 1
-                    break
-        else:
-            # If no current step (e.g. at start), insert at beginning
-            insert_idx = 0
+        for i, s in enumerate(updated_plan):
+            if s["id"] in executed_ids:
+                insert_idx = i + 1
             
         # Insert new steps
         for i, new_step_model in enumerate(response.new_steps):
             new_plan_step = {
-                "id": 0, # Placeholder, will be re-indexed
+                "id": None, # Placeholder, will be re-indexed
                 "description": new_step_model.description,
                 "status": "pending",
-                "assigned_agent": new_step_model.assigned_agent
+                "assigned_agent": new_step_model.assigned_agent,
+                "depends_on": new_step_model.depends_on
             }
             updated_plan.insert(insert_idx + i, new_plan_step)
             
-        # Re-index all steps to ensure sequence is correct
+        # Re-index all steps to ensure sequence is correct, remapping dependencies to the new IDs
+        id_map = {
+            step["id"]: i + 1
+            for i, step in enumerate(updated_plan)
+            if step["id"] is not None
+        }
         for i, step in enumerate(updated_plan):
             step["id"] = i + 1
+            if step.get("depends_on") is not None:
+                # only earlier steps are valid dependencies (as in the planner, guards against cycles)
+                step["depends_on"] = [
+                    id_map[d] for d in step["depends_on"] if d in id_map and id_map[d] < step["id"]
+                ]
+    
+    # Accumulate outputs into shared context so later steps can see them
+    updated_context = dict(state.get("context", {}))
+    outputs = []
+    for step in executed_steps:
+        output = step_results.get(str(step["id"]))
+        if output is not None:
+            updated_context[step["description"]] = output
+            outputs.append(output)
     
     LOGGER.info(f"REPLANNER: Status = {response.status}")
-    if current_step:
-        LOGGER.info(f"Step {current_step['id']} marked as: {response.step_status}")
     if response.new_steps:
         LOGGER.info(f"Added {len(response.new_steps)} new steps")
     
     return {
-        **state,
         "plan": updated_plan,
+        "context": updated_context,
+        "last_tool_output": "\n\n".join(outputs),
+        "step_results": None,
         "workflow_status": response.status,
         "final_response": response.final_response
     }
@@ -1,74 +1,97 @@
-from langchain_core.prompts import ChatPromptTemplate
+from typing import List
 
-from arcis.core.llm.factory import LLMFactory
-from arcis.core.llm.prompts import SUPERVISOR_PROMPT
-from arcis.models.agents.state import AgentState
-from arcis.models.agents.response import SupervisorRouterResponse
-from arcis.core.utils.token_tracker import save_token_usage
+from langgraph.graph import END
+from langgraph.types import Send
+
+from arcis.models.agents.state import AgentState, PlanStep
 from arcis.logger import LOGGER
 
 
+# assigned_agent (plan) -> graph node name
+AGENT_NODES = {
+    "EmailAgent": "email_agent",
+    "BookingAgent": "booking_agent",
+    "UtilityAgent": "utility_agent",
+    "MCPAgent": "mcp_agent",
+}
+
+
+def _is_ready(step: PlanStep, plan: List[PlanStep]) -> bool:
+    """A pending step is ready once none of the steps it depends on are still pending or running."""
+    if step["status"] != "pending":
+        return False
+
+    depends_on = step.get("depends_on")
+    if depends_on is None:
+        # no declared dependencies -> keep the old sequential behaviour
+        blockers = [s for s in plan if s["id"] < step["id"]]
+    else:
+        blockers = [s for s in plan if s["id"] in depends_on]
+
+    return all(s["status"] not in ("pending", "in_progress") for s in blockers)
+
+
 async def supervisor_node(state: AgentState) -> AgentState:
+    """Pick every step whose dependencies are satisfied and mark them in_progress."""
+
+    plan = state["plan"]
+    pending_steps = [s for s in plan if s["status"] == "pending"]
 
-    pending_steps = [s for s in state["plan"] if s["status"] == "pending"]
-    
     if not pending_steps:
         LOGGER.info("SUPERVISOR: No pending steps, routing to replanner")
-        return {**state, "next_node": "replanner"}
-    
-    current_step = pending_steps[0]
-    
-    supervisor_prompt = ChatPromptTemplate.from_messages([
-        ("system", SUPERVISOR_PROMPT),
-        ("human", """Current Plan Status:
-{plan_summary}
-
-Current Step to Execute:
-ID: {step_id}
-Description: {step_description}
-Assigned Agent: {step_agent}
-
-Determine the next node to route to.""")
-    ])
-    
-    plan_summary = "\n".join([
-        f"{s['id']}. [{s['status']}] {s['description']} ({s['assigned_agent']})"
-        for s in state["plan"]
-    ])
-
-    llm_client = LLMFactory.get_client_for_agent("supervisor")
-    supervisor_llm = llm_client.with_structured_output(SupervisorRouterResponse, include_raw=True)
-    
-    messages = supervisor_prompt.format_messages(
-        plan_summary=plan_summary,
-        step_id=current_step["id"],
-        step_description=current_step["description"],
-        step_agent=current_step["assigned_agent"]
-    )
-    
-    response = await supervisor_llm.ainvoke(messages)
-    routing_response = response["parsed"]
-
-    # Save token usage
-    if response.get("raw") and hasattr(response["raw"], "usage_metadata"):
-        await save_token_usage("supervisor", response["raw"].usage_metadata)
-    
-    LOGGER.info(f"SUPERVISOR: Routing to {routing_response.next_node}")
-    LOGGER.debug(f"Reason: {routing_response.reasoning}")
-    
-    # Mark current step as in_progress
-    updated_plan = state["plan"].copy()
-    for step in updated_plan:
-        if step["id"] == current_step["id"]:
-            step["status"] = "in_progress"
-    
+        return {"next_node": "replanner"}
+
+    ready_ids = {s["id"] for s in plan if _is_ready(s, plan)}
+
+    if not ready_ids:
+        if any(s["status"] == "in_progress" for s in plan):
+            LOGGER.warning("SUPERVISOR: Pending steps wait on running steps, routing to replanner")
+            return {"next_node": "replanner"}
+        # nothing running can unblock them, replanning would loop until the recursion limit
+        LOGGER.error(f"SUPERVISOR: Steps {[s['id'] for s in pending_steps]} can never become ready, finishing")
+        return {
+            "plan": [{**s, "status": "failed"} if s["status"] == "pending" else s for s in plan],
+            "next_node": None,
+            "workflow_status": "FINISHED",
+            "final_response": (
+                "I could not finish this request: some steps of the plan depend on steps that "
+                "can never run. Please try rephrasing the request."
+            ),
+        }
+
+    updated_plan = [
+        {**s, "status": "in_progress"} if s["id"] in ready_ids else s
+        for s in plan
+    ]
+
+    dispatched = [s for s in updated_plan if s["id"] in ready_ids]
+    LOGGER.info(f"SUPERVISOR: Dispatching {len(dispatched)} step(s) in parallel")
+    for step in dispatched:
+        LOGGER.info(f"  {step['id']}. [{step['assigned_agent']}] {step['description']}")
+
     return {
-        **state,
         "plan": updated_plan,
-        "next_node": routing_response.next_node
+        "next_node": None
     }
 
 
-def supervisor_router(state: AgentState) -> str:
-    """Route to the appropriate node based on supervisor decision."""
-    return state.get("next_node", "replanner")
\ No newline at end of file
+def supervisor_router(state: AgentState) -> List[Send] | str:
+    """Fan out every in-progress step to its agent, or go to the replanner if nothing was dispatched."""
+    if state.get("workflow_status") == "FINISHED":
+        return END
+    if state.get("next_node") == "replanner":
+        return "replanner"
+
+    sends = []
+    for step in state["plan"]:
+        if step["status"] != "in_progress":
+            continue
+
+        node = AGENT_NODES.get(step["assigned_agent"])
+        if not node:
+            LOGGER.warning(f"SUPERVISOR: No agent node for {step['assigned_agent']}, skipping step {step['id']}")
+            continue
+
+        sends.append(Send(node, {**state, "active_step": step}))
+
+    return sends or "replanner"
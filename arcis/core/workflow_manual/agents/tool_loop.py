@@ -0,0 +1,173 @@
+import time
+import asyncio
+import contextvars
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Sequence
+
+from langchain_core.messages import BaseMessage, HumanMessage, ToolMessage
+from langchain_core.tools import BaseTool, StructuredTool
+from langgraph.types import interrupt
+
+from arcis import Config
+from arcis.core.utils.token_tracker import save_token_usage
+from arcis.logger import LOGGER
+
+
+# sync tools (DuckDuckGo, Qdrant, Gmail) run here instead of on the event loop
+_tool_executor = ThreadPoolExecutor(max_workers=Config.TOOL_WORKERS, thread_name_prefix="tool")
+
+FORCE_ANSWER_PROMPT = (
+    "You have reached the maximum number of tool iterations. "
+    "Do NOT call any more tools. Synthesize a final answer from the information you have gathered so far."
+)
+
+
+class ToolStats:
+    """Recent latencies and outcomes per tool."""
+
+    def __init__(self, window: int = 200):
+        self._latencies: Dict[str, deque] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._window = window
+
+    def record(self, tool_name: str, seconds: float, outcome: str):
+        self._latencies.setdefault(tool_name, deque(maxlen=self._window)).append(seconds)
+        counts = self._counts.setdefault(tool_name, {"calls": 0, "errors": 0, "timeouts": 0})
+        counts["calls"] += 1
+        if outcome != "ok":
+            counts[outcome] += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for tool_name, samples in self._latencies.items():
+            ordered = sorted(samples)
+            result[tool_name] = {
+                **self._counts[tool_name],
+                "avg_ms": round(sum(ordered) / len(ordered) * 1000, 1),
+                "p90_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))] * 1000, 1),
+                "max_ms": round(ordered[-1] * 1000, 1),
+            }
+        return result
+
+
+tool_stats = ToolStats()
+
+
+async def _save_usage(agent_name: str, response):
+    if getattr(response, "usage_metadata", None):
+        await save_token_usage(agent_name, response.usage_metadata)
+    elif getattr(response, "response_metadata", None) and response.response_metadata.get("token_usage"):
+        await save_token_usage(agent_name, response.response_metadata.get("token_usage"))
+
+
+async def _invoke_tool(tool: BaseTool, args: Dict[str, Any]) -> Any:
+    if isinstance(tool, StructuredTool) and tool.coroutine is None:
+        # copy the context so callbacks / tracing still see the current run
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_tool_executor, contextvars.copy_context().run, tool.invoke, args)
+    return await tool.ainvoke(args)
+
+
+async def _run_tool_call(agent_name: str, tool_map: Dict[str, BaseTool], tool_call: Dict[str, Any]) -> ToolMessage:
+    tool_name = tool_call["name"]
+    tool = tool_map.get(tool_name)
+    if tool is None:
+        LOGGER.warning(f"{agent_name}: tool {tool_name} not found")
+        return ToolMessage(content=f"Error: tool {tool_name} is not available", tool_call_id=tool_call["id"])
+
+    timeout = (tool.metadata or {}).get("timeout", Config.TOOL_TIMEOUT)
+    LOGGER.debug(f"🔧 Calling tool: {tool_name} with args: {tool_call['args']}")
+
+    started = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(_invoke_tool(tool, tool_call["args"]), timeout)
+        content, outcome = str(result), "ok"
+        LOGGER.debug(f"Tool result: {result}")
+    except asyncio.TimeoutError:
+        # a threaded tool keeps running in the background, its result is discarded
+        content, outcome = f"Error executing {tool_name}: timed out after {timeout}s", "timeouts"
+        LOGGER.error(content)
+    except Exception as e:
+        content, outcome = f"Error executing {tool_name}: {str(e)}", "errors"
+        LOGGER.error(content)
+
+    tool_stats.record(tool_name, time.perf_counter() - started, outcome)
+    return ToolMessage(content=content, tool_call_id=tool_call["id"])
+
+
+async def execute_tool_calls(agent_name: str, tools: Sequence[BaseTool], tool_calls: List[Dict[str, Any]]) -> List[ToolMessage]:
+    """
+    Run all tool calls of one LLM turn concurrently; the calls of a turn are
+    independent as the model issued them without seeing each other's results.
+    Tool messages come back in call order, errors and timeouts as their content.
+    """
+    tool_map = {tool.name: tool for tool in tools}
+    started = time.perf_counter()
+    messages = await asyncio.gather(*(_run_tool_call(agent_name, tool_map, tc) for tc in tool_calls))
+    LOGGER.debug(f"{agent_name}: {len(tool_calls)} tool calls took {time.perf_counter() - started:.2f}s")
+    return list(messages)
+
+
+async def run_tool_loop(
+    agent_name: str,
+    llm_client,
+    tools: Sequence[BaseTool],
+    messages: List[BaseMessage],
+    max_iterations: int,
+) -> str:
+    """
+    Shared agent loop: call the model with its tools, execute the requested
+    tool calls, feed the results back, until the model answers without tools.
+
+    A response containing [NEED_INPUT] interrupts the graph to ask the user.
+    On the last iteration the model is told to stop using tools and answer
+    with what it has.
+
+    Returns:
+        The final answer text of the agent.
+    """
+    label = agent_name.replace("_", " ").upper()
+    tool_llm = llm_client.bind_tools(tools)
+    tool_output = ""
+
+    for i in range(max_iterations):
+        # On the last iteration, tell the LLM to stop using tools and produce a final answer
+        if i == max_iterations - 1:
+            messages.append(HumanMessage(content=FORCE_ANSWER_PROMPT))
+            LOGGER.warning(f"{label}: Reached max iterations ({max_iterations}), forcing final answer")
+            final_response = await llm_client.ainvoke(messages)
+            await _save_usage(agent_name, final_response)
+            tool_output = final_response.content
+            break
+
+        response = await tool_llm.ainvoke(messages)
+        await _save_usage(agent_name, response)
+
+        # Check if agent needs user input
+        if response.content and "[NEED_INPUT]" in response.content:
+            question = response.content.replace("[NEED_INPUT]", "").strip()
+            LOGGER.info(f"{label} needs user input: {question}")
+            user_answer = interrupt(question)
+
+            LOGGER.debug(f"User provided: {user_answer}")
+            messages.append(response)
+            messages.append(HumanMessage(content=f"User provided: {user_answer}"))
+            response = await tool_llm.ainvoke(messages)
+            await _save_usage(agent_name, response)
+
+        # If no tool calls, we are done
+        if not response.tool_calls:
+            tool_output = response.content
+            LOGGER.debug(f"{label}(final): {tool_output}")
+            break
+
+        LOGGER.debug(f"Iteration {i+1}: Processing {len(response.tool_calls)} tool calls")
+        tool_messages = await execute_tool_calls(agent_name, tools, response.tool_calls)
+
+        # Append the assistant's request and the tool outputs to the history
+        messages.append(response)
+        messages.extend(tool_messages)
+
+    return tool_output
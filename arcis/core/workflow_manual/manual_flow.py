@@ -1,3 +1,5 @@
+import re
+
 from langgraph.graph import StateGraph, END
 from langgraph.types import Command
 from langchain_core.messages import HumanMessage, AIMessage
@@ -5,7 +7,7 @@ from langchain_core.messages import HumanMessage, AIMessage
 from arcis.models.agents.state import AgentState
 
 from arcis.core.workflow_manual.agents.planner import planner_node
-from arcis.core.workflow_manual.agents.supervisor import supervisor_node, supervisor_router
+from arcis.core.workflow_manual.agents.supervisor import supervisor_node, supervisor_router, AGENT_NODES
 from arcis.core.workflow_manual.agents.email_agent import email_agent_node
 from arcis.core.workflow_manual.agents.booking_agent import booking_agent_node
 from arcis.core.workflow_manual.agents.utility_agent import utility_agent_node
@@ -40,16 +42,13 @@ def create_workflow() -> StateGraph:
         }
     )
     
+    # supervisor fans out every ready step to its agent in parallel (Send),
+    # the agent -> replanner edges join the branches before replanning;
+    # it ends the run itself when the remaining steps can never become ready
     workflow.add_conditional_edges(
         "supervisor",
         supervisor_router,
-        {
-            "email_agent": "email_agent",
-            "booking_agent": "booking_agent",
-            "utility_agent": "utility_agent",
-            "mcp_agent": "mcp_agent",
-            "replanner": "replanner"
-        }
+        ["email_agent", "booking_agent", "utility_agent", "mcp_agent", "replanner", END]
     )
     
     workflow.add_edge("email_agent", "replanner")
@@ -69,87 +68,323 @@ def create_workflow() -> StateGraph:
     return workflow
 
 
-async def run_workflow(user_input: str, thread_id: str | None):
-    workflow = create_workflow() # TODO one time instantiate workflow
+def build_resume_command(current_state, user_input: str) -> Command:
+    """
+    Build the resume command for a paused graph.
+    Parallel branches can be paused at the same time; the answer goes to the
+    interrupt that was shown to the user (the first one), the rest ask again.
+    """
+    interrupts = [
+        intr
+        for task in current_state.tasks
+        for intr in (getattr(task, "interrupts", None) or [])
+    ]
+    if len(interrupts) > 1:
+        return Command(resume={interrupts[0].id: user_input})
+    return Command(resume=user_input)
 
-    app = workflow.compile(checkpointer=checkpointer)
-    config = {"configurable": {"thread_id": thread_id}}
 
+async def _prepare_run(app, config: dict, user_input: str, thread_id: str | None):
+    """Build the graph input: a resume command when paused at an interrupt, otherwise a fresh payload."""
     current_state = await app.aget_state(config)
 
     # Check if graph is paused (resuming from an interrupt)
     if current_state.next:
         LOGGER.info(f"Resuming workflow for thread {thread_id} with: {user_input}")
-        await app.ainvoke(
-            Command(resume=user_input),
-            config
-        )
+        return build_resume_command(current_state, user_input)
+
+    # Fresh invocation
+    if not current_state.values:
+        payload = {
+            "input": user_input,
+            "messages": [HumanMessage(content=user_input)],
+            "plan": [],
+            "current_step_index": 0,
+            "context": {},
+            "last_tool_output": "",
+            "final_response": "",
+            "step_results": {},
+            "thread_id": thread_id
+        }
     else:
-        # Fresh invocation
-        if not current_state.values:
-            payload = {
-                "input": user_input,
-                "messages": [HumanMessage(content=user_input)],
-                "plan": [],
-                "current_step_index": 0,
-                "context": {},
-                "last_tool_output": "",
-                "final_response": "",
-                "thread_id": thread_id
-            }
-        else:
-            # continuing conversation from chat history (not interupt but same chat)
-            payload = {
-                "input": user_input,
-                "messages": [HumanMessage(content=user_input)],
-                "thread_id": thread_id,
-                "workflow_status": None # for every calls force set not finished (bcz history may set it as finished)
-            }
+        # continuing conversation from chat history (not interupt but same chat)
+        payload = {
+            "input": user_input,
+            "messages": [HumanMessage(content=user_input)],
+            "thread_id": thread_id,
+            "workflow_status": None # for every calls force set not finished (bcz history may set it as finished)
+        }
 
-        LOGGER.info(f"User Request: {user_input}")
-        
-        await app.ainvoke(
-            payload,
-            config
-        )
+    LOGGER.info(f"User Request: {user_input}")
+    return payload
 
-    # Check state AFTER invocation to see if graph paused at an interrupt
+
+async def _interrupt_result(app, config: dict, thread_id: str | None) -> dict | None:
+    """Check state AFTER invocation to see if graph paused at an interrupt."""
     state_after = await app.aget_state(config)
 
-    if state_after.next:
-        for task in state_after.tasks:
-            if hasattr(task, 'interrupts') and task.interrupts:
-                question = task.interrupts[0].value
-                LOGGER.info(f"Graph interrupted: {question}")
-                return {
-                    "type": "interrupt",
-                    "response": str(question),
-                    "thread_id": thread_id,
-                }
-        # Fallback if we can't extract the interrupt value
-        return {
-            "type": "interrupt",
-            "response": "I need more information to continue.",
-            "thread_id": thread_id,
-        }
+    if not state_after.next:
+        return None
+
+    for task in state_after.tasks:
+        if hasattr(task, 'interrupts') and task.interrupts:
+            question = task.interrupts[0].value
+            LOGGER.info(f"Graph interrupted: {question}")
+            return {
+                "type": "interrupt",
+                "response": str(question),
+                "thread_id": thread_id,
+            }
+    # Fallback if we can't extract the interrupt value
+    return {
+        "type": "interrupt",
+        "response": "I need more information to continue.",
+        "thread_id": thread_id,
+    }
+
 
-    final_state = state_after.values
+async def _finalize_run(app, config: dict) -> dict:
+    """Append the AI's final response as a message so next turn sees it."""
+    final_state = (await app.aget_state(config)).values
     LOGGER.debug(final_state)
 
-    # Append the AI's final response as a message so next turn sees it
     final_resp = final_state.get("final_response", "")
     if final_resp:
         await app.aupdate_state(
             config,
             {"messages": [AIMessage(content=final_resp)]}
         )
+    return final_state
 
-    # Extract key details from conversation and save to long-term memory
+
+async def _extract_memories(final_state: dict):
+    """Extract key details from conversation and save to long-term memory."""
     try:
         conv_messages = final_state.get("messages", [])
         if conv_messages:
             await memory_extractor.extract_and_store(conv_messages, source="manual_chat")
     except Exception as e:
         LOGGER.warning(f"Memory extraction skipped: {e}")
+
+
+async def run_workflow(user_input: str, thread_id: str | None):
+    workflow = create_workflow() # TODO one time instantiate workflow
+
+    app = workflow.compile(checkpointer=checkpointer)
+    config = {"configurable": {"thread_id": thread_id}}
+
+    graph_input = await _prepare_run(app, config, user_input, thread_id)
+    await app.ainvoke(graph_input, config)
+
+    interrupt_result = await _interrupt_result(app, config, thread_id)
+    if interrupt_result:
+        return interrupt_result
+
+    final_state = await _finalize_run(app, config)
+    await _extract_memories(final_state)
     
-    return final_state
\ No newline at end of file
+    return final_state
+
+
+class _JsonFieldStreamer:
+    """
+    Incrementally pulls the value of one string field out of streamed JSON
+    (structured-output arguments arrive as partial JSON text).
+    """
+
+    _ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+    def __init__(self, field: str):
+        self._pattern = re.compile(rf'"{re.escape(field)}"\s*:\s*"')
+        self._buffer = ""
+        self._pos: int | None = None
+        self._done = False
+
+    def feed(self, text: str) -> str:
+        """Add a chunk of raw JSON and return the newly decoded part of the field value."""
+        if self._done or not text:
+            return ""
+        self._buffer += text
+
+        if self._pos is None:
+            match = self._pattern.search(self._buffer)
+            if not match:
+                return ""
+            self._pos = match.end()
+
+        out = []
+        buf = self._buffer
+        while self._pos < len(buf):
+            char = buf[self._pos]
+            if char == '"':
+                self._done = True
+                break
+            if char != '\\':
+                out.append(char)
+                self._pos += 1
+                continue
+
+            # escape sequence, wait for the rest of it if it is split across chunks
+            if self._pos + 1 >= len(buf):
+                break
+            code = buf[self._pos + 1]
+            if code == 'u':
+                if self._pos + 6 > len(buf):
+                    break
+                codepoint = int(buf[self._pos + 2:self._pos + 6], 16)
+                if 0xD800 <= codepoint < 0xDC00:
+                    # surrogate pair (emoji etc.), both halves are needed
+                    if self._pos + 12 > len(buf):
+                        break
+                    low = int(buf[self._pos + 8:self._pos + 12], 16)
+                    codepoint = 0x10000 + ((codepoint - 0xD800) << 10) + (low - 0xDC00)
+                    self._pos += 6
+                out.append(chr(codepoint))
+                self._pos += 6
+            else:
+                out.append(self._ESCAPES.get(code, code))
+                self._pos += 2
+
+        return "".join(out)
+
+
+# node -> structured output field holding the user-facing text
+_RESPONSE_FIELDS = {
+    "planner": "direct_response",
+    "replanner": "final_response",
+}
+
+# node -> (output field telling whether the run ends the workflow, value that does)
+# the planner only answers directly for conversational messages, the replanner
+# writes a final_response every round but only a FINISHED one is the answer
+_FINAL_MARKERS = {
+    "planner": (re.compile(r'"is_conversational"\s*:\s*(true|false)'), "true"),
+    "replanner": (re.compile(r'"status"\s*:\s*"(CONTINUE|FINISHED|FAILED)"'), "FINISHED"),
+}
+
+
+class _FinalAnswerStreamer:
+    """
+    Streams the response field of one planner/replanner run only if that run
+    ends the workflow. The marker field normally precedes the response in the
+    JSON, so the answer is usually streamed live; text seen before the marker
+    is held back, and released or dropped once it is known (at the latest
+    from the node's workflow_status).
+    """
+
+    def __init__(self, node: str):
+        self._field = _JsonFieldStreamer(_RESPONSE_FIELDS[node])
+        self._marker, self._final_value = _FINAL_MARKERS[node]
+        self._raw = ""
+        self._held: list[str] = []
+        self.is_final: bool | None = None
+
+    def feed(self, text: str) -> str:
+        """Add a chunk of raw JSON and return the answer text that can be sent now."""
+        if self.is_final is None:
+            self._raw += text
+            match = self._marker.search(self._raw)
+            if match:
+                self.is_final = match.group(1) == self._final_value
+                self._raw = ""
+        token = self._field.feed(text)
+        if self.is_final is None:
+            if token:
+                self._held.append(token)
+            return ""
+        if not self.is_final:
+            return ""
+        held, self._held = "".join(self._held), []
+        return held + token
+
+    def resolve(self, is_final: bool) -> str:
+        """Decide a run whose marker was never seen; returns the held text if it is the answer."""
+        if self.is_final is None:
+            self.is_final = is_final
+        held, self._held = "".join(self._held), []
+        return held if self.is_final else ""
+
+
+def _chunk_text(chunk) -> str:
+    """Raw text of a streamed model chunk (content for JSON mode, tool-call args for function calling)."""
+    text = chunk.content if isinstance(chunk.content, str) else ""
+    for tool_chunk in getattr(chunk, "tool_call_chunks", None) or []:
+        text += tool_chunk.get("args") or ""
+    return text
+
+
+async def stream_workflow(user_input: str, thread_id: str | None):
+    """
+    Run the manual workflow with astream_events and yield progress events as dicts:
+    plan, step_start, step_end, token (final response text as it is generated,
+    only from the planner/replanner run that finishes the workflow),
+    and finally either a final or an interrupt event.
+    """
+    workflow = create_workflow()
+
+    app = workflow.compile(checkpointer=checkpointer)
+    config = {"configurable": {"thread_id": thread_id}}
+
+    graph_input = await _prepare_run(app, config, user_input, thread_id)
+
+    agent_nodes = set(AGENT_NODES.values())
+    streamers: dict[str, _FinalAnswerStreamer] = {}
+    # model runs of the current planner/replanner node, decided when the node ends
+    node_runs: dict[str, list[_FinalAnswerStreamer]] = {}
+
+    async for event in app.astream_events(graph_input, config, version="v2"):
+        kind = event["event"]
+        name = event.get("name")
+        node = event.get("metadata", {}).get("langgraph_node")
+
+        if kind == "on_chat_model_start" and node in _RESPONSE_FIELDS:
+            streamers[event["run_id"]] = _FinalAnswerStreamer(node)
+            node_runs.setdefault(node, []).append(streamers[event["run_id"]])
+
+        elif kind == "on_chat_model_stream" and event["run_id"] in streamers:
+            token = streamers[event["run_id"]].feed(_chunk_text(event["data"]["chunk"]))
+            if token:
+                yield {"type": "token", "content": token}
+
+        elif kind == "on_chat_model_end":
+            streamers.pop(event["run_id"], None)
+
+        # node level events (the node runnable carries the node name)
+        elif name != node:
+            continue
+
+        elif kind == "on_chain_start" and name in agent_nodes:
+            step = (event["data"].get("input") or {}).get("active_step")
+            if step:
+                yield {"type": "step_start", "step": step}
+
+        elif kind == "on_chain_end" and name in agent_nodes:
+            output = event["data"].get("output") or {}
+            for step_id, result in (output.get("step_results") or {}).items():
+                yield {"type": "step_end", "step_id": int(step_id), "output": result}
+
+        elif kind == "on_chain_end" and name in ("planner", "replanner"):
+            output = event["data"].get("output") or {}
+            finished = output.get("workflow_status") == "FINISHED"
+            for streamer in node_runs.pop(name, []):
+                held = streamer.resolve(finished)
+                if held:
+                    yield {"type": "token", "content": held}
+            if output.get("plan"):
+                yield {"type": "plan", "plan": output["plan"]}
+
+    interrupt_result = await _interrupt_result(app, config, thread_id)
+    if interrupt_result:
+        yield interrupt_result
+        return
+
+    final_state = await _finalize_run(app, config)
+    yield {
+        "type": "final",
+        "response": final_state.get("final_response", ""),
+        "plan": final_state.get("plan", []),
+        "thread_id": thread_id,
+    }
+
+    # runs once the consumer has handled the final event
+    await _extract_memories(final_state)
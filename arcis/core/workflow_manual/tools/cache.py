@@ -0,0 +1,217 @@
+import json
+import time
+import asyncio
+import inspect
+import hashlib
+import functools
+import threading
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from langchain_core.tools import StructuredTool
+
+from arcis import Config
+from arcis.logger import LOGGER
+
+
+def _looks_failed(result: Any) -> bool:
+    """Error results of the repo's tools ("❌ ..." text or a JSON "status": "error")."""
+    text = str(result)
+    return text.startswith("❌") or '"status": "error"' in text
+
+
+class _CallAbandoned(Exception):
+    """Set on a shared in-flight call whose caller was cancelled; waiters run the call themselves."""
+
+
+class ToolCache:
+    """
+    Results of idempotent (read only) tools keyed by tool name and a hash of
+    the call arguments, each tool with its own TTL. Entries carry tags so
+    writes can invalidate the reads they affect (e.g. "calendar").
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        # sync tools read and fill the cache from the tool thread pool
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(tool_name: str, args: Dict[str, Any]) -> str:
+        payload = json.dumps(args, sort_keys=True, default=str)
+        return f"{tool_name}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+    def _count(self, tool_name: str, field: str):
+        stats = self._stats.setdefault(tool_name, {"hits": 0, "misses": 0, "invalidated": 0})
+        stats[field] += 1
+
+    def get(self, tool_name: str, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry["expires"] < time.monotonic():
+                self._entries.pop(key, None)
+                self._count(tool_name, "misses")
+                return None
+            self._entries.move_to_end(key)
+            self._count(tool_name, "hits")
+            return entry["value"]
+
+    def put(self, key: str, value: Any, ttl: float, tags: Iterable[str]):
+        with self._lock:
+            self._entries[key] = {"value": value, "expires": time.monotonic() + ttl, "tags": frozenset(tags)}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def inflight(self, key: str) -> Optional[asyncio.Future]:
+        """Future of an identical async call already running, if any."""
+        return self._inflight.get(key)
+
+    def begin_call(self, key: str) -> asyncio.Future:
+        """Register a running async call so identical calls can wait for its result."""
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        return future
+
+    def end_call(self, key: str, future: asyncio.Future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    def invalidate(self, *tags: str):
+        """Drop every entry carrying one of the tags."""
+        with self._lock:
+            stale = [k for k, entry in self._entries.items() if entry["tags"] & set(tags)]
+            for key in stale:
+                self._count(key.split(":", 1)[0], "invalidated")
+                del self._entries[key]
+        if stale:
+            LOGGER.debug(f"Tool cache: invalidated {len(stale)} entries for {tags}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        entries: Dict[str, int] = {}
+        with self._lock:
+            for key in self._entries:
+                tool_name = key.split(":", 1)[0]
+                entries[tool_name] = entries.get(tool_name, 0) + 1
+        return {
+            tool_name: {**stats, "entries": entries.get(tool_name, 0)}
+            for tool_name, stats in self._stats.items()
+        }
+
+
+tool_cache = ToolCache(max_entries=Config.TOOL_CACHE_MAX_ENTRIES)
+
+
+def cached_tool(ttl: float, tags: Iterable[str] = ()) -> Callable[[StructuredTool], StructuredTool]:
+    """
+    Cache the results of an idempotent tool for `ttl` seconds. Apply on top
+    of @tool; `tags` name the data the tool reads so writes can call
+    tool_cache.invalidate(tag). Error results are not cached, and concurrent
+    identical calls of an async tool share one execution.
+    """
+    tags = tuple(tags)
+
+    def decorator(lc_tool: StructuredTool) -> StructuredTool:
+        original = lc_tool.coroutine or lc_tool.func
+        signature = inspect.signature(original)
+
+        def make_key(args, kwargs) -> str:
+            # defaults filled in, so omitted and explicit default arguments share an entry
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return tool_cache.key(lc_tool.name, dict(bound.arguments))
+
+        def store(key, result):
+            if not _looks_failed(result):
+                tool_cache.put(key, result, ttl, tags)
+
+        if lc_tool.coroutine is not None:
+            @functools.wraps(original)
+            async def cached_coroutine(*args, **kwargs):
+                if not Config.TOOL_CACHE_ENABLED:
+                    return await original(*args, **kwargs)
+                key = make_key(args, kwargs)
+                while True:
+                    if (result := tool_cache.get(lc_tool.name, key)) is not None:
+                        return result
+                    if (running := tool_cache.inflight(key)) is None:
+                        break
+                    try:
+                        return await asyncio.shield(running)
+                    except _CallAbandoned:
+                        continue  # its caller was cancelled, run the call here instead
+
+                future = tool_cache.begin_call(key)
+                try:
+                    result = await original(*args, **kwargs)
+                    store(key, result)
+                    future.set_result(result)
+                    return result
+                except asyncio.CancelledError:
+                    # never cancel the shared future: waiters were not cancelled themselves
+                    future.set_exception(_CallAbandoned())
+                    future.exception()
+                    raise
+                except Exception as e:
+                    future.set_exception(e)
+                    future.exception()  # retrieved here, waiters get it through await
+                    raise
+                finally:
+                    tool_cache.end_call(key, future)
+
+            lc_tool.coroutine = cached_coroutine
+        else:
+            @functools.wraps(original)
+            def cached_func(*args, **kwargs):
+                if not Config.TOOL_CACHE_ENABLED:
+                    return original(*args, **kwargs)
+                key = make_key(args, kwargs)
+                if (result := tool_cache.get(lc_tool.name, key)) is not None:
+                    return result
+                result = original(*args, **kwargs)
+                store(key, result)
+                return result
+
+            lc_tool.func = cached_func
+
+        lc_tool.metadata = {**(lc_tool.metadata or {}), "idempotent": True, "cache_ttl": ttl}
+        return lc_tool
+
+    return decorator
+
+
+def invalidates(*tags: str) -> Callable[[StructuredTool], StructuredTool]:
+    """Mark a write tool: once it has run, cached reads tagged with `tags` are dropped."""
+
+    def decorator(lc_tool: StructuredTool) -> StructuredTool:
+        original_coroutine, original_func = lc_tool.coroutine, lc_tool.func
+
+        if original_coroutine is not None:
+            @functools.wraps(original_coroutine)
+            async def coroutine(*args, **kwargs):
+                try:
+                    return await original_coroutine(*args, **kwargs)
+                finally:
+                    tool_cache.invalidate(*tags)
+
+            lc_tool.coroutine = coroutine
+        if original_func is not None:
+            @functools.wraps(original_func)
+            def func(*args, **kwargs):
+                try:
+                    return original_func(*args, **kwargs)
+                finally:
+                    tool_cache.invalidate(*tags)
+
+            lc_tool.func = func
+        return lc_tool
+
+    return decorator
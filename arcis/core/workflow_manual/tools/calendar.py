@@ -1,12 +1,20 @@
-from datetime import datetime
+from datetime import datetime, time
 from langchain.tools import tool
 
 from arcis.core.external_api.internal_calendar import calendar_wrapper, CalendarItem
+from arcis.core.external_api.calendar_recurrence import Recurrence
+from arcis.core.external_api.free_busy import free_busy
+from arcis.core.workflow_manual.tools.cache import cached_tool, tool_cache
+
+def _format_slot(slot: dict, title: str = "") -> str:
+    text = f"{slot['start_time'].strftime('%Y-%m-%d %H:%M')} - {slot['end_time'].strftime('%H:%M')}"
+    return f"{title} ({text})" if title else text
 
 @tool
-async def calendar_add_item(title: str, item_type: str, start_time: str, end_time: str = None, description: str = "") -> str:
+async def calendar_add_item(title: str, item_type: str, start_time: str, end_time: str = None, description: str = "", rrule: str = None) -> str:
     """
     Adds a new event, todo, or reminder to the calendar.
+    A repeating item is added once with an rrule, not once per occurrence.
 
     Args:
         title: The title/summary of the item.
@@ -14,6 +22,8 @@ async def calendar_add_item(title: str, item_type: str, start_time: str, end_tim
         start_time: ISO 8601 formatted datetime string (e.g., '2023-10-27T10:00:00').
         end_time: Optional ISO 8601 formatted datetime string.
         description: Optional description or notes.
+        rrule: Optional repeat rule, e.g. 'FREQ=WEEKLY;BYDAY=MO,WE' or 'FREQ=DAILY;COUNT=10'
+            (FREQ DAILY/WEEKLY/MONTHLY/YEARLY, INTERVAL, BYDAY, COUNT, UNTIL=YYYYMMDD).
     """
     try:
         start_dt = datetime.fromisoformat(start_time)
@@ -24,16 +34,24 @@ async def calendar_add_item(title: str, item_type: str, start_time: str, end_tim
             item_type=item_type,
             start_time=start_dt,
             end_time=end_dt,
-            description=description
+            description=description,
+            recurrence=Recurrence.from_rrule(rrule) if rrule else None
         )
         
+        conflicts = []
+        if item_type == "event" and end_dt:
+            conflicts = await free_busy.conflicts(start_dt, end_dt)
         item_id = await calendar_wrapper.add_item(item)
-        return f"✅ Calendar item added successfully. ID: {item_id}"
+        message = f"✅ Calendar item added successfully. ID: {item_id}"
+        if conflicts:
+            message += "\n⚠️ Overlaps with: " + "; ".join(_format_slot(c, c["title"]) for c in conflicts)
+        return message
     except ValueError as e:
-        return f"❌ Error parsing date: {e}. Please use ISO 8601 format (YYYY-MM-DDTHH:MM:SS)."
+        return f"❌ Error parsing date or rrule: {e}. Please use ISO 8601 format (YYYY-MM-DDTHH:MM:SS)."
     except Exception as e:
         return f"❌ Error adding item: {e}"
 
+@cached_tool(ttl=300, tags=["calendar"])
 @tool
 async def calendar_get_items(start_time: str, end_time: str) -> str:
     """
@@ -51,7 +69,10 @@ async def calendar_get_items(start_time: str, end_time: str) -> str:
         if not items:
             return "No items found in this range."
             
-        result = [f"- [{item['item_type'].upper()}] {item['title']} ({item['start_time']})" for item in items]
+        result = [
+            f"- [{item['item_type'].upper()}] {item['title']} ({item['start_time']}) ID: {item['_id']}"
+            for item in items
+        ]
         return "\n".join(result)
     except Exception as e:
         return f"❌ Error retrieving items: {e}"
@@ -59,7 +80,8 @@ async def calendar_get_items(start_time: str, end_time: str) -> str:
 @tool
 async def calendar_delete_item(item_id: str) -> str:
     """
-    Deletes a calendar item by its ID.
+    Deletes a calendar item by its ID. The ID of one occurrence of a repeating
+    item ('<id>:<date>') removes only that occurrence, the plain ID the whole series.
 
     Args:
         item_id: The unique ID of the item to delete.
@@ -82,4 +104,64 @@ async def calendar_toggle_todo(item_id: str) -> str:
         return f"✅ Todo {item_id} status toggled."
     return f"❌ Failed to toggle todo {item_id}. ensure it exists and is a todo."
 
-calendar_tools = [calendar_add_item, calendar_get_items, calendar_delete_item, calendar_toggle_todo]
+@cached_tool(ttl=300, tags=["calendar"])
+@tool
+async def calendar_check_conflicts(start_time: str, end_time: str) -> str:
+    """
+    Lists the events overlapping a time period, e.g. before scheduling something.
+
+    Args:
+        start_time: ISO 8601 formatted start datetime string.
+        end_time: ISO 8601 formatted end datetime string.
+    """
+    try:
+        conflicts = await free_busy.conflicts(datetime.fromisoformat(start_time), datetime.fromisoformat(end_time))
+        if not conflicts:
+            return "No conflicts, the period is free."
+        return "\n".join(f"- {_format_slot(c, c['title'])} ID: {c['_id']}" for c in conflicts)
+    except Exception as e:
+        return f"❌ Error checking conflicts: {e}"
+
+@cached_tool(ttl=300, tags=["calendar"])
+@tool
+async def calendar_find_free_slots(
+    start_time: str,
+    end_time: str,
+    duration_minutes: int = 30,
+    day_start: str = "09:00",
+    day_end: str = "18:00",
+    max_slots: int = 10
+) -> str:
+    """
+    Finds open time slots without events, within working hours of each day.
+
+    Args:
+        start_time: ISO 8601 formatted start datetime string of the search period.
+        end_time: ISO 8601 formatted end datetime string of the search period.
+        duration_minutes: Minimum length of a slot in minutes.
+        day_start: Earliest time of day for a slot (HH:MM).
+        day_end: Latest time of day for a slot (HH:MM).
+        max_slots: Maximum number of slots to return.
+    """
+    try:
+        slots = await free_busy.free_slots(
+            datetime.fromisoformat(start_time),
+            datetime.fromisoformat(end_time),
+            duration_minutes=duration_minutes,
+            day_start=time.fromisoformat(day_start),
+            day_end=time.fromisoformat(day_end),
+            max_slots=max_slots
+        )
+        if not slots:
+            return "No free slots found in this period."
+        return "\n".join(f"- {_format_slot(slot)}" for slot in slots)
+    except Exception as e:
+        return f"❌ Error finding free slots: {e}"
+
+calendar_tools = [
+    calendar_add_item, calendar_get_items, calendar_delete_item, calendar_toggle_todo,
+    calendar_check_conflicts, calendar_find_free_slots
+]
+
+# writes from the tools above and from the calendar API
+calendar_wrapper.add_listener(lambda item_id: tool_cache.invalidate("calendar"))
@@ -1,7 +1,9 @@
 from langchain.tools import tool
 from arcis.core.external_api.gmail import gmail_api
+from arcis.core.workflow_manual.tools.cache import cached_tool, invalidates
 
 
+@invalidates("email")
 @tool
 async def email_draft(recipient: str, subject: str, body: str) -> str:
     """
@@ -17,6 +19,7 @@ async def email_draft(recipient: str, subject: str, body: str) -> str:
     return f"✉️ DRAFT CREATED\nTo: {recipient}\nSubject: {subject}\nBody: {body[:100]}..."
 
 
+@invalidates("email")
 @tool
 def email_send(recipient: str, subject: str, body: str) -> str:
     """
@@ -44,6 +47,7 @@ def email_read(folder: str = "inbox", limit: int = 5) -> str:
     return f"📬 Retrieved {limit} emails from {folder}"
 
 
+@cached_tool(ttl=120, tags=["email"])
 @tool
 async def email_search(query: str) -> str:
     """
@@ -1,7 +1,9 @@
 import json
 from langchain.tools import tool
 from arcis.core.llm.long_memory import long_memory
+from arcis.core.workflow_manual.tools.cache import cached_tool, tool_cache
 
+@cached_tool(ttl=600, tags=["memory"])
 @tool
 def memory_search(query: str, category: str | None = None, top_k: int = 5) -> str:
     '''
@@ -39,3 +41,6 @@ def memory_search(query: str, category: str | None = None, top_k: int = 5) -> st
             "message": str(e),
             "query": query
         }, indent=2)
+
+
+long_memory.add_listener(lambda: tool_cache.invalidate("memory"))
@@ -1,32 +1,137 @@
+import re
 import json
+import asyncio
+import httpx
 
 from langchain.tools import tool
 from ddgs import DDGS
+from bs4 import BeautifulSoup
 
+from arcis import Config
+from arcis.core.llm.context_budget import count_tokens, truncate_tokens
+from arcis.core.workflow_manual.tools.cache import cached_tool
+from arcis.logger import LOGGER
+
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+MIN_PARAGRAPH_CHARS = 40
+NOISE_TAGS = ["script", "style", "noscript", "nav", "header", "footer", "aside", "form", "svg", "iframe"]
+
+_http_client: httpx.AsyncClient | None = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Lazy-initialise the pooled client used to fetch result pages."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=Config.WEB_SEARCH_FETCH_TIMEOUT,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            headers={"User-Agent": "Mozilla/5.0 (compatible; ArcisBot/1.0)"},
+        )
+    return _http_client
+
+
+async def aclose():
+    """Close the page fetch pool (app shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def _search(query: str, max_results: int) -> list[dict]:
+    with DDGS() as ddgs:
+        return list(ddgs.text(query, max_results=max_results))
+
+
+async def _fetch(url: str) -> str | None:
+    """Download an HTML page, giving up on other content types and oversized bodies."""
+    try:
+        async with _get_http_client().stream("GET", url) as response:
+            if response.status_code != 200 or "html" not in response.headers.get("content-type", ""):
+                return None
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                if len(body) > MAX_PAGE_BYTES:
+                    break
+            return body.decode(response.encoding or "utf-8", errors="replace")
+    except Exception as e:
+        LOGGER.debug(f"web_search: fetching {url} failed: {e}")
+        return None
+
+
+def _extract_excerpt(html: str, query: str, max_tokens: int) -> str:
+    """
+    Main text of a page reduced to the paragraphs sharing the most words
+    with the query, kept in page order, within max_tokens.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(NOISE_TAGS):
+        tag.decompose()
+    root = soup.find("article") or soup.find("main") or soup.body or soup
+
+    paragraphs = [
+        re.sub(r"\s+", " ", el.get_text(" ", strip=True))
+        for el in root.find_all(["p", "li", "h2", "h3", "td"])
+    ]
+    paragraphs = [p for p in dict.fromkeys(paragraphs) if len(p) >= MIN_PARAGRAPH_CHARS]
+    if not paragraphs:
+        return truncate_tokens(re.sub(r"\s+", " ", root.get_text(" ", strip=True)), max_tokens)
+
+    terms = set(re.findall(r"\w+", query.lower()))
+    scores = [len(terms & set(re.findall(r"\w+", p.lower()))) for p in paragraphs]
+    # best paragraphs first; ties keep the page order so the lead paragraphs win
+    ranked = sorted(range(len(paragraphs)), key=lambda i: (-scores[i], i))
+
+    chosen, used = [], 0
+    for i in ranked:
+        size = count_tokens(paragraphs[i])
+        if used + size > max_tokens:
+            if not chosen:
+                chosen.append(i)  # a single long paragraph, truncated below
+            continue
+        chosen.append(i)
+        used += size
+    return truncate_tokens("\n".join(paragraphs[i] for i in sorted(chosen)), max_tokens)
+
+
+async def _page_excerpt(url: str, query: str) -> str | None:
+    html = await _fetch(url)
+    if not html:
+        return None
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, _extract_excerpt, html, query, Config.WEB_SEARCH_PAGE_TOKENS)
+
+
+@cached_tool(ttl=900, tags=["web"])
 @tool
-def web_search(query: str, max_results: int = 5) -> str:
+async def web_search(query: str, max_results: int = 5, fetch_pages: int = Config.WEB_SEARCH_FETCH_PAGES) -> str:
     '''
     Search the web for current information using DuckDuckGo.
-    Returns results in a clear, structured format optimized for LLM parsing.
-    
+    The top results also include an excerpt of the page content relevant to the query,
+    so a follow-up search is usually not needed.
+
     Args:
         query: The search query string
         max_results: Maximum number of results to return (default: 5)
-    
+        fetch_pages: Number of top results whose page content is fetched (0 for snippets only)
+
     Returns:
-        JSON string containing search results with titles, snippets, and URLs
+        JSON string containing search results with titles, snippets, URLs and page excerpts
     '''
     try:
-        with DDGS() as ddgs:
-            raw_results = list(ddgs.text(query, max_results=max_results))
-        
+        loop = asyncio.get_running_loop()
+        raw_results = await loop.run_in_executor(None, _search, query, max_results)
+
         if not raw_results:
             return json.dumps({
                 "status": "no_results",
                 "query": query,
                 "results": []
             }, indent=2)
-        
+
         # Clean and structure results
         results = [
             {
@@ -36,17 +141,23 @@ def web_search(query: str, max_results: int = 5) -> str:
             }
             for r in raw_results
         ]
-        
+
+        fetched = results[:max(0, fetch_pages)]
+        excerpts = await asyncio.gather(*(_page_excerpt(r["url"], query) for r in fetched))
+        for result, excerpt in zip(fetched, excerpts):
+            if excerpt:
+                result["excerpt"] = excerpt
+
         return json.dumps({
             "status": "success",
             "query": query,
             "count": len(results),
             "results": results
-        }, indent=2)
-        
+        }, indent=2, ensure_ascii=False)
+
     except Exception as e:
         return json.dumps({
             "status": "error",
             "message": str(e),
             "query": query
-        }, indent=2)
\ No newline at end of file
+        }, indent=2)
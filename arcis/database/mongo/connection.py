@@ -1,6 +1,8 @@
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure
 
 from arcis import Config
+from arcis.logger import LOGGER
 
 # easy references
 COLLECTIONS = {
@@ -8,8 +10,10 @@ COLLECTIONS = {
     'processed_emails': 'processed_emails',
     'settings': 'settings',
     'token_usage': 'token_usage',
+    'token_usage_rollups': 'token_usage_rollups',
     'user_emotions': 'user_emotions',
-    'onboarding_sessions': 'onboarding_sessions'
+    'onboarding_sessions': 'onboarding_sessions',
+    'calendar_events': 'calendar_events'
 }
 
 class Database:
@@ -37,6 +41,51 @@ class Database:
             [("email_id", 1)], 
             unique=True
         )
+        # range queries of the calendar views, optionally per item type
+        await self.db[COLLECTIONS['calendar_events']].create_index([("item_type", 1), ("start_time", 1)])
+        # events still running at the start of a range (free/busy)
+        await self.db[COLLECTIONS['calendar_events']].create_index([("item_type", 1), ("end_time", 1)])
+        # recurring series (stored once each) overlapping a range, only series documents are indexed
+        await self.db[COLLECTIONS['calendar_events']].create_index(
+            [("item_type", 1), ("series_end", 1)],
+            partialFilterExpression={"recurrence": {"$type": "object"}}
+        )
+        # usage history of one agent, newest first
+        await self.db[COLLECTIONS['token_usage']].create_index([("agent_name", 1), ("timestamp", -1)])
+        await self._set_token_usage_ttl()
+        # one rollup document per granularity, bucket, agent and model
+        await self.db[COLLECTIONS['token_usage_rollups']].create_index(
+            [("granularity", 1), ("bucket", 1), ("agent_name", 1), ("model_name", 1)],
+            unique=True
+        )
+        await self.db[COLLECTIONS['token_usage_rollups']].create_index(
+            [("granularity", 1), ("agent_name", 1), ("bucket", 1)]
+        )
 
+    async def _set_token_usage_ttl(self):
+        """
+        Expire raw token usage records after TOKEN_USAGE_RAW_TTL_DAYS (0 keeps them); rollups stay.
+        An existing single field timestamp index (whatever its name) gets the TTL set on it,
+        failures are logged and the records simply don't expire.
+        """
+        collection = self.db[COLLECTIONS['token_usage']]
+        seconds = Config.TOKEN_USAGE_RAW_TTL_DAYS * 86400
+        try:
+            indexes = await collection.index_information()
+            existing = next(
+                (name for name, info in indexes.items() if info.get("key") == [("timestamp", 1)]), None
+            )
+            if not seconds:
+                if existing == "timestamp_ttl":
+                    await collection.drop_index("timestamp_ttl")
+                return
+            if existing is None:
+                await collection.create_index([("timestamp", 1)], name="timestamp_ttl", expireAfterSeconds=seconds)
+            elif indexes[existing].get("expireAfterSeconds") != seconds:
+                await self.db.command(
+                    "collMod", COLLECTIONS['token_usage'], index={"name": existing, "expireAfterSeconds": seconds}
+                )
+        except OperationFailure as e:
+            LOGGER.warning(f"Token usage TTL index not updated, raw records won't expire: {e}")
 
 mongo = Database()
\ No newline at end of file
@@ -15,6 +15,11 @@ class PlanStepModel(BaseModel):
     assigned_agent: Literal["EmailAgent", "BookingAgent", "UtilityAgent", "MCPAgent"] = Field(
         description="The agent responsible for this step"
     )
+    depends_on: Optional[List[int]] = Field(
+        default=None,
+        description="IDs (1-based positions in the plan) of earlier steps whose output this step needs. "
+                    "Use [] when the step can run independently. Leave null to wait for all earlier steps."
+    )
 
 
 class PlanModel(BaseModel):
@@ -33,12 +38,12 @@ class PlanModel(BaseModel):
     )
 
 
-class SupervisorRouterResponse(BaseModel):
-    """Supervisor's routing decision"""
-    next_node: Literal["email_agent", "booking_agent", "utility_agent", "mcp_agent", "replanner"] = Field(
-        description="The next node to execute"
+class StepStatusModel(BaseModel):
+    """Replanner's verdict for a single executed step"""
+    step_id: int = Field(description="ID of the executed step")
+    status: Literal["completed", "failed", "pending"] = Field(
+        description="Status of the step after evaluating its output"
     )
-    reasoning: str = Field(description="Why this node was chosen")
 
 
 class ReplannerResponse(BaseModel):
@@ -46,8 +51,9 @@ class ReplannerResponse(BaseModel):
     status: Literal["CONTINUE", "FINISHED", "FAILED"] = Field(
         description="Current workflow status"
     )
-    step_status: Literal["completed", "failed", "pending"] = Field(
-        description="Status of the current step"
+    step_statuses: List[StepStatusModel] = Field(
+        default_factory=list,
+        description="Status of each step executed in this round"
     )
     new_steps: List[PlanStepModel] = Field(
         default_factory=list,
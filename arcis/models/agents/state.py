@@ -1,4 +1,4 @@
-from typing import TypedDict, List, Dict, Any, Literal, Optional, Annotated
+from typing import TypedDict, List, Dict, Any, Literal, Optional, Annotated, NotRequired
 
 from langgraph.graph import add_messages
 
@@ -8,6 +8,17 @@ class PlanStep(TypedDict):
     description: str
     status: Literal["pending", "in_progress", "completed", "failed"]
     assigned_agent: Literal["EmailAgent", "BookingAgent", "UtilityAgent", "MCPAgent"]
+    depends_on: NotRequired[Optional[List[int]]]  # None = waits for every earlier step, [] = independent
+
+
+def merge_step_results(left: Optional[Dict[str, str]], right: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """
+    Reducer for outputs written by parallel agent branches.
+    Each branch adds its own {step_id: output}; writing None clears the buffer.
+    """
+    if right is None:
+        return {}
+    return {**(left or {}), **right}
 
 
 class AgentState(TypedDict):
@@ -19,5 +30,7 @@ class AgentState(TypedDict):
     last_tool_output: str  # Output from last worker
     final_response: str  # Final answer for user
     current_step_index: int  # Track which step we're on
+    active_step: Optional[PlanStep]  # Step handed to an agent branch by the supervisor
+    step_results: Annotated[Dict[str, str], merge_step_results]  # Outputs of steps awaiting the replanner
     next_node: Optional[Literal["email_agent", "booking_agent", "utility_agent", "mcp_agent", "replanner"]]
-    workflow_status: Optional[Literal["CONTINUE", "FINISHED", "FAILED"]]
\ No newline at end of file
+    workflow_status: Optional[Literal["CONTINUE", "FINISHED", "FAILED"]]
@@ -1,43 +1,136 @@
+import asyncio
+
 from fastapi import APIRouter, HTTPException, Query
-from datetime import datetime
+from datetime import datetime, time
+from typing import List, Literal, Optional
 
-from arcis.core.external_api.internal_calendar import calendar_wrapper
+from arcis.core.external_api.internal_calendar import calendar_wrapper, ITEM_TYPES
+from arcis.core.external_api.calendar_recurrence import naive_utc
+from arcis.core.external_api.reminder_scheduler import reminder_scheduler
+from arcis.core.external_api.free_busy import free_busy
 
 calendar_router = APIRouter()
 
-async def _get_calendar_items_by_type(start_time: str, end_time: str, item_type: str):
+# response key of each item type in /calendar/items
+TYPE_KEYS = {"event": "events", "todo": "todos", "reminder": "reminders"}
+
+
+def _parse_range(start_time: str, end_time: str):
     try:
-        start_dt = datetime.fromisoformat(start_time)
-        end_dt = datetime.fromisoformat(end_time)
-        
-        items = await calendar_wrapper.get_items_in_range(start_dt, end_dt)
-        filtered_items = [item for item in items if item.get('item_type') == item_type]
-        return filtered_items
+        # stored times are naive; offsets ("...Z" from browsers) are converted to UTC
+        return naive_utc(datetime.fromisoformat(start_time)), naive_utc(datetime.fromisoformat(end_time))
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use ISO 8601.")
+
+async def _get_calendar_items_by_type(
+    start_time: str,
+    end_time: str,
+    item_type: str,
+    order: str = "asc",
+    skip: int = 0,
+    limit: Optional[int] = None
+):
+    start_dt, end_dt = _parse_range(start_time, end_time)
+    try:
+        # type filter, sort and pagination run in Mongo on the (item_type, start_time) index
+        return await calendar_wrapper.get_items_in_range(
+            start_dt, end_dt,
+            item_types=[item_type],
+            descending=order == "desc",
+            skip=skip,
+            limit=limit
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @calendar_router.get("/calendar/events")
 async def get_events(
     start_time: str = Query(..., description="ISO 8601 start time"),
-    end_time: str = Query(..., description="ISO 8601 end time")
+    end_time: str = Query(..., description="ISO 8601 end time"),
+    order: Literal["asc", "desc"] = Query("asc", description="Sort by start time"),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=1000)
 ):
     """Fetch calendar items of type 'event'."""
-    return await _get_calendar_items_by_type(start_time, end_time, "event")
+    return await _get_calendar_items_by_type(start_time, end_time, "event", order, skip, limit)
 
 @calendar_router.get("/calendar/todos")
 async def get_todos(
     start_time: str = Query(..., description="ISO 8601 start time"),
-    end_time: str = Query(..., description="ISO 8601 end time")
+    end_time: str = Query(..., description="ISO 8601 end time"),
+    order: Literal["asc", "desc"] = Query("asc", description="Sort by start time"),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=1000)
 ):
     """Fetch calendar items of type 'todo'."""
-    return await _get_calendar_items_by_type(start_time, end_time, "todo")
+    return await _get_calendar_items_by_type(start_time, end_time, "todo", order, skip, limit)
 
 @calendar_router.get("/calendar/reminders")
 async def get_reminders(
     start_time: str = Query(..., description="ISO 8601 start time"),
-    end_time: str = Query(..., description="ISO 8601 end time")
+    end_time: str = Query(..., description="ISO 8601 end time"),
+    order: Literal["asc", "desc"] = Query("asc", description="Sort by start time"),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=1000)
 ):
     """Fetch calendar items of type 'reminder'."""
-    return await _get_calendar_items_by_type(start_time, end_time, "reminder")
+    return await _get_calendar_items_by_type(start_time, end_time, "reminder", order, skip, limit)
+
+@calendar_router.get("/calendar/items")
+async def get_items(
+    start_time: str = Query(..., description="ISO 8601 start time"),
+    end_time: str = Query(..., description="ISO 8601 end time"),
+    types: List[Literal["event", "todo", "reminder"]] = Query(list(ITEM_TYPES), description="Item types to include"),
+    order: Literal["asc", "desc"] = Query("asc", description="Sort by start time"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum items per type")
+):
+    """
+    Fetch events, todos and reminders in one request, grouped by type.
+    Each type is an indexed query of its own, run concurrently.
+    """
+    item_types = list(dict.fromkeys(types))
+    results = await asyncio.gather(*(
+        _get_calendar_items_by_type(start_time, end_time, item_type, order, 0, limit)
+        for item_type in item_types
+    ))
+    return {TYPE_KEYS[item_type]: items for item_type, items in zip(item_types, results)}
+
+@calendar_router.get("/calendar/month")
+async def get_month_view(
+    year: int = Query(..., ge=1970, le=9999),
+    month: int = Query(..., ge=1, le=12)
+):
+    """Fetch a month as a list of weeks, each day with its items."""
+    try:
+        return await calendar_wrapper.get_month_view(year, month)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@calendar_router.get("/calendar/reminders/scheduler")
+async def get_reminder_scheduler():
+    """Reminders waiting to be sent and the next due time."""
+    return reminder_scheduler.stats()
+
+@calendar_router.get("/calendar/free-busy")
+async def get_free_busy(
+    start_time: str = Query(..., description="ISO 8601 start time"),
+    end_time: str = Query(..., description="ISO 8601 end time"),
+    duration: int = Query(30, ge=5, le=1440, description="Minimum free slot length in minutes"),
+    day_start: time = Query(time(9), description="Earliest time of day for free slots"),
+    day_end: time = Query(time(18), description="Latest time of day for free slots"),
+    max_slots: Optional[int] = Query(None, ge=1, le=500)
+):
+    """
+    Events overlapping the range (conflicts) and the free slots between them,
+    from the cached per-day interval trees.
+    """
+    start_dt, end_dt = _parse_range(start_time, end_time)
+    if end_dt <= start_dt:
+        raise HTTPException(status_code=400, detail="end_time must be after start_time.")
+    try:
+        # sequential: the second call reads the days the first one loaded
+        conflicts = await free_busy.conflicts(start_dt, end_dt)
+        free = await free_busy.free_slots(start_dt, end_dt, duration, day_start, day_end, max_slots)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"conflicts": conflicts, "free": free}
@@ -1,18 +1,94 @@
+import json
 import uuid
 
+from contextlib import aclosing
+
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, WebSocket, WebSocketDisconnect
 from fastapi.responses import StreamingResponse
 
-from .models.chat import ChatRequest, MessageSchema, ThreadPreviewSchema
+from .models.chat import ChatRequest, MessageSchema, ThreadPreviewSchema, TTSRequest, VoiceStreamStart
 
-from arcis.core.workflow_manual.manual_flow import run_workflow
+from arcis.core.workflow_manual.manual_flow import run_workflow, stream_workflow
 from arcis.core.llm.chat_history import save_message, get_thread_history, get_all_threads
 from arcis.core.tts.tts_manager import tts_manager
+from arcis.core.tts.worker_pool import TTSBusyError
 from arcis.core.stt.stt_manager import transcribe_audio
+from arcis.core.stt.streaming import StreamingTranscriber
+from arcis.logger import LOGGER
 
 chat_router = APIRouter(prefix="/chat")
 
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+}
+
+
+def _sse(payload: dict) -> str:
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+async def _run_chat_stream(message: str, thread_id: str, voice_id: str, pcm: bool = False, **extra):
+    """
+    Run the workflow for a chat message and yield ("event", dict) for workflow
+    progress (plan, step start/end, response tokens, final/interrupt) and
+    ("audio", chunk) for synthesised speech. Response tokens are fed into a TTS
+    pipeline as they arrive, so audio for the first sentence is interleaved
+    with the remaining text. Audio chunks are SSE strings, or raw PCM frames
+    when pcm=True.
+    """
+    try:
+        pipeline = await tts_manager.create_pipeline(voice_id, pcm=pcm)
+    except RuntimeError as e:
+        pipeline = None
+        tts_error = str(e)
+
+    try:
+        async for event in stream_workflow(message, thread_id):
+            if event["type"] == "interrupt":
+                save_message(thread_id, "interrupt", event["response"])
+                yield "event", {**event, **extra}
+
+            elif event["type"] == "final":
+                save_message(thread_id, "ai", event["response"], event["plan"])
+                yield "event", {**event, **extra}
+
+                if pipeline is None:
+                    yield "event", {"type": "error", "message": tts_error}
+                    continue
+
+                # tokens are only streamed for the final answer, so they are a prefix of it;
+                # feed what was not streamed (all of it for cached / unstreamed responses)
+                pipeline.feed(event["response"][len(pipeline.fed_text):])
+
+                async for chunk in pipeline.finish():
+                    yield "audio", chunk
+                yield "event", {"type": "done"}
+
+            else:
+                yield "event", event
+                if pipeline is not None:
+                    if event["type"] == "token":
+                        pipeline.feed(event["content"])
+                    for chunk in pipeline.ready():
+                        yield "audio", chunk
+    except Exception as e:
+        LOGGER.error(f"Chat stream failed for thread {thread_id}: {e}")
+        yield "event", {"type": "error", "message": str(e)}
+    finally:
+        if pipeline is not None:
+            pipeline.cancel()
+
+
+async def _stream_chat_events(message: str, thread_id: str, voice_id: str, **extra):
+    """SSE body for the streaming chat endpoints."""
+    # closing explicitly cancels queued TTS jobs as soon as the client disconnects
+    async with aclosing(_run_chat_stream(message, thread_id, voice_id, **extra)) as events:
+        async for kind, payload in events:
+            yield _sse(payload) if kind == "event" else payload
+
+
 @chat_router.post("/voice-upload")
 async def upload_voice(voice_id: str, file: UploadFile = File(...)):
     """Upload a custom voice WAV file and set it as the active voice state."""
@@ -21,55 +97,38 @@ async def upload_voice(voice_id: str, file: UploadFile = File(...)):
     
     try:
         content = await file.read()
-        success = tts_manager.update_voice_state_from_bytes(voice_id, content)
+        success = await tts_manager.run(tts_manager.update_voice_state_from_bytes, voice_id, content)
         if success:
             return {"status": "success", "message": f"Voice '{voice_id}' updated successfully"}
         else:
             raise HTTPException(status_code=500, detail="Failed to parse voice state")
+    except TTSBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @chat_router.post("/stream")
 async def chat_manual_stream(request: ChatRequest, voice_id: str = "default"):
     """
-    Trigger the manual workflow with a user message and stream TTS audio sentence by sentence.
+    Trigger the manual workflow with a user message and stream its progress via SSE:
+    plan and step events while agents run, the final response tokens as they are
+    generated, then TTS audio sentence by sentence.
     """
-    try:
-        thread_id = request.thread_id
-        if not thread_id:
-            thread_id = str(uuid.uuid4())
+    thread_id = request.thread_id
+    if not thread_id:
+        thread_id = str(uuid.uuid4())
 
+    try:
         save_message(thread_id, "human", request.message)
-
-        # 1. Run the workflow completely to get the final text response
-        result = await run_workflow(request.message, thread_id)
-
-        # Check if it's an interrupt (agent needs user input)
-        if result.get("type") == "interrupt":
-            save_message(thread_id, "interrupt", result["response"])
-            # Even for an interrupt we can play the text response, but we might just want to stream it normally
-            import json
-            async def interrupt_stream():
-                yield f"data: {json.dumps({'type': 'interrupt', 'response': result['response'], 'thread_id': thread_id})}\n\n"
-            return StreamingResponse(interrupt_stream(), media_type="text/event-stream")
-
-        # 2. Normal completion
-        ai_response = result.get("final_response", "")
-        plan = result.get("plan", [])
-        save_message(thread_id, "ai", ai_response, plan)
-        
-        # 3. Stream back the audio
-        return StreamingResponse(
-            tts_manager.stream_text_and_audio(ai_response, voice_id=voice_id),
-            media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-            },
-        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    return StreamingResponse(
+        _stream_chat_events(request.message, thread_id, voice_id),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
 @chat_router.post("", response_model=MessageSchema)
 async def chat_manual(request: ChatRequest):
     """
@@ -162,8 +221,8 @@ async def chat_voice_stream(
 ):
     """
     Accept an audio file, transcribe it via Groq Whisper, run the
-    manual workflow, and stream back TTS audio — same as POST /chat/stream
-    but with voice input.
+    manual workflow, and stream back progress and TTS audio — same as
+    POST /chat/stream but with voice input.
     """
     try:
         audio_bytes = await file.read()
@@ -175,31 +234,148 @@ async def chat_voice_stream(
             thread_id = str(uuid.uuid4())
 
         save_message(thread_id, "human", transcribed_text)
-        result = await run_workflow(transcribed_text, thread_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        if result.get("type") == "interrupt":
-            save_message(thread_id, "interrupt", result["response"])
-            import json
+    return StreamingResponse(
+        _stream_chat_events(transcribed_text, thread_id, voice_id, transcribed_text=transcribed_text),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
 
-            async def interrupt_stream():
-                yield f"data: {json.dumps({'type': 'interrupt', 'response': result['response'], 'transcribed_text': transcribed_text, 'thread_id': thread_id})}\n\n"
 
-            return StreamingResponse(interrupt_stream(), media_type="text/event-stream")
+@chat_router.websocket("/ws")
+async def chat_ws(websocket: WebSocket):
+    """
+    Binary streaming chat. Send JSON {"message", "thread_id"?, "voice_id"?};
+    receive the same events as /chat/stream as JSON text frames and the
+    speech as raw 16-bit PCM binary frames (format announced in an
+    "audio_format" event), instead of base64 WAV per sentence.
+    """
+    await websocket.accept()
+    try:
+        while True:
+            request = ChatRequest(**(await websocket.receive_json()))
+            voice_id = request.voice_id or "default"
+            thread_id = request.thread_id or str(uuid.uuid4())
+
+            save_message(thread_id, "human", request.message)
+            await websocket.send_json({"type": "audio_format", **tts_manager.pcm_format})
+
+            stream = _run_chat_stream(request.message, thread_id, voice_id, pcm=True)
+            async with aclosing(stream) as events:
+                async for kind, payload in events:
+                    if kind == "event":
+                        await websocket.send_json(payload)
+                    else:
+                        await websocket.send_bytes(payload)
+    except WebSocketDisconnect:
+        LOGGER.debug("Chat websocket disconnected")
+    except Exception as e:
+        LOGGER.error(f"Chat websocket failed: {e}")
+        await websocket.close(code=1011)
 
-        ai_response = result.get("final_response", "")
-        plan = result.get("plan", [])
-        save_message(thread_id, "ai", ai_response, plan)
 
-        return StreamingResponse(
-            tts_manager.stream_text_and_audio(ai_response, voice_id=voice_id),
-            media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-            },
-        )
+async def _receive_utterance(websocket: WebSocket, transcriber: StreamingTranscriber):
+    """Feed binary PCM frames to the transcriber until the client sends {"type": "end"}, forwarding partials."""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+
+        if message.get("bytes"):
+            transcriber.feed(message["bytes"])
+        elif message.get("text") and json.loads(message["text"]).get("type") == "end":
+            break
+
+        for partial in transcriber.ready():
+            await websocket.send_json(partial)
+
+    async for partial in transcriber.finish():
+        await websocket.send_json(partial)
+
+
+@chat_router.websocket("/voice/ws")
+async def chat_voice_ws(websocket: WebSocket):
+    """
+    Streaming voice chat. Send JSON {"thread_id"?, "voice_id"?, "sample_rate"?, "language"?},
+    then the recording as binary mono 16-bit PCM frames while it is captured, then
+    {"type": "end"}. Utterances are transcribed while the upload is still running
+    ("partial" events); afterwards the session continues exactly like /chat/ws.
+    """
+    await websocket.accept()
+    transcriber = None
+    try:
+        while True:
+            start = VoiceStreamStart(**(await websocket.receive_json()))
+            voice_id = start.voice_id or "default"
+            thread_id = start.thread_id or str(uuid.uuid4())
+
+            transcriber = StreamingTranscriber(start.sample_rate, start.language)
+            await _receive_utterance(websocket, transcriber)
+            transcribed_text = transcriber.text
+            await websocket.send_json({"type": "transcript", "text": transcribed_text, "thread_id": thread_id})
+            if not transcribed_text:
+                continue
+
+            save_message(thread_id, "human", transcribed_text)
+            await websocket.send_json({"type": "audio_format", **tts_manager.pcm_format})
+
+            stream = _run_chat_stream(transcribed_text, thread_id, voice_id, pcm=True, transcribed_text=transcribed_text)
+            async with aclosing(stream) as events:
+                async for kind, payload in events:
+                    if kind == "event":
+                        await websocket.send_json(payload)
+                    else:
+                        await websocket.send_bytes(payload)
+    except WebSocketDisconnect:
+        LOGGER.debug("Voice websocket disconnected")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        LOGGER.error(f"Voice websocket failed: {e}")
+        await websocket.close(code=1011)
+    finally:
+        if transcriber is not None:
+            transcriber.cancel()
+
+
+@chat_router.post("/tts/pcm")
+async def tts_pcm(request: TTSRequest):
+    """Synthesise text and stream it as chunked raw 16-bit mono PCM."""
+    try:
+        pipeline = await tts_manager.create_pipeline(request.voice_id, pcm=True)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    async def pcm_stream():
+        try:
+            pipeline.feed(request.text)
+            async for frame in pipeline.finish():
+                yield frame
+        finally:
+            pipeline.cancel()
+
+    audio_format = tts_manager.pcm_format
+    return StreamingResponse(
+        pcm_stream(),
+        media_type=f"audio/L16; rate={audio_format['sample_rate']}; channels=1",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Audio-Encoding": audio_format["encoding"],
+            "X-Sample-Rate": str(audio_format["sample_rate"]),
+        },
+    )
+
+
+@chat_router.get("/tts/cache")
+async def tts_cache_stats():
+    """Hit-rate and size metrics of the synthesised audio cache."""
+    return tts_manager.audio_cache.stats()
+
+
+@chat_router.get("/tts/workers")
+async def tts_worker_stats():
+    """Queue depth, throughput and wait-time metrics of the TTS worker pool."""
+    return tts_manager.pool.stats()
 
 
 @chat_router.get("/all_chats", response_model=List[ThreadPreviewSchema])
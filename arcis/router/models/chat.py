@@ -4,6 +4,18 @@ from pydantic import BaseModel, Field
 class ChatRequest(BaseModel):
     message: str
     thread_id: Optional[str] = None
+    voice_id: Optional[str] = None  # only used by the websocket stream
+
+class VoiceStreamStart(BaseModel):
+    """First message of a /chat/voice/ws session, followed by binary PCM frames."""
+    thread_id: Optional[str] = None
+    voice_id: Optional[str] = None
+    sample_rate: int = 16000  # mono 16-bit PCM
+    language: str = "en"
+
+class TTSRequest(BaseModel):
+    text: str
+    voice_id: str = "default"
 
 class MessageSchema(BaseModel):
     type: str = Field(..., description="Type of message: 'human', 'ai', 'interrupt'")
@@ -1,12 +1,29 @@
 from pydantic import BaseModel, Field
-from typing import Dict
+from typing import Dict, List, Optional
 from arcis.models.llm import LLMProvider
 
+class FallbackConfigModel(BaseModel):
+    provider: LLMProvider
+    model_name: str
+    temperature: Optional[float] = Field(None, ge=0.0, le=1.0)  # defaults to the agent's temperature
+
 class AgentConfigModel(BaseModel):
     provider: LLMProvider
     model_name: str
     temperature: float = Field(0.7, ge=0.0, le=1.0)
+    fallbacks: List[FallbackConfigModel] = []  # tried in order when the primary provider fails
+    hedge: bool = False  # start the next fallback when the primary is slower than usual
+    response_cache: bool = False  # reuse responses for identical / near-identical inputs (planner, analyzer)
+    context_budget: Optional[int] = Field(None, ge=500)  # prompt tokens for history/context, defaults to CONTEXT_BUDGET_TOKENS
 
 class SettingsUpdateModel(BaseModel):
     # Map agent name to its config
     agent_configs: Dict[str, AgentConfigModel]
+
+class RateLimitModel(BaseModel):
+    rpm: Optional[int] = Field(None, ge=1)  # requests per minute, None = unlimited
+    tpm: Optional[int] = Field(None, ge=1)  # tokens per minute, None = unlimited
+
+class RateLimitsUpdateModel(BaseModel):
+    # Map "provider" or "provider/model" to its limits
+    limits: Dict[str, RateLimitModel]
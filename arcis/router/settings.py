@@ -1,6 +1,13 @@
+from typing import Optional
 from fastapi import APIRouter, HTTPException
 from arcis.core.llm.config_manager import config_manager
-from arcis.router.models.settings import SettingsUpdateModel
+from arcis.core.llm.resilience import latency_tracker
+from arcis.core.llm.rate_limiter import rate_limiter
+from arcis.core.llm.response_cache import response_cache
+from arcis.core.llm.context_budget import prompt_sizes
+from arcis.core.workflow_manual.agents.tool_loop import tool_stats
+from arcis.core.workflow_manual.tools.cache import tool_cache
+from arcis.router.models.settings import SettingsUpdateModel, RateLimitsUpdateModel
 from arcis.core.llm.llm_list import (
     MISTRAL_AI, CEREBRAS, GROQ, 
     OPENAI, GEMINI, ANTHROPIC, OPENROUTER
@@ -38,6 +45,42 @@ async def get_agent_configs():
     """
     return config_manager.get_all_configs()
 
+@settings_router.get("/providers/latency")
+async def get_provider_latency():
+    """
+    Recent latency percentiles per provider/model, the basis for hedged requests.
+    """
+    return latency_tracker.stats()
+
+@settings_router.get("/prompt-sizes")
+async def get_prompt_sizes():
+    """
+    Recent prompt size distribution (tokens) per agent.
+    """
+    return prompt_sizes.stats()
+
+@settings_router.get("/tools/latency")
+async def get_tool_latency():
+    """
+    Recent latency and error/timeout counts per agent tool.
+    """
+    return tool_stats.stats()
+
+@settings_router.get("/tools/cache")
+async def get_tool_cache_stats():
+    """
+    Hits, misses and invalidations of the read-only tool result cache.
+    """
+    return tool_cache.stats()
+
+@settings_router.delete("/tools/cache")
+async def clear_tool_cache():
+    """
+    Drop all cached tool results.
+    """
+    tool_cache.clear()
+    return {"status": "success", "message": "Tool cache cleared"}
+
 @settings_router.put("/agents")
 async def update_agent_configs(settings: SettingsUpdateModel):
     """
@@ -53,3 +96,39 @@ async def update_agent_configs(settings: SettingsUpdateModel):
         return {"status": "success", "message": "Configuration updated successfully", "config": config_manager.get_all_configs()}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to update configuration: {str(e)}")
+
+
+@settings_router.get("/rate-limits")
+async def get_rate_limits():
+    """
+    Get the client side LLM rate limits and per provider/model queue metrics.
+    """
+    return {"limits": rate_limiter.limits, "usage": rate_limiter.stats()}
+
+@settings_router.put("/rate-limits")
+async def update_rate_limits(settings: RateLimitsUpdateModel):
+    """
+    Update requests/min and tokens/min limits for providers or specific models.
+    """
+    try:
+        new_limits = {key: limit.model_dump() for key, limit in settings.limits.items()}
+        await rate_limiter.update_limits(new_limits)
+        return {"status": "success", "message": "Rate limits updated successfully", "limits": rate_limiter.limits}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update rate limits: {str(e)}")
+
+
+@settings_router.get("/response-cache")
+async def get_response_cache_stats():
+    """
+    Per agent hit-rate stats of the planner/analyzer response cache.
+    """
+    return response_cache.stats()
+
+@settings_router.delete("/response-cache")
+async def clear_response_cache(agent_name: Optional[str] = None):
+    """
+    Drop cached responses of one agent, or of all agents.
+    """
+    response_cache.clear(agent_name)
+    return {"status": "success", "message": "Response cache cleared"}
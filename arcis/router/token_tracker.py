@@ -1,8 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
-from typing import List, Optional
-from datetime import datetime
+from typing import List, Literal, Optional
+from datetime import datetime, timezone
 from arcis.database.mongo.connection import mongo, COLLECTIONS
+from arcis.core.utils.token_tracker import token_usage_writer, rollup_bucket
 
 token_tracker_router = APIRouter(prefix="/token-tracker", tags=["Token Tracker"])
 
@@ -11,7 +12,11 @@ class TokenUsageRecord(BaseModel):
     prompt_tokens: int
     completion_tokens: int
     total_tokens: int
+    cached_tokens: int = 0  # prompt tokens served from the provider's prompt cache
     model_name: Optional[str] = None
+    provider: Optional[str] = None
+    fallback: bool = False  # answered by a fallback provider
+    hedged: bool = False  # a hedged request raced the primary
     timestamp: datetime
 
 class AgentStats(BaseModel):
@@ -19,31 +24,91 @@ class AgentStats(BaseModel):
     total_prompt_tokens: int
     total_completion_tokens: int
     total_tokens: int
+    total_cached_tokens: int = 0
     request_count: int
 
-@token_tracker_router.get("/agents", response_model=List[str])
-async def get_agents():
-    """Get a list of all agents that have recorded usage."""
+class UsageBucket(BaseModel):
+    bucket: datetime  # start of the hour / day (UTC)
+    agent_name: str
+    model_name: Optional[str] = None
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    cached_tokens: int = 0
+    request_count: int
+
+
+def _require_db():
     if mongo.db is None:
         raise HTTPException(status_code=503, detail="Database not connected")
-    
-    agents = await mongo.db[COLLECTIONS['token_usage']].distinct("agent_name")
+
+def _rollup_match(
+    granularity: str,
+    start_time: Optional[datetime],
+    end_time: Optional[datetime],
+    agent_name: Optional[str] = None,
+    model_name: Optional[str] = None
+) -> dict:
+    """Rollup filter; range bounds are aligned to the buckets containing them."""
+    match = {"granularity": granularity}
+    if start_time or end_time:
+        match["bucket"] = {}
+        if start_time:
+            match["bucket"]["$gte"] = rollup_bucket(granularity, start_time)
+        if end_time:
+            match["bucket"]["$lte"] = rollup_bucket(granularity, end_time)
+    if agent_name:
+        match["agent_name"] = agent_name
+    if model_name:
+        match["model_name"] = model_name
+    return match
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+@token_tracker_router.get("/agents", response_model=List[str])
+async def get_agents():
+    """
+    Get a list of all agents that have recorded usage. Like every read here it
+    leaves out records still buffered (at most TOKEN_USAGE_FLUSH_INTERVAL old).
+    """
+    _require_db()
+
+    # the all-time rollups hold one document per agent and model
+    agents = await mongo.db[COLLECTIONS['token_usage_rollups']].distinct("agent_name", {"granularity": "all"})
     return agents
 
 @token_tracker_router.get("/cumulative", response_model=List[AgentStats])
-async def get_cumulative_stats():
-    """Get cumulative token usage statistics for each agent."""
-    if mongo.db is None:
-        raise HTTPException(status_code=503, detail="Database not connected")
+async def get_cumulative_stats(
+    start_time: Optional[datetime] = Query(None, description="ISO 8601, usage from this time on"),
+    end_time: Optional[datetime] = Query(None, description="ISO 8601, usage up to this time"),
+    model_name: Optional[str] = Query(None, description="Only usage of this model"),
+    granularity: Literal["hour", "day"] = Query("day", description="Rollups a time range is resolved to")
+):
+    """
+    Get cumulative token usage statistics for each agent, from the rollups:
+    all-time totals without a range, otherwise the hourly or daily buckets
+    overlapping it.
+    """
+    _require_db()
+
+    if start_time or end_time:
+        match = _rollup_match(granularity, _as_utc(start_time), _as_utc(end_time), model_name=model_name)
+    else:
+        match = _rollup_match("all", None, None, model_name=model_name)
 
     pipeline = [
+        {"$match": match},
         {
             "$group": {
                 "_id": "$agent_name",
                 "total_prompt_tokens": {"$sum": "$prompt_tokens"},
                 "total_completion_tokens": {"$sum": "$completion_tokens"},
                 "total_tokens": {"$sum": "$total_tokens"},
-                "request_count": {"$sum": 1}
+                "total_cached_tokens": {"$sum": "$cached_tokens"},
+                "request_count": {"$sum": "$request_count"}
             }
         },
         {
@@ -53,21 +118,59 @@ async def get_cumulative_stats():
                 "total_prompt_tokens": 1,
                 "total_completion_tokens": 1,
                 "total_tokens": 1,
+                "total_cached_tokens": 1,
                 "request_count": 1
             }
         }
     ]
 
-    cursor = mongo.db[COLLECTIONS['token_usage']].aggregate(pipeline)
+    cursor = mongo.db[COLLECTIONS['token_usage_rollups']].aggregate(pipeline)
     results = await cursor.to_list(length=None)
     return results
 
+@token_tracker_router.get("/usage", response_model=List[UsageBucket])
+async def get_usage_series(
+    granularity: Literal["hour", "day"] = Query("day"),
+    start_time: Optional[datetime] = Query(None, description="ISO 8601 start of the series"),
+    end_time: Optional[datetime] = Query(None, description="ISO 8601 end of the series"),
+    agent_name: Optional[str] = Query(None),
+    model_name: Optional[str] = Query(None),
+    limit: int = Query(1000, ge=1, le=10000)
+):
+    """Hourly or daily usage per agent and model, oldest bucket first."""
+    _require_db()
+
+    match = _rollup_match(granularity, _as_utc(start_time), _as_utc(end_time), agent_name, model_name)
+    cursor = mongo.db[COLLECTIONS['token_usage_rollups']].find(match, {"_id": 0, "granularity": 0}).sort("bucket", 1)
+    return await cursor.to_list(length=limit)
+
 @token_tracker_router.get("/agent/{agent_name}", response_model=List[TokenUsageRecord])
-async def get_agent_history(agent_name: str):
-    """Get usage history for a specific agent."""
-    if mongo.db is None:
-        raise HTTPException(status_code=503, detail="Database not connected")
+async def get_agent_history(
+    agent_name: str,
+    start_time: Optional[datetime] = Query(None, description="ISO 8601, records from this time on"),
+    end_time: Optional[datetime] = Query(None, description="ISO 8601, records before this time"),
+    model_name: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """Get usage history for a specific agent, newest first (raw records expire after TOKEN_USAGE_RAW_TTL_DAYS)."""
+    _require_db()
+
+    query = {"agent_name": agent_name}
+    if start_time or end_time:
+        query["timestamp"] = {}
+        if start_time:
+            query["timestamp"]["$gte"] = _as_utc(start_time)
+        if end_time:
+            query["timestamp"]["$lt"] = _as_utc(end_time)
+    if model_name:
+        query["model_name"] = model_name
 
-    cursor = mongo.db[COLLECTIONS['token_usage']].find({"agent_name": agent_name}).sort("timestamp", -1)
-    results = await cursor.to_list(length=100) # Limit to last 100 for now
+    # served by the (agent_name, timestamp) index
+    cursor = mongo.db[COLLECTIONS['token_usage']].find(query).sort("timestamp", -1)
+    results = await cursor.to_list(length=limit)
     return results
+
+@token_tracker_router.get("/writer")
+async def get_writer_stats():
+    """Records waiting in the usage write buffer and records dropped while Mongo was unreachable."""
+    return token_usage_writer.stats()
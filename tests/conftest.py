@@ -0,0 +1,6 @@
+import os
+
+# arcis.config exits without a database URL and would load a developer's .env;
+# nothing here connects to Mongo
+os.environ.setdefault("ENV", "test")
+os.environ.setdefault("DATABASE_URL", "mongodb://localhost:27017")
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from arcis.core.external_api.calendar_recurrence import (
+    SERIES_OPEN_END, Recurrence, expand_series, naive_utc, occurrences, occurrence_id,
+    parse_occurrence_id, series_end,
+)
+from arcis.core.external_api.internal_calendar import CalendarItem
+
+START = datetime(2026, 1, 5, 9)  # a Monday
+
+
+def expand(rule, window_start, window_end, dtstart=START):
+    return list(occurrences(rule, dtstart, window_start, window_end))
+
+
+def test_from_rrule():
+    rule = Recurrence.from_rrule("RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE;UNTIL=20260301T000000Z")
+    assert (rule.freq, rule.interval, rule.by_weekday, rule.until) == ("weekly", 2, [0, 2], datetime(2026, 3, 1))
+    with pytest.raises(ValueError):
+        Recurrence.from_rrule("INTERVAL=2")
+
+
+def test_weekly_by_weekday_every_other_week():
+    rule = Recurrence(freq="weekly", interval=2, by_weekday=[0, 2])
+    days = expand(rule, START, START + timedelta(days=28))
+    assert [d.day for d in days] == [5, 7, 19, 21]
+
+
+def test_window_far_from_the_start_skips_the_history():
+    rule = Recurrence(freq="daily")
+    window_start = datetime(2030, 6, 1)
+    assert expand(rule, window_start, window_start + timedelta(days=2)) == [
+        datetime(2030, 6, 1, 9), datetime(2030, 6, 2, 9)
+    ]
+
+
+def test_count_is_counted_from_the_first_occurrence():
+    rule = Recurrence(freq="daily", count=5)
+    assert expand(rule, START + timedelta(days=3), SERIES_OPEN_END) == [START + timedelta(days=3), START + timedelta(days=4)]
+    assert series_end(rule, START) == START + timedelta(days=4)
+
+
+def test_monthly_skips_months_without_the_day():
+    rule = Recurrence(freq="monthly", count=4)
+    dtstart = datetime(2026, 1, 31, 9)
+    assert [d.month for d in expand(rule, dtstart, SERIES_OPEN_END, dtstart)] == [1, 3, 5, 7]
+
+
+def test_exdates_and_until():
+    rule = Recurrence(freq="daily", until=START + timedelta(days=3), exdates=[START + timedelta(days=1)])
+    assert expand(rule, START, SERIES_OPEN_END) == [START, START + timedelta(days=2), START + timedelta(days=3)]
+    assert series_end(rule, START) == rule.until
+
+
+def test_offset_aware_bounds_are_stored_naive_utc():
+    cet = timezone(timedelta(hours=1))
+    rule = Recurrence(freq="daily", until=datetime(2026, 1, 8, 10, tzinfo=cet), exdates=[datetime(2026, 1, 6, 10, tzinfo=cet)])
+    assert rule.until == datetime(2026, 1, 8, 9)
+    assert rule.exdates == [datetime(2026, 1, 6, 9)]
+    # comparing with naive times no longer raises
+    assert expand(rule, START, datetime(2026, 2, 1)) == [START, datetime(2026, 1, 7, 9), datetime(2026, 1, 8, 9)]
+
+    item = CalendarItem(title="x", item_type="event", start_time=datetime(2026, 1, 5, 10, tzinfo=cet))
+    assert item.start_time == START and item.start_time.tzinfo is None
+    assert naive_utc(START) is START
+
+
+def test_occurrence_ids():
+    assert parse_occurrence_id(occurrence_id("abc", START)) == ("abc", START)
+    assert parse_occurrence_id("abc") is None
+    assert parse_occurrence_id("abc:not-a-date") is None
+
+
+def test_expand_series_keeps_duration_and_completion():
+    series = {
+        "_id": "s1", "title": "water plants", "item_type": "todo",
+        "start_time": START, "end_time": START + timedelta(minutes=15),
+        "recurrence": Recurrence(freq="daily").model_dump(), "series_end": SERIES_OPEN_END,
+        "completed_dates": [START + timedelta(days=1)], "is_completed": False,
+    }
+    items = expand_series(series, START, START + timedelta(days=3), limit=2)
+    assert [(i["_id"], i["is_completed"]) for i in items] == [("s1:20260105T090000", False), ("s1:20260106T090000", True)]
+    assert all(i["end_time"] - i["start_time"] == timedelta(minutes=15) for i in items)
+    assert all("recurrence" not in i and i["series_id"] == "s1" for i in items)
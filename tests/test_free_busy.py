@@ -0,0 +1,161 @@
+import asyncio
+import random
+
+from datetime import datetime, time, timedelta
+
+import pytest
+
+from arcis.core.external_api import free_busy as free_busy_module
+from arcis.core.external_api.free_busy import FreeBusyService, IntervalTree
+from arcis.core.external_api.internal_calendar import CalendarWrapper
+
+
+def at(day, hour, minute=0):
+    return datetime(2026, 3, day, hour, minute)
+
+
+def interval(start, end, name):
+    return (start, end, {"_id": name})
+
+
+def names(intervals):
+    return sorted(i[2]["_id"] for i in intervals)
+
+
+def test_interval_tree_matches_a_linear_scan():
+    rng = random.Random(7)
+    base = datetime(2026, 3, 1)
+    intervals = []
+    for n in range(300):
+        start = base + timedelta(minutes=rng.randrange(0, 5000))
+        intervals.append(interval(start, start + timedelta(minutes=rng.randrange(1, 600)), str(n)))
+    tree = IntervalTree(intervals)
+
+    for _ in range(200):
+        start = base + timedelta(minutes=rng.randrange(-100, 5200))
+        end = start + timedelta(minutes=rng.randrange(1, 900))
+        expected = [i for i in intervals if i[0] < end and i[1] > start]
+        assert names(tree.overlapping(start, end)) == names(expected)
+
+
+def test_interval_tree_touching_ends_do_not_overlap():
+    tree = IntervalTree([interval(at(1, 9), at(1, 10), "a"), interval(at(1, 10), at(1, 11), "b")])
+    assert names(tree.overlapping(at(1, 10), at(1, 10, 30))) == ["b"]
+    assert names(tree.overlapping(at(1, 9, 30), at(1, 10, 30))) == ["a", "b"]
+
+
+def test_interval_tree_with_identical_intervals():
+    # same start everywhere used to recurse without shrinking
+    tree = IntervalTree([interval(at(1, 9), at(1, 10), str(n)) for n in range(50)])
+    assert len(tree.overlapping(at(1, 9, 30), at(1, 9, 45))) == 50
+
+
+class FakeCalendar:
+    """get_events_overlapping over a fixed event list, counting the range queries."""
+
+    def __init__(self, events):
+        self.events = events
+        self.queries = []
+
+    def add_listener(self, callback):
+        pass
+
+    async def get_events_overlapping(self, start, end, default_duration, projection=None):
+        self.queries.append((start, end))
+        return [dict(e) for e in self.events if e["start_time"] < end and (e.get("end_time") or e["start_time"] + default_duration) > start]
+
+
+@pytest.fixture
+def service(monkeypatch):
+    def make(events):
+        calendar = FakeCalendar(events)
+        monkeypatch.setattr(free_busy_module, "calendar_wrapper", calendar)
+        return FreeBusyService(max_days=30), calendar
+    return make
+
+
+def test_free_slots_around_events(service):
+    free_busy, _ = service([
+        {"_id": "standup", "start_time": at(2, 9, 30), "end_time": at(2, 10)},
+        {"_id": "lunch", "start_time": at(2, 12), "end_time": at(2, 13)},
+    ])
+    slots = asyncio.run(free_busy.free_slots(at(2, 0), at(3, 0), duration_minutes=60, day_start=time(9), day_end=time(14)))
+    assert [(s["start_time"], s["end_time"]) for s in slots] == [(at(2, 10), at(2, 12)), (at(2, 13), at(2, 14))]
+
+
+def test_event_started_days_before_blocks_the_range(service):
+    free_busy, _ = service([{"_id": "trip", "start_time": at(1, 8), "end_time": at(6, 18)}])
+    busy = asyncio.run(free_busy.conflicts(at(4, 9), at(4, 10)))
+    assert [b["_id"] for b in busy] == ["trip"]
+    assert asyncio.run(free_busy.free_slots(at(4, 0), at(5, 0))) == []
+
+
+def test_days_are_loaded_once(service):
+    free_busy, calendar = service([{"_id": "a", "start_time": at(2, 9), "end_time": at(2, 10)}])
+    asyncio.run(free_busy.busy(at(2, 0), at(4, 0)))
+    asyncio.run(free_busy.busy(at(3, 8), at(3, 9)))
+    assert calendar.queries == [(at(2, 0), at(4, 0))]
+    free_busy.invalidate()
+    asyncio.run(free_busy.busy(at(3, 8), at(3, 9)))
+    assert len(calendar.queries) == 2
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length=None):
+        return [dict(d) for d in self.docs]
+
+
+class FakeCollection:
+    """find() answering series queries with the series and everything else with the one-off events."""
+
+    def __init__(self, singles, series):
+        self.singles = singles
+        self.series = series
+        self.queries = []
+
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        if query.get("recurrence"):
+            return FakeCursor(self.series)
+        return FakeCursor(self.singles)
+
+
+def test_get_events_overlapping_expands_series_running_into_the_range(monkeypatch):
+    night_shift = {
+        "_id": "s1", "item_type": "event", "title": "night shift",
+        "start_time": at(1, 22), "end_time": at(2, 6),
+        "recurrence": {"freq": "daily"}, "series_end": datetime(9999, 12, 31),
+    }
+    collection = FakeCollection([], [night_shift])
+    monkeypatch.setattr(CalendarWrapper, "collection", collection)
+    wrapper = CalendarWrapper()
+
+    items = asyncio.run(wrapper.get_events_overlapping(at(5, 0), at(6, 0), timedelta(minutes=30)))
+    # the shift of the 4th runs until 6:00 on the 5th, the one of the 5th starts at 22:00
+    assert sorted(i["start_time"] for i in items) == [at(4, 22), at(5, 22)]
+
+
+def test_get_events_overlapping_skips_series_that_ended(monkeypatch):
+    weekly = {
+        "_id": "s2", "item_type": "event", "title": "course",
+        "start_time": datetime(2026, 1, 5, 18), "end_time": datetime(2026, 1, 5, 20),
+        "recurrence": {"freq": "weekly", "count": 4}, "series_end": datetime(2026, 1, 26, 18),
+    }
+    monkeypatch.setattr(CalendarWrapper, "collection", FakeCollection([], [weekly]))
+    items = asyncio.run(CalendarWrapper().get_events_overlapping(at(1, 0), at(2, 0), timedelta(minutes=30)))
+    assert items == []
+
+
+def test_one_off_events_are_matched_on_their_end(monkeypatch):
+    collection = FakeCollection([], [])
+    monkeypatch.setattr(CalendarWrapper, "collection", collection)
+    asyncio.run(CalendarWrapper().get_events_overlapping(at(5, 0), at(6, 0), timedelta(minutes=30)))
+
+    running, open_ended = collection.queries[0]["$or"]
+    # no lower bound on the start: a trip that began weeks ago still matches
+    assert running["end_time"] == {"$gt": at(5, 0)}
+    assert running["start_time"] == {"$lt": at(6, 0)}
+    assert open_ended["start_time"] == {"$gte": at(4, 23, 30), "$lt": at(6, 0)}
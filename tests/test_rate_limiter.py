@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from arcis.core.llm import rate_limiter as rate_limiter_module
+from arcis.core.llm.rate_limiter import RateLimiter, _Bucket, estimate_tokens, usage_tokens
+
+
+class Clock:
+    """time.monotonic replacement; asyncio.sleep advances it instead of waiting."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter_module.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(rate_limiter_module.asyncio, "sleep", clock.sleep)
+    return clock
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("x" * 40) == 11
+    assert estimate_tokens([HumanMessage(content="x" * 40), AIMessage(content="y" * 40)]) == 21
+
+
+def test_usage_tokens_of_plain_and_structured_output():
+    message = AIMessage(content="ok", usage_metadata={"input_tokens": 5, "output_tokens": 2, "total_tokens": 7})
+    assert usage_tokens(message) == 7
+    assert usage_tokens({"parsed": None, "raw": message}) == 7
+    assert usage_tokens(AIMessage(content="ok")) is None
+
+
+def test_requests_over_the_rpm_wait_for_the_refill(clock):
+    bucket = _Bucket(rpm=2, tpm=None)
+
+    async def run():
+        return [await bucket.acquire(1) for _ in range(3)]
+
+    assert asyncio.run(run()) == [0.0, 0.0, 30.0]
+    assert bucket.stats()["throttled"] == 1
+
+
+def test_tokens_over_the_tpm_wait_and_huge_prompts_get_through(clock):
+    bucket = _Bucket(rpm=None, tpm=600)
+    asyncio.run(bucket.acquire(500))
+    assert asyncio.run(bucket.acquire(200)) == pytest.approx(10.0)
+    # larger than the whole budget: reserved as a full minute instead of waiting forever
+    assert asyncio.run(bucket.acquire(10_000)) == pytest.approx(60.0)
+
+
+def test_settle_charges_the_real_usage(clock):
+    bucket = _Bucket(rpm=None, tpm=600)
+    asyncio.run(bucket.acquire(100))
+    bucket.settle(reserved=100, actual=700)
+    assert bucket.tokens == pytest.approx(-100)
+    assert asyncio.run(bucket.acquire(100)) == pytest.approx(20.0)
+
+
+def test_model_limits_win_and_providers_limit_each_model(clock):
+    limiter = RateLimiter.__new__(RateLimiter)
+    limiter.limits = {"groq": {"rpm": 1, "tpm": None}, "groq/big": {"rpm": 5, "tpm": None}}
+    limiter._buckets = {}
+
+    assert limiter._bucket("groq", "big").rpm == 5
+    assert limiter._bucket("groq", "small") is not limiter._bucket("groq", "other")
+    assert limiter._bucket("unknown", "model") is None
+    assert asyncio.run(limiter.acquire("unknown", "model", 10)) == 0.0
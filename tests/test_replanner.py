@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from arcis.core.workflow_manual.agents import replanner
+from arcis.models.agents.response import PlanStepModel, ReplannerResponse, StepStatusModel
+
+
+class FakeLLM:
+    """Structured output client answering every call with a fixed replanner response."""
+
+    def __init__(self, response: ReplannerResponse):
+        self.response = response
+
+    def with_structured_output(self, schema, include_raw=False):
+        return self
+
+    async def ainvoke(self, messages):
+        return {"parsed": self.response, "raw": None}
+
+
+def run_replanner(monkeypatch, plan, response, step_results=None):
+    monkeypatch.setattr(replanner.LLMFactory, "get_client_for_agent", lambda name: FakeLLM(response))
+    state = {"plan": plan, "step_results": step_results or {}, "messages": [], "context": {}}
+    return asyncio.run(replanner.replanner_node(state))
+
+
+def step(id, status="pending", depends_on=None):
+    return {"id": id, "description": f"step {id}", "status": status, "assigned_agent": "UtilityAgent", "depends_on": depends_on}
+
+
+def new_step(description, depends_on=None):
+    return PlanStepModel(description=description, assigned_agent="UtilityAgent", depends_on=depends_on)
+
+
+@pytest.fixture
+def plan():
+    # step 1 just ran, steps 2 and 3 are still to come
+    return [step(1, "in_progress"), step(2, depends_on=[1]), step(3, depends_on=[2])]
+
+
+def test_new_steps_are_inserted_after_the_executed_step_and_ids_remapped(monkeypatch, plan):
+    response = ReplannerResponse(status="CONTINUE", new_steps=[new_step("retry", depends_on=[1])])
+    result = run_replanner(monkeypatch, plan, response, {"1": "done"})
+
+    assert [s["description"] for s in result["plan"]] == ["step 1", "retry", "step 2", "step 3"]
+    assert [s["id"] for s in result["plan"]] == [1, 2, 3, 4]
+    assert result["plan"][0]["status"] == "completed"
+    # old step 2 -> 3 still depends on step 1, old step 3 -> 4 on old step 2
+    assert result["plan"][2]["depends_on"] == [1]
+    assert result["plan"][3]["depends_on"] == [3]
+
+
+def test_dependencies_on_later_positions_are_dropped(monkeypatch, plan):
+    # after insertion the new step sits before old step 3, depending on it would deadlock
+    response = ReplannerResponse(status="CONTINUE", new_steps=[new_step("prepare", depends_on=[1, 3])])
+    result = run_replanner(monkeypatch, plan, response, {"1": "done"})
+
+    assert result["plan"][1]["description"] == "prepare"
+    assert result["plan"][1]["depends_on"] == [1]
+    for s in result["plan"]:
+        assert all(d < s["id"] for d in s["depends_on"] or [])
+
+
+def test_unmentioned_steps_default_by_output(monkeypatch):
+    plan = [step(1, "in_progress", depends_on=[]), step(2, "in_progress", depends_on=[])]
+    response = ReplannerResponse(status="CONTINUE", step_statuses=[StepStatusModel(step_id=2, status="completed")])
+    result = run_replanner(monkeypatch, plan, response, {"1": "output"})
+
+    assert [s["status"] for s in result["plan"]] == ["completed", "completed"]
+    assert result["step_results"] is None
+    assert result["context"] == {"step 1": "output"}
+
+
+def test_missing_output_marks_the_step_failed(monkeypatch):
+    plan = [step(1, "in_progress")]
+    result = run_replanner(monkeypatch, plan, ReplannerResponse(status="FINISHED", final_response="ok"))
+
+    assert result["plan"][0]["status"] == "failed"
+    assert result["workflow_status"] == "FINISHED"
+    assert replanner.replanner_router(result) == "end"
@@ -0,0 +1,76 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from arcis.core.llm.response_cache import ResponseCache, history_fingerprint, memory_fingerprint
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ResponseCache(ttl=60, max_entries=10, similarity=0.9)
+
+    async def embed(text):
+        # letter counts: near-duplicate requests get near-identical vectors
+        vector = np.zeros(26, dtype=np.float32)
+        for char in text:
+            if "a" <= char <= "z":
+                vector[ord(char) - ord("a")] += 1
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    monkeypatch.setattr(cache, "_embed", embed)
+    return cache
+
+
+def get(cache, text, scope=""):
+    return asyncio.run(cache.get("planner", text, scope=scope))[0]
+
+
+def put(cache, text, value, scope=""):
+    asyncio.run(cache.put("planner", text, value, scope=scope))
+
+
+def test_exact_hit_ignores_case_and_whitespace(cache):
+    put(cache, "Check my  calendar", {"plan": 1})
+    assert get(cache, "check my calendar ") == {"plan": 1}
+    assert cache.stats()["planner"]["exact_hits"] == 1
+
+
+def test_semantic_hit_only_within_the_same_scope(cache):
+    put(cache, "check my calendar for today", {"plan": 1}, scope="a")
+    assert get(cache, "check my calendar for today!", scope="a") == {"plan": 1}
+    assert get(cache, "check my calendar for today!", scope="b") is None
+
+
+def test_history_fingerprint_leaves_out_the_input():
+    first_turn = [HumanMessage(content="send it")]
+    follow_up = [HumanMessage(content="draft a mail to Bob"), AIMessage(content="Draft ready."), HumanMessage(content="send it")]
+
+    assert history_fingerprint(first_turn) == ""
+    assert history_fingerprint(follow_up) == "human: draft a mail to bob\nai: draft ready."
+    # the same follow-up in another conversation is another scope
+    other = [HumanMessage(content="draft a mail to Alice"), AIMessage(content="Draft ready."), HumanMessage(content="send it")]
+    assert history_fingerprint(other) != history_fingerprint(follow_up)
+
+
+def test_history_fingerprint_is_limited_to_the_recent_turns():
+    messages = [HumanMessage(content=f"message {i}") for i in range(30)]
+    assert history_fingerprint(messages, max_turns=3).splitlines() == [
+        "human: message 26", "human: message 27", "human: message 28"
+    ]
+
+
+def test_follow_up_is_not_answered_from_another_conversation(cache):
+    bob = [HumanMessage(content="draft a mail to Bob"), AIMessage(content="Draft ready."), HumanMessage(content="send it")]
+    alice = [HumanMessage(content="draft a mail to Alice"), AIMessage(content="Draft ready."), HumanMessage(content="send it")]
+    put(cache, "send it", {"to": "bob"}, scope=history_fingerprint(bob))
+
+    assert get(cache, "send it", scope=history_fingerprint(alice)) is None
+    assert get(cache, "send it", scope=history_fingerprint(bob)) == {"to": "bob"}
+
+
+def test_memory_fingerprint_ignores_order_and_formatting():
+    assert memory_fingerprint(["Likes tea", "Lives in  Paris"]) == memory_fingerprint(["lives in paris", "likes tea"])
+    assert memory_fingerprint(["likes tea"]) != memory_fingerprint(["likes coffee"])
@@ -0,0 +1,53 @@
+import asyncio
+
+from langgraph.graph import END
+from langgraph.types import Send
+
+from arcis.core.workflow_manual.agents.supervisor import _is_ready, supervisor_node, supervisor_router
+
+
+def step(id, status="pending", depends_on=None, agent="UtilityAgent"):
+    return {"id": id, "description": f"step {id}", "status": status, "assigned_agent": agent, "depends_on": depends_on}
+
+
+def test_step_without_dependencies_waits_for_earlier_steps():
+    plan = [step(1, "in_progress"), step(2)]
+    assert not _is_ready(plan[1], plan)
+    plan[0]["status"] = "completed"
+    assert _is_ready(plan[1], plan)
+
+
+def test_independent_steps_are_ready_together():
+    plan = [step(1, depends_on=[]), step(2, depends_on=[]), step(3, depends_on=[1])]
+    result = asyncio.run(supervisor_node({"plan": plan}))
+    assert [s["status"] for s in result["plan"]] == ["in_progress", "in_progress", "pending"]
+
+
+def test_failed_dependency_does_not_block():
+    plan = [step(1, "failed"), step(2, depends_on=[1])]
+    assert _is_ready(plan[1], plan)
+
+
+def test_blocked_steps_finish_the_run():
+    # step 2 waits on itself, nothing running can unblock it
+    plan = [step(1, "completed"), step(2, depends_on=[2])]
+    result = asyncio.run(supervisor_node({"plan": plan}))
+    assert result["workflow_status"] == "FINISHED"
+    assert result["plan"][1]["status"] == "failed"
+    assert result["final_response"]
+    assert supervisor_router({**result}) == END
+
+
+def test_steps_waiting_on_running_steps_go_to_the_replanner():
+    plan = [step(1, "in_progress"), step(2, depends_on=[1])]
+    result = asyncio.run(supervisor_node({"plan": plan}))
+    assert result["next_node"] == "replanner"
+    assert supervisor_router({"plan": plan, **result}) == "replanner"
+
+
+def test_router_sends_every_dispatched_step_to_its_agent():
+    plan = [step(1, "in_progress", agent="EmailAgent"), step(2, "in_progress", agent="MCPAgent"), step(3)]
+    sends = supervisor_router({"plan": plan, "next_node": None})
+    assert all(isinstance(s, Send) for s in sends)
+    assert [(s.node, s.arg["active_step"]["id"]) for s in sends] == [("email_agent", 1), ("mcp_agent", 2)]
+
@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+from langchain_core.tools import tool
+
+from arcis import Config
+from arcis.core.workflow_manual.tools import cache as cache_module
+from arcis.core.workflow_manual.tools.cache import ToolCache, cached_tool, invalidates
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(Config, "TOOL_CACHE_ENABLED", True)
+    monkeypatch.setattr(cache_module, "tool_cache", ToolCache(max_entries=10))
+    return cache_module.tool_cache
+
+
+def test_key_ignores_argument_order():
+    assert ToolCache.key("search", {"a": 1, "b": 2}) == ToolCache.key("search", {"b": 2, "a": 1})
+    assert ToolCache.key("search", {"a": 1}) != ToolCache.key("other", {"a": 1})
+    assert ToolCache.key("search", {"a": 1}) != ToolCache.key("search", {"a": 2})
+
+
+def test_omitted_defaults_share_the_entry():
+    calls = []
+
+    @cached_tool(ttl=60)
+    @tool
+    def list_items(kind: str, limit: int = 10) -> str:
+        """List items."""
+        calls.append((kind, limit))
+        return f"{kind}:{limit}"
+
+    assert list_items.invoke({"kind": "todo"}) == "todo:10"
+    assert list_items.invoke({"kind": "todo", "limit": 10}) == "todo:10"
+    assert list_items.invoke({"kind": "todo", "limit": 5}) == "todo:5"
+    assert calls == [("todo", 10), ("todo", 5)]
+
+
+def test_errors_are_not_cached():
+    calls = []
+
+    @cached_tool(ttl=60)
+    @tool
+    def lookup(query: str) -> str:
+        """Look something up."""
+        calls.append(query)
+        return "❌ service down"
+
+    lookup.invoke({"query": "x"})
+    lookup.invoke({"query": "x"})
+    assert len(calls) == 2
+
+
+def test_writes_invalidate_tagged_reads(fresh_cache):
+    events = ["standup"]
+
+    @cached_tool(ttl=60, tags=["calendar"])
+    @tool
+    def list_events() -> str:
+        """List events."""
+        return ", ".join(events)
+
+    @invalidates("calendar")
+    @tool
+    def add_event(title: str) -> str:
+        """Add an event."""
+        events.append(title)
+        return "ok"
+
+    assert list_events.invoke({}) == "standup"
+    add_event.invoke({"title": "lunch"})
+    assert list_events.invoke({}) == "standup, lunch"
+    assert fresh_cache.stats()["list_events"]["invalidated"] == 1
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    calls = []
+
+    @cached_tool(ttl=60)
+    @tool
+    async def fetch(url: str) -> str:
+        """Fetch a page."""
+        calls.append(url)
+        await asyncio.sleep(0.01)
+        return f"page {url}"
+
+    async def run():
+        return await asyncio.gather(*(fetch.ainvoke({"url": "a"}) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["page a"] * 5
+    assert calls == ["a"]
+
+
+def test_cancelled_caller_does_not_fail_the_waiters(fresh_cache):
+    calls = []
+
+    @cached_tool(ttl=60)
+    @tool
+    async def fetch(url: str) -> str:
+        """Fetch a page."""
+        calls.append(url)
+        await asyncio.sleep(0.01)
+        return f"page {url}"
+
+    async def run():
+        first = asyncio.create_task(fetch.ainvoke({"url": "a"}))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(fetch.ainvoke({"url": "a"}))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await waiter
+
+    # the waiter runs the call itself once the first caller is gone
+    assert asyncio.run(run()) == "page a"
+    assert calls == ["a", "a"]
+    assert fresh_cache.inflight(ToolCache.key("fetch", {"url": "a"})) is None